@@ -193,6 +193,10 @@ INIT_KEY_PATH = os.path.join(
 )
 
 BULK_BATCH_SIZE = 500
+# Deleting more entries than this is done by job server.
+DELETE_JOB_THRESHOLD = 10000
+# Metadata of uploads with more files than this is read by job server.
+METADATA_JOB_THRESHOLD = 20
 
 # Override default upload temp dir
 FILE_UPLOAD_TEMP_DIR = os.path.join(ROOT_CONFIG.web.temp_dir, "uploads")
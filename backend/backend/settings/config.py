@@ -1,7 +1,7 @@
 import os
 import tempfile
 import logging
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 import yaml
 from pydantic import BaseModel, Field, HttpUrl
@@ -25,12 +25,68 @@ class WebConfig(BaseModel):
     public_link_expiry: Optional[int] = Field(
         gt=0, default=60, alias="public-link-expiry"
     )
+    upload_expiry: Optional[int] = Field(
+        gt=0, default=24, alias="upload-expiry"
+    )  # hours, since upload session creation
+    download_backend: Optional[
+        Literal["python", "sendfile", "x-accel-redirect", "x-sendfile"]
+    ] = Field(default="python", alias="download-backend")
+    download_accel_prefix: Optional[str] = Field(
+        default="/internal", alias="download-accel-prefix"
+    )  # nginx internal location aliased to /
+    download_chunk_size: Optional[int] = Field(
+        gt=0, default=64 * 1024, alias="download-chunk-size"
+    )  # bytes, first read
+    download_max_chunk_size: Optional[int] = Field(
+        gt=0, default=1024 * 1024, alias="download-max-chunk-size"
+    )  # bytes, reads grow up to this size
 
 
 class IndexerConfig(BaseModel):
     """Indexer config"""
 
     period: Optional[int] = Field(gt=0, default=180)  # minutes
+    deep_period: Optional[int] = Field(
+        gt=0, default=1440, alias="deep-period"
+    )  # minutes
+    metadata_workers: Optional[int] = Field(
+        ge=0, default=2, alias="metadata-workers"
+    )  # 0 to extract in indexer process
+    metadata_cache_expiry: Optional[int] = Field(
+        gt=0, default=30, alias="metadata-cache-expiry"
+    )  # days since last use
+    metadata_cache_size: Optional[int] = Field(
+        gt=0, default=100000, alias="metadata-cache-size"
+    )  # entries, least recently used are evicted
+    watch: Optional[bool] = False
+    watch_debounce: Optional[float] = Field(
+        gt=0, default=2.0, alias="watch-debounce"
+    )  # seconds
+
+
+class ThumbnailConfig(BaseModel):
+    """Thumbnail config"""
+
+    dir: Optional[str] = None  # temp-dir/thumbnails if not set
+    size: Optional[int] = Field(gt=0, default=256)  # pixels, longest side
+    cache_size: Optional[int] = Field(gt=0, default=512, alias="cache-size")  # MiB
+    max_age: Optional[int] = Field(
+        ge=0, default=7 * 24 * 60 * 60, alias="max-age"
+    )  # seconds, browser cache
+    pregenerate: Optional[bool] = False
+
+
+class CompressConfig(BaseModel):
+    """Compress job config"""
+
+    workers: Optional[int] = Field(gt=0, default=2)  # threads deflating files
+    level: Optional[int] = Field(ge=0, le=9, default=6)  # deflate level
+
+
+class JobServerConfig(BaseModel):
+    """Job server config"""
+
+    workers: Optional[int] = Field(gt=0, default=2)  # processes running jobs
 
 
 class DatabaseConfig(BaseModel):
@@ -100,6 +156,9 @@ class Config(BaseModel):
 
     web: WebConfig
     indexer: Optional[IndexerConfig] = IndexerConfig()
+    thumbnail: Optional[ThumbnailConfig] = ThumbnailConfig()
+    compress: Optional[CompressConfig] = CompressConfig()
+    jobserver: Optional[JobServerConfig] = JobServerConfig()
     database: DatabaseConfig
     redis: RedisConfig
     security: SecurityConfig
@@ -7,6 +7,7 @@ from rpidrive.models import (
     Playlist,
     PlaylistFile,
     PublicFileLink,
+    UploadSession,
     Volume,
     VolumeUser,
 )
@@ -17,5 +18,6 @@ admin.site.register(Job)
 admin.site.register(Playlist)
 admin.site.register(PlaylistFile)
 admin.site.register(PublicFileLink)
+admin.site.register(UploadSession)
 admin.site.register(Volume)
 admin.site.register(VolumeUser)
@@ -1,4 +1,12 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import pre_migrate
+
+
+def _create_extensions(using: str = "default", **_kwargs):
+    """Extensions must exist before the indexes using them are created"""
+    with connections[using].cursor() as cursor:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
 
 
 class RpidriveConfig(AppConfig):
@@ -6,3 +14,10 @@ class RpidriveConfig(AppConfig):
 
     default_auto_field = "django.db.models.BigAutoField"
     name = "rpidrive"
+
+    def ready(self):
+        # pylint: disable=import-outside-toplevel
+        from rpidrive.controllers.permission_cache import connect_signals
+
+        pre_migrate.connect(_create_extensions, sender=self)
+        connect_signals()
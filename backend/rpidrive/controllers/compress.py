@@ -1,5 +1,6 @@
 from typing import List
 from pydantic import BaseModel
+from rpidrive.controllers.job import notify_job
 from rpidrive.models import File, Job, JobKind, JobStatus
 
 
@@ -28,7 +29,7 @@ def create_compress_job(file_pks: List[str], parent: File, name: str) -> Job:
     if not name:
         raise InvalidFileNameException()
 
-    return Job.objects.create(
+    job = Job.objects.create(
         kind=JobKind.ZIP,
         description=name,
         data=CompressDataModel(
@@ -39,3 +40,5 @@ def create_compress_job(file_pks: List[str], parent: File, name: str) -> Job:
         volume_id=parent.volume_id,
         status=JobStatus.IN_QUEUE,
     )
+    notify_job()
+    return job
@@ -1,12 +1,15 @@
 from datetime import timedelta
-from typing import List
+from typing import List, Optional, Tuple
 
 from django.conf import settings
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.core.files.uploadhandler import FileUploadHandler
 from django.core.handlers.wsgi import WSGIRequest
 from django.db import transaction
 from django.db.models import Q, QuerySet
-from django.http import HttpResponse, StreamingHttpResponse
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
 from django.utils import timezone
 
 from rpidrive.controllers.exceptions import (
@@ -18,16 +21,19 @@ from rpidrive.controllers.local_file import (
     compress_files as local_compress_files,
     create_files as local_create_files,
     create_folder as local_create_folder,
-    delete_file as local_delete_file,
+    delete_files as local_delete_files,
     get_file_parents as local_get_file_parents,
     get_full_path as local_get_full_path,
+    get_upload_handlers as local_get_upload_handlers,
     move_files as local_move_files,
     perform_shallow_index as local_perform_shallow_index,
     rename_file as local_rename_file,
     serve_file as local_serve_file,
     serve_file_thumbnail as local_serve_file_thumbnail,
+    serve_zip as local_serve_zip,
 )
 from rpidrive.controllers.volume import (
+    check_volume_permission,
     get_volumes,
     request_volume,
     VolumeNotFoundException,
@@ -73,13 +79,14 @@ def get_file(
         raise FileNotFoundException("File not found.")
 
     # Check permission
+    min_level = (
+        VolumePermissionEnum.READ if not write else VolumePermissionEnum.READ_WRITE
+    )
     try:
-        request_volume(
-            user,
-            file.volume_id,
-            VolumePermissionEnum.READ if not write else VolumePermissionEnum.READ_WRITE,
-            write,
-        )
+        if write:
+            request_volume(user, file.volume_id, min_level, write)
+        else:
+            check_volume_permission(user, file.volume_id, min_level)
     except VolumeNotFoundException:
         raise FileNotFoundException(  # pylint: disable=raise-missing-from
             "File not found."
@@ -88,6 +95,37 @@ def get_file(
     return file
 
 
+def get_files(
+    user: User,
+    file_pks: List[str],
+    select_related: List[str] = None,
+    write: bool = False,
+) -> List[File]:
+    """Get files of the same volume by ids, permission is checked once"""
+    if not select_related:
+        select_related = []
+    file_pks = [str(x) for x in file_pks]
+
+    files = File.objects.filter(pk__in=set(file_pks)).select_related(*select_related)
+    if write:
+        files = files.select_for_update(of=("self",))
+    files = {str(x.pk): x for x in files}
+    if not files or len(files) != len(set(file_pks)):
+        raise FileNotFoundException("File not found.")
+    volume_pks = {x.volume_id for x in files.values()}
+    if len(volume_pks) != 1:
+        raise InvalidOperationRequestException("Files must be in the same volume.")
+
+    min_level = (
+        VolumePermissionEnum.READ if not write else VolumePermissionEnum.READ_WRITE
+    )
+    if write:
+        request_volume(user, volume_pks.pop(), min_level, write)
+    else:
+        check_volume_permission(user, volume_pks.pop(), min_level)
+    return [files[x] for x in dict.fromkeys(file_pks)]
+
+
 def get_file_parents(file: File) -> List[File]:
     """Get a list of ancestor file objects to file"""
     if file.volume.kind == VolumeKindEnum.HOST_PATH:
@@ -95,25 +133,13 @@ def get_file_parents(file: File) -> List[File]:
     raise NotImplementedError()
 
 
-def delete_files(user: User, file_pks: List[str]):
-    """Delete file"""
-    volume_pks = list(
-        File.objects.filter(pk__in=file_pks).values_list("volume_id", flat=True)
-    )
-    if not volume_pks or len(volume_pks) != len(file_pks):
-        raise FileNotFoundException("File not found.")
-    volume_pks = list(set(volume_pks))
-    if len(volume_pks) != 1:
-        raise InvalidOperationRequestException("Files must be in the same volume")
-    volume_id = volume_pks[0]
-    volume = request_volume(user, volume_id, VolumePermissionEnum.READ_WRITE, False)
-    if volume.kind != VolumeKindEnum.HOST_PATH:
-        raise NotImplementedError()
-
-    for file_pk in file_pks:
-        with transaction.atomic():
-            file = get_file(user, file_pk, ["volume"], [], True)
-            local_delete_file(file)
+def delete_files(user: User, file_pks: List[str]) -> Optional[Job]:
+    """Delete file, returns the job when deletion is done in background"""
+    with transaction.atomic():
+        files = get_files(user, file_pks, ["volume"], True)
+        if files[0].volume.kind != VolumeKindEnum.HOST_PATH:
+            raise NotImplementedError()
+        return local_delete_files(files)
 
 
 def rename_file(user: User, file_pk: str, new_name: str):
@@ -148,39 +174,29 @@ def compress_files(
 
     if not file_pks:
         raise InvalidOperationRequestException("No file to compress.")
-    if File.objects.filter(pk__in=file_pks).count() != len(file_pks):
-        raise InvalidOperationRequestException("Invalid file to compress.")
-
-    all_files = file_pks + [parent_pk]
-    volume_pks = list(
-        File.objects.filter(pk__in=all_files)
-        .values_list("volume_id", flat=True)
-        .distinct()
-    )
-    if len(volume_pks) != 1:
-        raise InvalidOperationRequestException(
-            "Files & destination must be in the same volume."
-        )
 
     with transaction.atomic():
-        volume = request_volume(
-            user, volume_pks[0], VolumePermissionEnum.READ_WRITE, True
-        )
-        parent = get_file(user, parent_pk, [], [], True)
+        try:
+            files = get_files(user, file_pks, [], True)
+        except FileNotFoundException as exc:
+            raise InvalidOperationRequestException("Invalid file to compress.") from exc
+        except InvalidOperationRequestException as exc:
+            raise InvalidOperationRequestException(
+                "Files & destination must be in the same volume."
+            ) from exc
+        parent = get_file(user, parent_pk, ["volume"], [], True)
+        if parent.volume_id != files[0].volume_id:
+            raise InvalidOperationRequestException(
+                "Files & destination must be in the same volume."
+            )
         if parent.kind != FileKindEnum.FOLDER:
             raise InvalidOperationRequestException("Can't create zip file in a file.")
-        files_parent_count = (
-            File.objects.filter(pk__in=file_pks)
-            .values_list("parent", flat=True)
-            .distinct()
-            .count()
-        )
-        if files_parent_count != 1:
+        if len({x.parent_id for x in files}) != 1:
             raise InvalidOperationRequestException(
                 "Only can compress items in the same level!"
             )
 
-        if volume.kind == VolumeKindEnum.HOST_PATH:
+        if parent.volume.kind == VolumeKindEnum.HOST_PATH:
             return local_compress_files(file_pks, parent, zip_name)
 
         raise NotImplementedError()
@@ -188,27 +204,21 @@ def compress_files(
 
 def move_files(user: User, file_pks: List[str], parent_pk: str, is_rename: bool):
     """Move files"""
-    volume_pks = list(
-        File.objects.filter(pk__in=file_pks)
-        .values_list("volume_id", flat=True)
-        .distinct()
-    )
-    if not volume_pks:
-        raise InvalidOperationRequestException("No file to move.")
-    if len(volume_pks) > 1:
-        raise InvalidOperationRequestException("Files must be from the same volume.")
-
     with transaction.atomic():
         parent = get_file(user, parent_pk, ["volume"], [], True)
-        volume_ids = {parent.volume_id, volume_pks[0]}
-        for volume_id in volume_ids:
-            volume = request_volume(
-                user, volume_id, VolumePermissionEnum.READ_WRITE, True
-            )
+        try:
+            files = get_files(user, file_pks, ["volume"], True)
+        except FileNotFoundException as exc:
+            raise InvalidOperationRequestException("No file to move.") from exc
+        except InvalidOperationRequestException as exc:
+            raise InvalidOperationRequestException(
+                "Files must be from the same volume."
+            ) from exc
+        for volume in (files[0].volume, parent.volume):
             if volume.kind != VolumeKindEnum.HOST_PATH:
                 raise NotImplementedError()
 
-        local_move_files(file_pks, parent, is_rename)
+        local_move_files(files, parent, is_rename)
 
 
 def share_file(user: User, file_pk: str) -> PublicFileLink:
@@ -238,7 +248,7 @@ def create_folder(user: User, parent_pk: str, name: str) -> File:
         raise NotImplementedError()
 
 
-def serve_file(user: User, file_pk: str, request: WSGIRequest) -> StreamingHttpResponse:
+def serve_file(user: User, file_pk: str, request: WSGIRequest) -> HttpResponseBase:
     """Serve file"""
     file = get_file(user, file_pk, ["volume"], [], False)
     if file.kind == FileKindEnum.FOLDER:
@@ -249,7 +259,16 @@ def serve_file(user: User, file_pk: str, request: WSGIRequest) -> StreamingHttpR
     raise NotImplementedError()
 
 
-def serve_qa_file(qa_id: str, request: WSGIRequest) -> StreamingHttpResponse:
+def serve_zip(user: User, file_pk: str, deflate: bool = False) -> HttpResponseBase:
+    """Serve file or folder as ZIP"""
+    file = get_file(user, file_pk, ["volume"], [], False)
+    if file.volume.kind == VolumeKindEnum.HOST_PATH:
+        return local_serve_zip(file, deflate)
+
+    raise NotImplementedError()
+
+
+def serve_qa_file(qa_id: str, request: WSGIRequest) -> HttpResponseBase:
     """Serve file"""
     link = (
         PublicFileLink.objects.filter(pk=qa_id)
@@ -270,35 +289,67 @@ def serve_qa_file(qa_id: str, request: WSGIRequest) -> StreamingHttpResponse:
     raise NotImplementedError()
 
 
-def serve_file_thumbnail(user: User, file_pk: str) -> HttpResponse:
+def serve_file_thumbnail(
+    user: User, file_pk: str, request: WSGIRequest
+) -> HttpResponse:
     """Serve file thumbail"""
     file = get_file(user, file_pk, ["volume"], [], False)
     if file.kind == FileKindEnum.FOLDER:
         raise InvalidOperationRequestException("Can't download folder.")
     if file.volume.kind == VolumeKindEnum.HOST_PATH:
-        return local_serve_file_thumbnail(file)
+        return local_serve_file_thumbnail(file, request)
 
     raise NotImplementedError()
 
 
-def create_files(user: User, parent_pk: str, files: List):
+def get_upload_handlers(
+    user: User, parent_pk: str, request: WSGIRequest
+) -> List[FileUploadHandler]:
+    """Get upload handlers for files uploaded to parent"""
+    # Runs before the request body is read, outside of transaction, so the
+    # parent isn't locked here. create_files locks it once files are received.
+    parent = get_file(user, parent_pk, ["volume"], [], False)
+    check_volume_permission(user, parent.volume_id, VolumePermissionEnum.READ_WRITE)
+    if parent.kind == FileKindEnum.FILE:
+        raise InvalidOperationRequestException("Unable to upload files to file.")
+
+    if parent.volume.kind == VolumeKindEnum.HOST_PATH:
+        return local_get_upload_handlers(parent.volume, request)
+
+    raise NotImplementedError()
+
+
+def create_files(user: User, parent_pk: str, files: List) -> Optional[Job]:
     """Create files"""
     with transaction.atomic():
-        parent = get_file(user, parent_pk, ["volume"], ["children"], True)
+        parent = get_file(user, parent_pk, ["volume"], [], True)
         if parent.kind == FileKindEnum.FILE:
             raise InvalidOperationRequestException("Unable to upload files to file.")
 
         if parent.volume.kind == VolumeKindEnum.HOST_PATH:
-            local_create_files(parent, files)
-            return
+            return local_create_files(parent, files)
 
     raise NotImplementedError()
 
 
-def search_files(user: User, keyword: str) -> QuerySet:
-    """Search file"""
+def search_files(
+    user: User, keyword: str, after: Tuple[float, str, str] = None
+) -> QuerySet:
+    """Search file, after is the (rank, name, pk) of the last file of prev page"""
     volume_pks = get_volumes(user).values_list("pk", flat=True)
-    return File.objects.filter(Q(volume_id__in=volume_pks) & Q(name__icontains=keyword))
+    files = (
+        File.objects.filter(Q(volume_id__in=volume_pks) & Q(name__icontains=keyword))
+        .annotate(rank=TrigramWordSimilarity(keyword, "name"))
+        .order_by("-rank", "name", "pk")
+    )
+    if after:
+        rank, name, file_pk = after
+        files = files.filter(
+            Q(rank__lt=rank)
+            | Q(rank=rank, name__gt=name)
+            | Q(rank=rank, name=name, pk__gt=file_pk)
+        )
+    return files
 
 
 def get_file_full_path(file: File):
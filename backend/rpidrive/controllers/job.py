@@ -1,9 +1,17 @@
+from typing import Iterable, Optional
+
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
 from django.db.models import Q, QuerySet
+from django_redis import get_redis_connection
 
 from rpidrive.controllers.exceptions import ObjectNotFoundException
 from rpidrive.controllers.volume import get_volumes
-from rpidrive.models import Job
+from rpidrive.models import Job, JobKind, JobStatus
+
+_WAKEUP_KEY = "job-wakeup"
+_MAX_WAKEUPS = 100
 
 
 class JobNotFoundException(ObjectNotFoundException):
@@ -29,3 +37,47 @@ def get_job(job_pk: int) -> Job:
 
 def cancel_job(_user: User, _job_pk: int):
     """Cancel job"""
+
+
+def _get_wakeup_key() -> str:
+    return cache.make_key(_WAKEUP_KEY)
+
+
+def _push_wakeup():
+    client = get_redis_connection("default")
+    key = _get_wakeup_key()
+    client.lpush(key, 1)
+    client.ltrim(key, 0, _MAX_WAKEUPS - 1)
+
+
+def notify_job():
+    """Wake up a job worker once the queued job is committed"""
+    transaction.on_commit(_push_wakeup)
+
+
+def wait_job(timeout: float) -> bool:
+    """Block until a job is queued or timeout (seconds), returns True if woken"""
+    client = get_redis_connection("default")
+    return client.blpop([_get_wakeup_key()], timeout=timeout) is not None
+
+
+def claim_job(kinds: Iterable[JobKind]) -> Optional[Job]:
+    """Claim oldest queued job, jobs being claimed by other workers are skipped"""
+    with transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(kind__in=list(kinds), status=JobStatus.IN_QUEUE)
+            .order_by("pk")
+            .first()
+        )
+        if job:
+            job.status = JobStatus.RUNNING
+            job.save(update_fields=["status"])
+    return job
+
+
+def requeue_jobs(kinds: Iterable[JobKind]) -> int:
+    """Queue jobs left running by a stopped job server again"""
+    return Job.objects.filter(kind__in=list(kinds), status=JobStatus.RUNNING).update(
+        status=JobStatus.IN_QUEUE, progress=0
+    )
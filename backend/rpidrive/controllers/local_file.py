@@ -1,15 +1,25 @@
+# pylint: disable=too-many-lines
 import logging
 import mimetypes
+import multiprocessing
 import os
+import re
 import shutil
 import stat
+import tempfile
+import time
 import uuid
-import zipfile
 
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
 from datetime import datetime
-from typing import Dict, List, Set, Tuple
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
 from urllib.parse import quote
-from wsgiref.util import FileWrapper
 
 import epub_meta
 import exifread
@@ -19,13 +29,24 @@ from django.core.handlers.wsgi import WSGIRequest
 from django.core.files.uploadedfile import (
     InMemoryUploadedFile,
     TemporaryUploadedFile,
+    UploadedFile,
+)
+from django.core.files.uploadhandler import (
+    FileUploadHandler,
+    MemoryFileUploadHandler,
+    TemporaryFileUploadHandler,
 )
 from django.db import transaction
-from django.db.models import Q
-from django.http import HttpResponse, StreamingHttpResponse
+from django.db.models import Q, QuerySet, Value
+from django.db.models.functions import Concat, Substr
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
 from tinytag import TinyTag
 from mobi import Mobi
+from pydantic import BaseModel
 from pypdf import PdfReader
 
 from rpidrive.controllers.compress import (
@@ -36,19 +57,43 @@ from rpidrive.controllers.exceptions import (
     InvalidFileNameException,
     InvalidOperationRequestException,
 )
-from rpidrive.controllers.utils import RangeFileWrapper, range_re
+from rpidrive.controllers.job import notify_job
+from rpidrive.controllers.metadata_cache import (
+    get_cached_metadata,
+    record_metadata_cache_stats,
+    set_cached_metadata,
+)
+from rpidrive.controllers.thumbnail import (
+    THUMBNAIL_MEDIA_TYPE_RE,
+    get_thumbnail,
+    pregenerate_thumbnail,
+)
+from rpidrive.controllers.utils import RangeFileWrapper, parse_range_header
 from rpidrive.controllers.volume import get_root_file_id
+from rpidrive.controllers.zipstream import (
+    ZIP_DEFLATED,
+    ZIP_STORED,
+    ZipStreamWriter,
+    compress_data,
+    get_stored_size,
+)
 from rpidrive.models import (
     File,
     FileKindEnum,
     Job,
+    JobKind,
     JobStatus,
+    PlaylistFile,
+    PublicFileLink,
+    UploadSession,
     Volume,
     VolumeKindEnum,
 )
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_STAGING_DIR = ".rpidrive-uploads"  # In volume root, not indexed
+
 
 class InvalidVolumeKindException(Exception):
     """Invalid volume kind exception"""
@@ -77,9 +122,49 @@ def get_full_path(file: File) -> str:
     return os.path.join(file.volume.path, temp)
 
 
-def get_metadata(file_path: str) -> Dict:  # pylint: disable=too-many-return-statements
-    """Get metadata given path"""
-    if not os.path.isfile(file_path):
+def get_descendants(volume_id: str, path_from_vol: str) -> QuerySet:
+    """Get files under the given folder path, uses the (volume, path) index"""
+    prefix = f"{path_from_vol.rstrip(os.path.sep)}{os.path.sep}"
+    files = File.objects.filter(volume_id=volume_id, path_from_vol__startswith=prefix)
+    if prefix == os.path.sep:
+        files = files.exclude(parent=None)
+    return files
+
+
+def get_ancestor_paths(path_from_vol: str) -> List[str]:
+    """Get paths of the ancestors of the given path, from the root"""
+    path_from_vol = path_from_vol.rstrip(os.path.sep)
+    if not path_from_vol:
+        return []
+    paths = path_from_vol.split(os.path.sep)
+    return [os.path.sep] + [os.path.sep.join(paths[:i]) for i in range(2, len(paths))]
+
+
+def update_descendant_paths(
+    volume_id: str, src_path: str, dest_path: str, dest_volume_id: str = None
+):
+    """Rewrite path (& volume) of files under src_path to be under dest_path.
+
+    Done with a single UPDATE, so rows are not loaded in memory.
+    """
+    values = {
+        "path_from_vol": Concat(
+            Value(dest_path.rstrip(os.path.sep)),
+            Substr("path_from_vol", len(src_path.rstrip(os.path.sep)) + 1),
+        )
+    }
+    if dest_volume_id and dest_volume_id != volume_id:
+        values["volume_id"] = dest_volume_id
+    get_descendants(volume_id, src_path).update(**values)
+
+
+def get_metadata(  # pylint: disable=too-many-return-statements
+    file_path: str, is_file: bool = None
+) -> Dict:
+    """Get metadata given path, is_file skips the file check when known"""
+    if is_file is None:
+        is_file = os.path.isfile(file_path)
+    if not is_file:
         return None
 
     media_type = mimetypes.guess_type(file_path)[0]
@@ -114,39 +199,212 @@ def get_metadata(file_path: str) -> Dict:  # pylint: disable=too-many-return-sta
     return None
 
 
-def perform_index(volume: Volume):
-    """Perform indexing on the volume"""
+class _IndexBatch:  # pylint: disable=too-many-instance-attributes
+    """Stage changes found by indexer & write them to database in batches.
+
+    Metadata is looked up from cache first, then extracted by a process pool
+    when metadata_workers > 0, the results are written after the file rows.
+    The pool is only started once an extraction is needed.
+    """
+
+    _UPDATE_FIELDS = ["last_modified", "size", "media_type", "metadata", "inode"]
+
+    def __init__(self, batch_size: int, metadata_workers: int = 0):
+        self.batch_size = batch_size
+        self.new: List[File] = []
+        self.changed: List[File] = []
+        self.fingerprinted: List[File] = []
+        self.metadata_changed: List[File] = []
+        self.deleted: Dict[str, File] = {}
+        self.moved: Set[str] = set()
+
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        self._metadata_workers = metadata_workers
+        self._pool = None  # Forked on first cache miss
+        # Future -> (file, stat, whether stat fields are written with metadata)
+        self._pending: Dict[Future, Tuple[File, os.stat_result, bool]] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        if self._pool:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def create(self, file: File):
+        """Stage new file, parent must be staged before its children"""
+        self.new.append(file)
+        self._check_flush(self.new)
+
+    def update(self, file: File):
+        """Stage changed file"""
+        self.changed.append(file)
+        self._check_flush(self.changed)
+
+    def update_fingerprint(self, file: File):
+        """Stage folder with new fingerprint, written on finish after deletes.
+
+        A run stopped earlier leaves the old fingerprint, so the folder is
+        listed again by the next incremental index.
+        """
+        self.fingerprinted.append(file)
+
+    def delete(self, file: File):
+        """Stage deleted file, deletion is done on finish so it can still be moved"""
+        if file.pk not in self.moved:
+            self.deleted[file.pk] = file
+
+    def move(self, file: File, parent: File, name: str):
+        """Move file & its children to new parent"""
+        # New parent may be staged only.
+        self.flush()
+
+        src_path = file.path_from_vol
+        file.parent = parent
+        file.name = name
+        file.path_from_vol = os.path.join(parent.path_from_vol, name)
+        file.save(update_fields=["parent", "name", "path_from_vol"])
+        if file.kind == FileKindEnum.FOLDER:
+            update_descendant_paths(file.volume_id, src_path, file.path_from_vol)
+
+        self.deleted.pop(file.pk, None)
+        self.moved.add(file.pk)
+
+    def extract_metadata(
+        self,
+        file: File,
+        file_path: str,
+        file_stat: os.stat_result,
+        stat_changed: bool = False,
+    ) -> bool:
+        """Fill in metadata of file, call before staging the file.
+
+        Returns True when extraction is pending, the file is then updated
+        once done, with its stat fields too if stat_changed.
+        """
+        if not file.media_type:
+            file.metadata = None
+            return False
+
+        found, metadata = get_cached_metadata(file_stat)
+        if found:
+            self.cache_hits += 1
+            file.metadata = metadata
+            return False
+        self.cache_misses += 1
+
+        if self._metadata_workers <= 0:
+            file.metadata = get_metadata(file_path, True)
+            set_cached_metadata(file_stat, file.metadata)
+            return False
+
+        if not self._pool:
+            # Workers only parse files, fork to inherit the loaded app.
+            self._pool = ProcessPoolExecutor(
+                self._metadata_workers, mp_context=multiprocessing.get_context("fork")
+            )
+        future = self._pool.submit(get_metadata, file_path, True)
+        self._pending[future] = (file, file_stat, stat_changed)
+        if len(self._pending) >= self.batch_size:
+            self._collect(wait(self._pending, return_when=FIRST_COMPLETED).done)
+        return True
+
+    def update_changed(self, file: File, file_path: str, file_stat: os.stat_result):
+        """Stage file with changed stat fields & its new metadata.
+
+        A pending file is written once extraction succeeds, until then its
+        row stays stale so that a failed extraction is retried next index.
+        """
+        if not self.extract_metadata(file, file_path, file_stat, True):
+            self.update(file)
+
+    def update_metadata(self, file: File, file_path: str, file_stat: os.stat_result):
+        """Extract metadata of saved file & stage the update"""
+        if not self.extract_metadata(file, file_path, file_stat):
+            self.metadata_changed.append(file)
+            self._check_flush(self.metadata_changed)
+
+    def _collect(self, futures: Iterable[Future]):
+        for future in futures:
+            file, file_stat, stat_changed = self._pending.pop(future)
+            try:
+                file.metadata = future.result()
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Error reading metadata of %s", file.path_from_vol)
+                continue
+            set_cached_metadata(file_stat, file.metadata)
+            (self.changed if stat_changed else self.metadata_changed).append(file)
+        self._check_flush(self.changed)
+        self._check_flush(self.metadata_changed)
+
+    def _check_flush(self, items: List):
+        if len(items) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Write staged changes to database"""
+        # Creation goes first, so that updates can refer to new rows.
+        File.objects.bulk_create(self.new, batch_size=self.batch_size)
+        File.objects.bulk_update(
+            self.changed, fields=self._UPDATE_FIELDS, batch_size=self.batch_size
+        )
+        File.objects.bulk_update(
+            self.metadata_changed, fields=["metadata"], batch_size=self.batch_size
+        )
+        self.new = []
+        self.changed = []
+        self.metadata_changed = []
+
+    def finish(self):
+        """Wait for pending metadata & write everything to database"""
+        self.flush()
+        if self._pending:
+            self._collect(wait(self._pending).done)
+        self.flush()
+        deleted = list(self.deleted.values())
+        for idx in range(0, len(deleted), self.batch_size):
+            _delete_rows(deleted[idx : idx + self.batch_size])
+        self.deleted = {}
+        File.objects.bulk_update(
+            self.fingerprinted, fields=["fingerprint"], batch_size=self.batch_size
+        )
+        self.fingerprinted = []
+        record_metadata_cache_stats(self.cache_hits, self.cache_misses)
+        logger.info(
+            "Metadata cache hits: %s, misses: %s", self.cache_hits, self.cache_misses
+        )
+
+
+def perform_index(volume: Volume, deep: bool = True):
+    """Perform indexing on the volume.
+
+    A deep index lists & checks every entry. Otherwise folders whose
+    fingerprint is unchanged since last index are not listed again, only
+    their subfolders are visited.
+    """
     if volume.kind != VolumeKindEnum.HOST_PATH:
         raise InvalidVolumeKindException("This volume doesn't support indexing.")
 
-    new_files = []
-    changed_files = []
-    deleted_files = []
     root_file = (
         File.objects.select_related("volume")
         .prefetch_related("children")
         .get(pk=get_root_file_id(volume))
     )
-    _recurse_check(
-        volume,
-        root_file,
-        root_file.volume.path,
-        new_files,
-        changed_files,
-        deleted_files,
-        100000,
-    )
-
-    File.objects.bulk_update(
-        changed_files,
-        fields=["last_modified", "size", "media_type", "metadata"],
-        batch_size=settings.BULK_BATCH_SIZE,
-    )
-    File.objects.filter(pk__in=deleted_files).all().delete()
+    with _IndexBatch(
+        settings.BULK_BATCH_SIZE, settings.ROOT_CONFIG.indexer.metadata_workers
+    ) as batch:
+        _recurse_check(volume, root_file, root_file.volume.path, batch, 100000, deep)
+        batch.finish()
 
     volume.indexing = False
     volume.last_indexed = timezone.now()
-    volume.save(update_fields=["indexing", "last_indexed"])
+    update_fields = ["indexing", "last_indexed"]
+    if deep:
+        volume.last_deep_indexed = volume.last_indexed
+        update_fields.append("last_deep_indexed")
+    volume.save(update_fields=update_fields)
 
 
 def perform_shallow_index(folder: File):
@@ -154,78 +412,115 @@ def perform_shallow_index(folder: File):
     if folder.kind != FileKindEnum.FOLDER:
         raise InvalidOperationRequestException("This file doesn't support indexing.")
 
-    new_files = []
-    changed_files = []
-    deleted_files = []
-    _recurse_check(
-        folder.volume,
-        folder,
-        get_full_path(folder),
-        new_files,
-        changed_files,
-        deleted_files,
-        1,
-    )
+    # Runs in web worker, extract metadata inline.
+    with _IndexBatch(settings.BULK_BATCH_SIZE) as batch:
+        _recurse_check(folder.volume, folder, get_full_path(folder), batch, 1, True)
+        batch.finish()
+
 
-    File.objects.bulk_update(
-        changed_files,
-        fields=["last_modified", "size", "media_type", "metadata"],
-        batch_size=settings.BULK_BATCH_SIZE,
+def perform_folder_index(folder: File, deep: bool = False):
+    """Perform index on folder & its subfolders"""
+    if folder.kind != FileKindEnum.FOLDER:
+        raise InvalidOperationRequestException("This file doesn't support indexing.")
+
+    with _IndexBatch(
+        settings.BULK_BATCH_SIZE, settings.ROOT_CONFIG.indexer.metadata_workers
+    ) as batch:
+        _recurse_check(
+            folder.volume, folder, get_full_path(folder), batch, 100000, deep
+        )
+        batch.finish()
+
+
+def get_fingerprint(folder_path: str, folder_stat: os.stat_result = None) -> str:
+    """Get fingerprint of folder, it changes when entries are added/removed/renamed"""
+    if not folder_stat:
+        folder_stat = os.stat(folder_path)
+    return (
+        f"{folder_stat.st_dev}:{folder_stat.st_ino}:"
+        f"{folder_stat.st_mtime_ns}:{folder_stat.st_ctime_ns}"
     )
-    File.objects.filter(pk__in=deleted_files).all().delete()
 
 
-def _get_kind(file_path: str) -> FileKindEnum:
-    is_dir = os.path.isdir(file_path)
+def _get_kind(file_stat: os.stat_result) -> FileKindEnum:
+    is_dir = stat.S_ISDIR(file_stat.st_mode)
     return FileKindEnum.FOLDER if is_dir else FileKindEnum.FILE
 
 
-def create_entry(volume: Volume, parent: File, file_path: str) -> File:
-    """Create File entry"""
+def _build_entry(
+    volume: Volume,
+    parent: File,
+    file_path: str,
+    file_stat: os.stat_result = None,
+    with_metadata: bool = True,
+) -> File:
     file_path = os.path.abspath(file_path)
     filename = os.path.basename(file_path)
-    file_stat = os.stat(file_path)
+    if not file_stat:
+        file_stat = os.stat(file_path)
 
-    return File.objects.create(
+    return File(
         name=filename,
-        kind=_get_kind(file_path),
+        kind=_get_kind(file_stat),
         parent=parent,
         volume=volume,
         last_modified=datetime.fromtimestamp(file_stat.st_mtime).astimezone(
             timezone.get_current_timezone()
         ),
         size=file_stat.st_size,
+        inode=file_stat.st_ino,
         path_from_vol=file_path[len(volume.path) :],
         media_type=mimetypes.guess_type(file_path)[0],
-        metadata=get_metadata(file_path),
+        metadata=(
+            _get_metadata_with_cache(file_path, file_stat) if with_metadata else None
+        ),
     )
 
 
-def _apply_update(file: File, file_path: str) -> bool:
+def _get_metadata_with_cache(file_path: str, file_stat: os.stat_result) -> Dict:
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    found, metadata = get_cached_metadata(file_stat)
+    if not found:
+        metadata = get_metadata(file_path, True)
+        set_cached_metadata(file_stat, metadata)
+    record_metadata_cache_stats(int(found), int(not found))
+    return metadata
+
+
+def create_entry(volume: Volume, parent: File, file_path: str) -> File:
+    """Create File entry"""
+    file = _build_entry(volume, parent, file_path)
+    file.save(force_insert=True)
+    return file
+
+
+def _apply_update(file: File, file_path: str, file_stat: os.stat_result = None) -> bool:
+    """Apply stat changes to file, metadata is left for caller to extract"""
     file_path = os.path.abspath(file_path)
-    file_stat = os.stat(file_path)
+    if not file_stat:
+        file_stat = os.stat(file_path)
 
     m_time = datetime.fromtimestamp(file_stat.st_mtime).astimezone(
         timezone.get_current_timezone()
     )
-    if m_time == file.last_modified:
+    if m_time == file.last_modified and file_stat.st_ino == file.inode:
         return False
 
     existing = {
         "last_modified": file.last_modified,
         "size": file.size,
         "media_type": file.media_type,
-        "metadata": file.metadata,
+        "inode": file.inode,
     }
     new = {
         "last_modified": m_time,
         "size": file_stat.st_size,
         "media_type": None,
-        "metadata": None,
+        "inode": file_stat.st_ino,
     }
-    if os.path.isfile(file_path):
+    if stat.S_ISREG(file_stat.st_mode):
         new["media_type"] = mimetypes.guess_type(file_path)[0]
-        new["metadata"] = get_metadata(file_path)
 
     has_change = False
     for key, value in existing.items():
@@ -235,64 +530,197 @@ def _apply_update(file: File, file_path: str) -> bool:
     return has_change
 
 
+def _recurse_check_subfolders(
+    volume: Volume,
+    root: File,
+    curr_path: str,
+    batch: _IndexBatch,
+    rem_level: int,
+) -> bool:
+    """Visit subfolders of an unchanged folder, returns False if listing is needed"""
+    folders = []
+    for folder in root.children.filter(kind=FileKindEnum.FOLDER).all():
+        full_path = os.path.join(curr_path, folder.name)
+        try:
+            folder_stat = os.lstat(full_path)
+        except FileNotFoundError:
+            return False
+        if not stat.S_ISDIR(folder_stat.st_mode):
+            return False
+        folders.append((folder, full_path, folder_stat))
+
+    for folder, full_path, folder_stat in folders:
+        if _apply_update(folder, full_path, folder_stat):
+            batch.update(folder)
+        _recurse_check(
+            volume, folder, full_path, batch, rem_level - 1, False, folder_stat
+        )
+    return True
+
+
+def _scan_folder(folder_path: str) -> List[Tuple[os.DirEntry, os.stat_result]]:
+    # DirEntry knows the entry type without extra syscall, stat once per entry.
+    with os.scandir(folder_path) as it:
+        return [
+            (x, x.stat(follow_symlinks=False))
+            for x in it
+            # Ignore links & files being uploaded
+            if not x.is_symlink() and x.name != UPLOAD_STAGING_DIR
+        ]
+
+
+def _find_moved_files(
+    volume: Volume, entries: List[Tuple[os.DirEntry, os.stat_result]]
+) -> Dict[str, File]:
+    """Match new entries to known files that left their path by inode & size"""
+    if not entries:
+        return {}
+
+    entries_by_inode = {x[1].st_ino: x for x in entries}
+    moved_files = {}
+    for file in (
+        File.objects.filter(volume=volume, inode__in=entries_by_inode.keys())
+        .exclude(parent=None)
+        .all()
+    ):
+        entry, entry_stat = entries_by_inode[file.inode]
+        if file.kind != _get_kind(entry_stat):
+            continue
+        if file.kind == FileKindEnum.FILE and file.size != entry_stat.st_size:
+            continue
+        file.volume = volume
+        try:
+            if os.lstat(get_full_path(file)).st_ino == file.inode:
+                continue  # Still there, i.e. hard link
+        except FileNotFoundError:
+            pass
+        moved_files[entry.name] = file
+    return moved_files
+
+
 def _recurse_check(  # pylint: disable=too-many-arguments, too-many-positional-arguments
     volume: Volume,
     root: File,
     curr_path: str,
-    new: List[File],
-    changed: List[File],
-    delete: List[str],
+    batch: _IndexBatch,
     rem_level: int,
+    deep: bool,
+    curr_stat: os.stat_result = None,
 ):
     if rem_level <= 0:
         return
 
-    files_in_dir = os.listdir(curr_path)
-    files_in_db = {x.name: x for x in root.children.all()}
-    for filename in files_in_dir:
-        full_path = os.path.join(curr_path, filename)
-        # Ignore links
-        if os.path.islink(full_path):
-            continue
+    fingerprint = get_fingerprint(curr_path, curr_stat)
+    if (
+        not deep
+        and fingerprint == root.fingerprint
+        and _recurse_check_subfolders(volume, root, curr_path, batch, rem_level)
+    ):
+        return
 
-        curr_file_obj = files_in_db.get(filename, None)
-        if curr_file_obj:
-            del files_in_db[filename]  # Mark as found
-
-            kind = _get_kind(full_path)
-            # Different kind
-            if kind != curr_file_obj.kind:
-                delete.append(curr_file_obj)
-                curr_file_obj = create_entry(volume, root, full_path)
-                new.append(curr_file_obj)
-            else:
-                # Check for update
-                if _apply_update(curr_file_obj, full_path):
-                    changed.append(curr_file_obj)
+    entries = _scan_folder(curr_path)
+    files_in_db = {x.name: x for x in root.children.all()}
+    moved_files = _find_moved_files(
+        volume, [x for x in entries if x[0].name not in files_in_db]
+    )
+    for entry, entry_stat in entries:
+        curr_file_obj = files_in_db.pop(entry.name, None)  # Mark as found
+        if not curr_file_obj and entry.name in moved_files:
+            curr_file_obj = moved_files[entry.name]
+            batch.move(curr_file_obj, root, entry.name)
+
+        if curr_file_obj and _get_kind(entry_stat) == curr_file_obj.kind:
+            # Check for update
+            if _apply_update(curr_file_obj, entry.path, entry_stat):
+                batch.update_changed(curr_file_obj, entry.path, entry_stat)
         else:
-            # Create new
-            curr_file_obj = create_entry(volume, root, full_path)
-            new.append(curr_file_obj)
-
-        if os.path.isdir(full_path):
+            # Create new, replace existing one if kind is different
+            if curr_file_obj:
+                batch.delete(curr_file_obj)
+            curr_file_obj = _build_entry(volume, root, entry.path, entry_stat, False)
+            batch.extract_metadata(curr_file_obj, entry.path, entry_stat)
+            batch.create(curr_file_obj)
+
+        if stat.S_ISDIR(entry_stat.st_mode):
             _recurse_check(
-                volume, curr_file_obj, full_path, new, changed, delete, rem_level - 1
+                volume,
+                curr_file_obj,
+                entry.path,
+                batch,
+                rem_level - 1,
+                deep,
+                entry_stat,
             )
 
     # Add to deleted
-    delete.extend([x.pk for x in files_in_db.values()])
+    for file in files_in_db.values():
+        batch.delete(file)
+
+    if fingerprint != root.fingerprint:
+        root.fingerprint = fingerprint
+        batch.update_fingerprint(root)
 
 
 def get_file_parents(file: File) -> List[File]:
     """Get a list of ancestor file objects to file"""
-    paths = file.path_from_vol.split(os.path.sep)
-    possible_paths = [os.path.sep.join(paths[:i]) for i in range(1, len(paths) + 1)]
-    possible_paths[0] = "/"
+    if file.parent_id is None:
+        return []
     return list(
-        File.objects.filter(volume_id=file.volume_id, path_from_vol__in=possible_paths)
+        File.objects.filter(
+            volume_id=file.volume_id,
+            path_from_vol__in=get_ancestor_paths(file.path_from_vol),
+        )
         .order_by("path_from_vol")
         .all()
-    )[:-1]
+    )
+
+
+class DeleteDataModel(BaseModel):
+    """Data model for delete job"""
+
+    files: List[str]
+
+
+def _get_subtree_filter(files: Iterable[File]) -> Q:
+    filters = Q(pk__in=[x.pk for x in files])
+    for file in files:
+        if file.kind == FileKindEnum.FOLDER:
+            filters |= Q(
+                volume_id=file.volume_id,
+                path_from_vol__startswith=f"{file.path_from_vol}{os.path.sep}",
+            )
+    return filters
+
+
+def _delete_rows(files: List[File]):
+    """Delete rows of files & their descendants without loading them"""
+    files = File.objects.filter(_get_subtree_filter(files))
+    # No other model refers to these, so they are deleted in one query each.
+    PlaylistFile.objects.filter(file__in=files).delete()
+    PublicFileLink.objects.filter(file__in=files).delete()
+    UploadSession.objects.filter(parent__in=files).delete()
+    files._raw_delete(files.db)  # pylint: disable=protected-access
+
+
+def _remove_path(full_path: str) -> Iterator[None]:
+    """Remove path from disk, yields once per removed entry"""
+    if os.path.islink(full_path) or os.path.isfile(full_path):
+        os.remove(full_path)
+        yield
+    elif os.path.isdir(full_path):
+        for curr_path, folders, files in os.walk(full_path, topdown=False):
+            for name in files:
+                os.remove(os.path.join(curr_path, name))
+                yield
+            for name in folders:
+                path = os.path.join(curr_path, name)
+                if os.path.islink(path):
+                    os.remove(path)
+                else:
+                    os.rmdir(path)
+                yield
+        os.rmdir(full_path)
+        yield
 
 
 def delete_file(file: File):
@@ -301,11 +729,63 @@ def delete_file(file: File):
         raise InvalidOperationRequestException("Can't delete root file.")
     full_path = get_full_path(file)
     with transaction.atomic():
-        if os.path.isfile(full_path):
-            os.remove(full_path)
-        elif os.path.isdir(full_path):
-            shutil.rmtree(full_path)
-        file.delete()
+        for _ in _remove_path(full_path):
+            pass
+        _delete_rows([file])
+
+
+def delete_files(files: List[File]) -> Optional[Job]:
+    """Delete files, large subtrees are deleted by a job"""
+    for file in files:
+        if file.parent_id is None:
+            raise InvalidOperationRequestException("Can't delete root file.")
+
+    count = File.objects.filter(_get_subtree_filter(files)).count()
+    if count <= settings.DELETE_JOB_THRESHOLD:
+        with transaction.atomic():
+            for file in files:
+                for _ in _remove_path(get_full_path(file)):
+                    pass
+            _delete_rows(files)
+        return None
+
+    job = Job.objects.create(
+        kind=JobKind.DELETE,
+        description=f"Delete {count} items",
+        data=DeleteDataModel(files=[str(x.pk) for x in files]).model_dump(),
+        volume_id=files[0].volume_id,
+        status=JobStatus.IN_QUEUE,
+    )
+    notify_job()
+    return job
+
+
+def process_delete_job(job: Job):
+    """Process delete job"""
+    data = DeleteDataModel.model_validate(job.data)
+    job.status = JobStatus.RUNNING
+    job.save(update_fields=["status"])
+    try:
+        files = list(File.objects.filter(pk__in=data.files).select_related("volume"))
+        total = max(File.objects.filter(_get_subtree_filter(files)).count(), 1)
+        removed = 0
+        for file in files:
+            for _ in _remove_path(get_full_path(file)):
+                removed += 1
+                progress = min(int(removed / total * 100), 99)
+                if progress != job.progress:
+                    job.progress = progress
+                    job.save(update_fields=["progress"])
+            with transaction.atomic():
+                _delete_rows([file])
+    except (KeyboardInterrupt, SystemExit) as exc:
+        raise exc
+    except:  # pylint: disable=bare-except
+        logger.exception("Failed deleting files")
+
+    job.progress = 100
+    job.status = JobStatus.COMPLETED
+    job.save(update_fields=["progress", "status"])
 
 
 def rename_file(file: File, new_name: str):
@@ -334,21 +814,7 @@ def rename_file(file: File, new_name: str):
     file.save(update_fields=["name", "path_from_vol"])
 
     if os.path.isdir(new_path):
-        children = list(
-            File.objects.filter(
-                volume=file.volume,
-                path_from_vol__startswith=f"{src_path_vol}{os.path.sep}",
-            )
-            .select_for_update(of=("self",))
-            .all()
-        )
-        for child in children:
-            child.path_from_vol = (
-                file.path_from_vol + child.path_from_vol[len(src_path_vol) :]
-            )
-        File.objects.bulk_update(
-            children, fields=["path_from_vol"], batch_size=settings.BULK_BATCH_SIZE
-        )
+        update_descendant_paths(file.volume_id, src_path_vol, file.path_from_vol)
 
 
 def compress_files(file_pks: List[str], parent: File, zip_name: str) -> Job:
@@ -374,7 +840,7 @@ def _move_file(source: File, dest: File, is_rename: bool):
         return
 
     init_src_path = source.path_from_vol
-    init_src_path_len = len(source.path_from_vol)
+    init_volume_id = source.volume_id
 
     # Dest file doesn't exist.
     if not target:
@@ -386,21 +852,8 @@ def _move_file(source: File, dest: File, is_rename: bool):
 
         # Update children
         if source.kind == FileKindEnum.FOLDER:
-            children = list(
-                File.objects.filter(
-                    volume=source.volume_id, path_from_vol__startswith=init_src_path
-                ).all()
-            )
-            for child in children:
-                child.volume_id = dest.volume_id
-                child.path_from_vol = os.path.join(
-                    source.path_from_vol,
-                    child.path_from_vol[init_src_path_len + 1 :],
-                )
-            File.objects.bulk_update(
-                children,
-                fields=["volume_id", "path_from_vol"],
-                batch_size=settings.BULK_BATCH_SIZE,
+            update_descendant_paths(
+                init_volume_id, init_src_path, source.path_from_vol, dest.volume_id
             )
     # Both are folders, merge source into target!
     elif source.kind == target.kind == FileKindEnum.FOLDER:
@@ -431,56 +884,69 @@ def _move_file(source: File, dest: File, is_rename: bool):
         source.save(update_fields=["parent", "path_from_vol", "volume_id", "name"])
 
         if source.kind == FileKindEnum.FOLDER:
-            children = list(
-                File.objects.filter(
-                    volume=source.volume_id, path_from_vol__startswith=init_src_path
-                ).all()
+            update_descendant_paths(
+                init_volume_id, init_src_path, source.path_from_vol, dest.volume_id
             )
-            for child in children:
-                child.volume_id = dest.volume_id
-                child.path_from_vol = os.path.join(
-                    dest.path_from_vol,
-                    new_name,
-                    child.path_from_vol[init_src_path_len + 1 :],
-                )
 
 
-def move_files(file_pks: List[str], parent: File, is_rename: bool):
-    """Move files"""
+def move_files(files: List[File], parent: File, is_rename: bool):
+    """Move files locked by caller, files without name conflict are saved in bulk"""
     if parent.kind != FileKindEnum.FOLDER:
         raise InvalidOperationRequestException("Destination must be a folder.")
 
-    files = File.objects.filter(pk__in=file_pks).select_for_update(of=("self",)).all()
     parent_fp = get_full_path(parent)
     for file in files:
         f_p = get_full_path(file)
         if parent_fp.startswith(f_p):
             raise InvalidOperationRequestException("Invalid parent path.")
 
-    for file in files:
-        with transaction.atomic():
-            _move_file(file, parent, is_rename)
+    used_names = set(
+        File.objects.filter(parent=parent, name__in=[x.name for x in files])
+        .values_list("name", flat=True)
+        .all()
+    )
+    moved: List[File] = []
 
+    def save_moved():
+        File.objects.bulk_update(
+            moved,
+            fields=["parent", "path_from_vol", "volume_id"],
+            batch_size=settings.BULK_BATCH_SIZE,
+        )
+        moved.clear()
 
-def create_folder(parent: File, name: str, exists_ok=False) -> File:
-    """Create folder"""
-    if name:
-        name = name.strip()
-    if not name:
-        raise InvalidFileNameException("Folder name can't be empty.")
-    dup_entry = File.objects.filter(Q(parent=parent) & Q(name=name)).first()
-    if dup_entry:
-        if exists_ok:
-            return dup_entry
-        raise InvalidFileNameException("Folder name is already in use.")
+    with transaction.atomic():
+        for file in files:
+            if file.name in used_names:
+                # Conflicts look up the target, so moved rows must be saved.
+                save_moved()
+                _move_file(file, parent, is_rename)
+                continue
+
+            src_path_vol = file.path_from_vol
+            src_volume_id = file.volume_id
+            shutil.move(get_full_path(file), parent_fp)
+            file.parent = parent
+            file.volume = parent.volume
+            file.path_from_vol = os.path.join(parent.path_from_vol, file.name)
+            if file.kind == FileKindEnum.FOLDER:
+                update_descendant_paths(
+                    src_volume_id, src_path_vol, file.path_from_vol, parent.volume_id
+                )
+            used_names.add(file.name)
+            moved.append(file)
+        save_moved()
 
+
+def _build_folder(parent: File, name: str) -> File:
+    """Create folder on disk, the entry is returned unsaved"""
     parent_paths = get_full_path(parent).split(os.path.sep)
     folder_path = os.path.abspath(os.path.join(get_full_path(parent), name))
     if parent_paths != folder_path.split(os.path.sep)[:-1]:
         raise InvalidFileNameException("Invalid character in folder name.")
     os.makedirs(folder_path, exist_ok=True)
     file_stat = os.stat(folder_path)
-    folder = File.objects.create(
+    return File(
         name=name,
         kind=FileKindEnum.FOLDER,
         parent=parent,
@@ -491,41 +957,188 @@ def create_folder(parent: File, name: str, exists_ok=False) -> File:
         size=file_stat.st_size,
         path_from_vol=os.path.join(parent.path_from_vol, name),
     )
+
+
+def create_folder(parent: File, name: str, exists_ok=False) -> File:
+    """Create folder"""
+    if name:
+        name = name.strip()
+    if not name:
+        raise InvalidFileNameException("Folder name can't be empty.")
+    dup_entry = File.objects.filter(Q(parent=parent) & Q(name=name)).first()
+    if dup_entry:
+        if exists_ok:
+            return dup_entry
+        raise InvalidFileNameException("Folder name is already in use.")
+
+    folder = _build_folder(parent, name)
+    folder.save(force_insert=True)
     return folder
 
 
-def serve_file(file: File, request: WSGIRequest) -> StreamingHttpResponse:
-    """Serve file"""
-    file_path = get_full_path(file)
-    range_header = request.META.get("HTTP_RANGE", "").strip()
-    range_match = range_re.match(range_header)
-    size = os.path.getsize(get_full_path(file))
+def _get_file_wrapper(f_h, offset: int = 0, length: int = None) -> RangeFileWrapper:
+    web_config = settings.ROOT_CONFIG.web
+    return RangeFileWrapper(
+        f_h,
+        chunk_size=web_config.download_chunk_size,
+        offset=offset,
+        length=length,
+        max_chunk_size=web_config.download_max_chunk_size,
+    )
+
 
+def _get_multipart_response(
+    f_h, ranges: List[Tuple[int, int]], size: int, content_type: str
+) -> StreamingHttpResponse:
+    boundary = uuid.uuid4().hex
+    headers = [
+        (
+            f"--{boundary}\r\nContent-Type: {content_type}\r\n"
+            f"Content-Range: bytes {first_byte}-{last_byte}/{size}\r\n\r\n"
+        ).encode()
+        for first_byte, last_byte in ranges
+    ]
+    closing = f"--{boundary}--\r\n".encode()
+
+    def iter_parts() -> Iterator[bytes]:
+        try:
+            for header, (first_byte, last_byte) in zip(headers, ranges):
+                yield header
+                yield from _get_file_wrapper(
+                    f_h, first_byte, last_byte - first_byte + 1
+                )
+                yield b"\r\n"
+            yield closing
+        finally:
+            f_h.close()
+
+    resp = StreamingHttpResponse(
+        iter_parts(),
+        status=206,
+        content_type=f"multipart/byteranges; boundary={boundary}",
+    )
+    resp["Content-Length"] = str(
+        sum(
+            len(header) + last_byte - first_byte + 3
+            for header, (first_byte, last_byte) in zip(headers, ranges)
+        )
+        + len(closing)
+    )
+    return resp
+
+
+def _get_stream_response(
+    file_path: str, request: WSGIRequest, sendfile: bool, use_range: bool
+) -> HttpResponseBase:
+    size = os.path.getsize(file_path)
     content_type = "application/octet-stream"
-    if range_match:  # Handle partial file, i.e. seeking audio/video
-        first_byte, last_byte = range_match.groups()
-        first_byte = int(first_byte) if first_byte else 0
-        last_byte = int(last_byte) if last_byte else size - 1
-        if last_byte >= size:
-            last_byte = size - 1
-        length = last_byte - first_byte + 1
+    ranges = None
+    if use_range:  # Handle partial file, i.e. seeking audio/video
+        ranges = parse_range_header(request.META.get("HTTP_RANGE", ""), size)
+    if ranges == []:
+        resp = HttpResponse(status=416)
+        resp["Content-Range"] = f"bytes */{size}"
+        return resp
+
+    f_h = open(file_path, "rb")  # pylint: disable=consider-using-with
+    if ranges and len(ranges) > 1:
+        return _get_multipart_response(f_h, ranges, size, content_type)
+
+    first_byte, last_byte = ranges[0] if ranges else (0, size - 1)
+    if sendfile and last_byte == size - 1:
+        # FileResponse is handed to wsgi.file_wrapper, which uses os.sendfile
+        # from the current position to the end of file. Only sync & gthread
+        # workers do so, gevent sockets fall back to a read & send loop.
+        f_h.seek(first_byte, os.SEEK_SET)
+        resp = FileResponse(
+            f_h, status=206 if ranges else 200, content_type=content_type
+        )
+        resp.block_size = settings.ROOT_CONFIG.web.download_max_chunk_size
+    elif ranges:
         resp = StreamingHttpResponse(
-            RangeFileWrapper(
-                open(file_path, "rb"),  # pylint: disable=consider-using-with
-                offset=first_byte,
-                length=length,
-            ),
+            _get_file_wrapper(f_h, first_byte, last_byte - first_byte + 1),
             status=206,
             content_type=content_type,
         )
-        resp["Content-Length"] = str(length)
-        resp["Content-Range"] = f"bytes {first_byte}-{last_byte}/{size}"
     else:  # Handle full file
-        resp = StreamingHttpResponse(
-            FileWrapper(open(file_path, "rb")),  # pylint: disable=consider-using-with
-            content_type=content_type,
+        resp = StreamingHttpResponse(_get_file_wrapper(f_h), content_type=content_type)
+
+    resp["Content-Length"] = str(last_byte - first_byte + 1)
+    if ranges:
+        resp["Content-Range"] = f"bytes {first_byte}-{last_byte}/{size}"
+    return resp
+
+
+def _get_offload_response(file_path: str, backend: str) -> HttpResponse:
+    # Body & ranges are served by the front proxy.
+    resp = HttpResponse(content_type="application/octet-stream")
+    if backend == "x-accel-redirect":
+        prefix = settings.ROOT_CONFIG.web.download_accel_prefix.rstrip("/")
+        resp["X-Accel-Redirect"] = quote(f"{prefix}{file_path}")
+    else:
+        resp["X-Sendfile"] = quote(file_path)
+    return resp
+
+
+def _get_validators(file: File) -> Tuple[Optional[str], Optional[int]]:
+    """Get ETag & last modified timestamp from index, without disk access"""
+    if not file.last_modified:
+        return None, None
+    mtime = int(file.last_modified.timestamp() * 1000000)
+    return f'"{file.size:x}-{mtime:x}"', int(file.last_modified.timestamp())
+
+
+def _set_validators(file: File, resp: HttpResponseBase, max_age: int = 0):
+    etag, last_modified = _get_validators(file)
+    if etag:
+        resp["ETag"] = etag
+        resp["Last-Modified"] = http_date(last_modified)
+    if max_age:
+        patch_cache_control(resp, private=True, max_age=max_age)
+    else:
+        patch_cache_control(resp, private=True, no_cache=True)
+
+
+def _get_precondition_response(
+    file: File, request: WSGIRequest, max_age: int = 0
+) -> Optional[HttpResponseBase]:
+    """Get 304 / 412 response if request preconditions say so"""
+    etag, last_modified = _get_validators(file)
+    resp = HttpResponse()
+    _set_validators(file, resp, max_age)
+    cond_resp = get_conditional_response(
+        request, etag=etag, last_modified=last_modified, response=resp
+    )
+    return None if cond_resp is resp else cond_resp
+
+
+def _is_if_range_passed(file: File, request: WSGIRequest) -> bool:
+    if_range = request.META.get("HTTP_IF_RANGE", "").strip()
+    if not if_range:
+        return True
+    etag, last_modified = _get_validators(file)
+    if if_range.startswith(('"', "W/")):  # Weak tags never match
+        return etag is not None and if_range == etag
+    return last_modified is not None and parse_http_date_safe(if_range) == last_modified
+
+
+def serve_file(file: File, request: WSGIRequest) -> HttpResponseBase:
+    """Serve file"""
+    resp = _get_precondition_response(file, request)
+    if resp:
+        return resp
+
+    file_path = get_full_path(file)
+    backend = settings.ROOT_CONFIG.web.download_backend
+    if backend in ("x-accel-redirect", "x-sendfile"):
+        resp = _get_offload_response(file_path, backend)
+    else:
+        resp = _get_stream_response(
+            file_path,
+            request,
+            backend == "sendfile",
+            _is_if_range_passed(file, request),
         )
-        resp["Content-Length"] = str(size)
 
     # Fill in extra HTTP headers
     filename = os.path.basename(file_path)
@@ -536,73 +1149,210 @@ def serve_file(file: File, request: WSGIRequest) -> StreamingHttpResponse:
         filename = f"filename*=utf-8''{quote(filename)}"
     resp["Content-Disposition"] = f"attachment;{filename}"
     resp["Accept-Ranges"] = "bytes"
+    _set_validators(file, resp)
 
     return resp
 
 
-def serve_file_thumbnail(file: File) -> HttpResponse:
+def serve_file_thumbnail(file: File, request: WSGIRequest) -> HttpResponse:
     """Serve file thumbail"""
-    if file.media_type.startswith("audio/"):
-        image = TinyTag.get(get_full_path(file), image=True).images.front_cover
-        if image:
-            return HttpResponse(
-                image.data,
-                content_type="image/jpg",
-            )
-    return HttpResponse()
+    max_age = settings.ROOT_CONFIG.thumbnail.max_age
+    resp = _get_precondition_response(file, request, max_age)
+    if resp:
+        return resp
+
+    data = get_thumbnail(file, get_full_path(file))
+    resp = HttpResponse(data, content_type="image/jpeg") if data else HttpResponse()
+    _set_validators(file, resp, max_age)
+    return resp
 
 
-def _do_compress_files(files: List[File]) -> Tuple[str, int]:
-    """Process compress job"""
+def pregenerate_thumbnails(volume: Volume):
+    """Create missing thumbnails of files in volume"""
+    files = File.objects.filter(
+        volume=volume,
+        kind=FileKindEnum.FILE,
+        media_type__regex=THUMBNAIL_MEDIA_TYPE_RE,
+    ).only("pk", "path_from_vol", "media_type", "last_modified", "volume_id")
+    for file in files.iterator(chunk_size=settings.BULK_BATCH_SIZE):
+        file.volume = volume
+        if not pregenerate_thumbnail(file, get_full_path(file)):
+            break
+
+
+# Already compressed, deflating these costs CPU for nothing.
+_STORE_MEDIA_TYPE_RE = (
+    r"^(image/(jpeg|png|gif|webp|heic|heif|avif)$|video/|"
+    r"audio/(?!(wav|x-wav|aiff|x-aiff)$)|application/(zip|gzip|x-bzip2|x-xz|"
+    r"x-7z-compressed|x-rar-compressed|vnd\.rar|epub\+zip|java-archive)$|"
+    r"application/vnd\.openxmlformats-)"
+)
+_COMPRESS_READ_SIZE = 1024 * 1024  # bytes
+_COMPRESS_IN_MEMORY_SIZE = 4 * 1024 * 1024  # bytes, larger files are streamed
+_COMPRESS_PROGRESS_INTERVAL = 0.25  # seconds
+
+
+def _read_chunks(file_path: str, size: int, pad: bool = False) -> Iterator[bytes]:
+    """Read up to size bytes, pad fills in with zeros if the file got shorter"""
+    try:
+        with open(file_path, "rb") as f_h:
+            while size > 0:
+                chunk = f_h.read(min(_COMPRESS_READ_SIZE, size))
+                if not chunk:
+                    break
+                size -= len(chunk)
+                yield chunk
+    except OSError:
+        if not pad:
+            raise
+        logger.warning("Unable to read %s, zeros are sent instead", file_path)
+    if pad and size > 0:
+        logger.warning("%s got shorter, zeros are sent instead", file_path)
+        while size > 0:
+            chunk = bytes(min(_COMPRESS_READ_SIZE, size))
+            size -= len(chunk)
+            yield chunk
+
+
+def _list_compress_entries(
+    files: List[File], root_path: str
+) -> List[Tuple[str, str, os.stat_result]]:
+    """List (path, archive name, stat) of files & their descendants"""
+    entries = []
     paths = [get_full_path(x) for x in files]
-    total_files = 0
     while paths:
         path = paths.pop()
-        total_files += 1
-        if not os.path.isdir(path):
+        try:
+            path_stat = os.stat(path, follow_symlinks=False)
+        except FileNotFoundError:
             continue
-        for child in os.listdir(path):
-            paths.append(os.path.join(path, child))
-
-    zip_path = os.path.join(
-        settings.ROOT_CONFIG.web.temp_dir, f"{uuid.uuid4()}.zip"
-    )  # pylint: disable=protected-access
-    with zipfile.ZipFile(
-        zip_path, mode="w", compression=zipfile.ZIP_DEFLATED, compresslevel=9
-    ) as archive:
-        root_path_len = len(get_full_path(files[0].parent))
-        paths = [get_full_path(x) for x in files]
-        curr_files = 0
-        while paths:
-            path = paths.pop()
-            yield path, int((curr_files / total_files) * 100)
-            archive.write(path, arcname=path[root_path_len:])
-            curr_files = curr_files + 1
-            yield path, int((curr_files / total_files) * 100)
-            if not os.path.isdir(path):
-                continue
-            if path.endswith(os.path.sep):
-                path = path[:-1]
-            for child in os.listdir(path):
-                paths.append(os.path.join(path, child))
-    yield zip_path, 100
+        if not stat.S_ISDIR(path_stat.st_mode) and not stat.S_ISREG(path_stat.st_mode):
+            continue  # i.e. symlink
+        entries.append((path, os.path.relpath(path, root_path), path_stat))
+        if stat.S_ISDIR(path_stat.st_mode):
+            with os.scandir(path) as children:
+                paths.extend(x.path for x in children if x.name != UPLOAD_STAGING_DIR)
+    return entries
+
+
+def _get_media_types(files: List[File]) -> Dict[str, Optional[str]]:
+    """Get media types of files & their descendants by path from volume"""
+    return dict(
+        File.objects.filter(_get_subtree_filter(files)).values_list(
+            "path_from_vol", "media_type"
+        )
+    )
 
 
-def process_compress_job(job: Job) -> File:
+def _get_compress_type(
+    path: str, volume: Volume, media_types: Dict[str, Optional[str]]
+) -> int:
+    media_type = media_types.get(path[len(volume.path) :])
+    if media_type is None:
+        media_type = mimetypes.guess_type(path)[0]
+    if media_type and re.match(_STORE_MEDIA_TYPE_RE, media_type):
+        return ZIP_STORED
+    return ZIP_DEFLATED
+
+
+def _do_compress_files(  # pylint: disable=too-many-locals
+    files: List[File], root_path: str, f_h
+) -> Iterator[Tuple[int, int]]:
+    """Write ZIP of files to f_h, yields (bytes done, total bytes) as it goes.
+
+    Media types known to be compressed are stored. Small files are deflated
+    by a thread pool, larger ones are deflated while streamed, so memory use
+    is bounded.
+    """
+    config = settings.ROOT_CONFIG.compress
+    entries = _list_compress_entries(files, root_path)
+    volume = files[0].volume
+    media_types = _get_media_types(files)
+    total = sum(x[2].st_size for x in entries if stat.S_ISREG(x[2].st_mode))
+    done = 0
+
+    with ZipStreamWriter(f_h) as writer, ThreadPoolExecutor(config.workers) as pool:
+        pending: Dict[Future, Tuple[str, os.stat_result]] = {}
+
+        def write_done(futures: Iterable[Future]) -> int:
+            written = 0
+            for future in futures:
+                arcname, path_stat = pending.pop(future)
+                data, crc, size = future.result()
+                writer.write_compressed(
+                    arcname, path_stat.st_mtime, data, crc, size, ZIP_DEFLATED
+                )
+                written += path_stat.st_size
+            return written
+
+        for path, arcname, path_stat in entries:
+            if stat.S_ISDIR(path_stat.st_mode):
+                writer.write_dir(arcname, path_stat.st_mtime)
+                continue
+            compress_type = _get_compress_type(path, volume, media_types)
+            if (
+                compress_type == ZIP_DEFLATED
+                and path_stat.st_size <= _COMPRESS_IN_MEMORY_SIZE
+            ):
+                future = pool.submit(
+                    compress_data, path, config.level, path_stat.st_size
+                )
+                pending[future] = (arcname, path_stat)
+                if len(pending) >= config.workers * 2:
+                    done += write_done(wait(pending, return_when=FIRST_COMPLETED).done)
+                    yield done, total
+                continue
+
+            for read in writer.write_stream(
+                arcname,
+                path_stat.st_mtime,
+                _read_chunks(path, path_stat.st_size),
+                path_stat.st_size,
+                compress_type,
+                config.level,
+            ):
+                yield done + read, total
+            done += path_stat.st_size
+        done += write_done(wait(pending).done)
+    yield total, total
+
+
+def process_compress_job(job: Job) -> File:  # pylint: disable=too-many-locals
     """Process compress job"""
     data = CompressDataModel.model_validate(job.data)
     job.status = JobStatus.RUNNING
     job.save(update_fields=["status"])
+    output_file = None
     try:
-        temp_zip = None
-        parent_file = File.objects.get(pk=data.parent)
-        file_objs = File.objects.filter(pk__in=data.files).all()
-        for file, prog in _do_compress_files(file_objs):
-            job.progress = prog
-            job.save(update_fields=["progress"])
-            temp_zip = file
-
-        final_path = os.path.join(get_full_path(parent_file), data.name)
+        parent_file = File.objects.select_related("volume").get(pk=data.parent)
+        file_objs = list(
+            File.objects.filter(pk__in=data.files).select_related("volume")
+        )
+        parent_path = get_full_path(parent_file)
+        final_path = os.path.join(parent_path, data.name)
+        # Written in the volume, so it is renamed into place when done.
+        staging_dir = os.path.join(parent_file.volume.path, UPLOAD_STAGING_DIR)
+        os.makedirs(staging_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            suffix=".zip", dir=staging_dir, delete=False
+        ) as f_h:
+            temp_zip = f_h.name
+            try:
+                last_update = 0.0
+                for done, total in _do_compress_files(file_objs, parent_path, f_h):
+                    progress = int(done / max(total, 1) * 100)
+                    now = time.monotonic()
+                    if (
+                        progress != job.progress
+                        and now - last_update >= _COMPRESS_PROGRESS_INTERVAL
+                    ):
+                        job.progress = progress
+                        job.save(update_fields=["progress"])
+                        last_update = now
+            except BaseException:
+                os.remove(temp_zip)
+                raise
+
         if os.path.exists(final_path):
             File.objects.filter(
                 Q(name=data.name) & Q(parent=parent_file)
@@ -613,7 +1363,8 @@ def process_compress_job(job: Job) -> File:
                 os.chmod(final_path, stat.S_IWRITE)
                 os.remove(final_path)
 
-        shutil.move(temp_zip, final_path)
+        move_staged_file(temp_zip, final_path)
+        os.chmod(final_path, 0o744)
         output_file = File.objects.create(
             name=data.name,
             kind=FileKindEnum.FILE,
@@ -629,31 +1380,272 @@ def process_compress_job(job: Job) -> File:
     except:  # pylint: disable=bare-except
         logger.exception("Failed zip file creation")
 
+    job.progress = 100
     job.status = JobStatus.COMPLETED
-    job.save(update_fields=["status"])
+    job.save(update_fields=["progress", "status"])
     return output_file
 
 
-def create_files(parent: File, files: List):
-    """Create files"""
+class _ChunkBuffer:
+    """Collects ZIP output between chunks of streamed response"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes):
+        """Append data"""
+        if data:
+            self._chunks.append(data)
+
+    def drain(self) -> bytes:
+        """Get & clear collected data"""
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _stream_zip(
+    file: File, entries: List[Tuple[str, str, os.stat_result]], deflate: bool
+) -> Iterator[bytes]:
+    """Yield ZIP of entries as it is written, without compression the output
+    size is exactly get_stored_size() of entries"""
+    media_types = _get_media_types([file]) if deflate else {}
+    buffer = _ChunkBuffer()
+    writer = ZipStreamWriter(buffer)
+    for path, arcname, path_stat in entries:
+        if stat.S_ISDIR(path_stat.st_mode):
+            writer.write_dir(arcname, path_stat.st_mtime)
+            continue
+        compress_type = ZIP_STORED
+        if deflate:
+            compress_type = _get_compress_type(path, file.volume, media_types)
+        for _ in writer.write_stream(
+            arcname,
+            path_stat.st_mtime,
+            _read_chunks(path, path_stat.st_size, not deflate),
+            path_stat.st_size,
+            compress_type,
+            1,  # Fastest, as it is done while client waits
+        ):
+            yield buffer.drain()
+    writer.close()
+    yield buffer.drain()
+
+
+def serve_zip(file: File, deflate: bool = False) -> StreamingHttpResponse:
+    """Serve file or folder as ZIP streamed while it is written.
+
+    Without deflate, entries are stored & Content-Length is known up front.
+    """
+    file_path = get_full_path(file)
+    entries = _list_compress_entries([file], os.path.dirname(file_path))
+    resp = StreamingHttpResponse(
+        _stream_zip(file, entries, deflate), content_type="application/zip"
+    )
+    if not deflate:
+        resp["Content-Length"] = get_stored_size(
+            (
+                arcname + "/" if stat.S_ISDIR(path_stat.st_mode) else arcname,
+                0 if stat.S_ISDIR(path_stat.st_mode) else path_stat.st_size,
+            )
+            for _, arcname, path_stat in entries
+        )
+
+    filename = f"{file.name or file.volume.name}.zip"
+    try:
+        filename.encode("ascii")
+        filename = f'filename="{filename}"'
+    except:  # pylint: disable=bare-except
+        filename = f"filename*=utf-8''{quote(filename)}"
+    resp["Content-Disposition"] = f"attachment;{filename}"
+    return resp
+
+
+class _StagedUploadedFile(TemporaryUploadedFile):
+    """Uploaded file written to the staging folder of the volume"""
+
+    def __init__(
+        self,
+        staging_dir: str,
+        name: str,
+        content_type: str,
+        size: int,
+        charset: str,
+        content_type_extra: Dict = None,
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        # pylint: disable=super-init-not-called
+        _, ext = os.path.splitext(name)
+        # pylint: disable-next=consider-using-with
+        file = tempfile.NamedTemporaryFile(suffix=".upload" + ext, dir=staging_dir)
+        # pylint: disable-next=non-parent-init-called
+        UploadedFile.__init__(
+            self, file, name, content_type, size, charset, content_type_extra
+        )
+
+
+class _StagingFileUploadHandler(TemporaryFileUploadHandler):
+    """Upload handler writing to the same device as the volume"""
+
+    def __init__(self, staging_dir: str, request: WSGIRequest = None):
+        super().__init__(request)
+        self.staging_dir = staging_dir
+
+    def new_file(self, *args, **kwargs):
+        FileUploadHandler.new_file(self, *args, **kwargs)
+        # pylint: disable-next=attribute-defined-outside-init
+        self.file = _StagedUploadedFile(
+            self.staging_dir,
+            self.file_name,
+            self.content_type,
+            0,
+            self.charset,
+            self.content_type_extra,
+        )
+
+
+def get_upload_handlers(
+    volume: Volume, request: WSGIRequest
+) -> List[FileUploadHandler]:
+    """Get upload handlers staging large files in the volume, so they are renamed
+    into place instead of copied"""
+    staging_dir = os.path.join(volume.path, UPLOAD_STAGING_DIR)
+    os.makedirs(staging_dir, exist_ok=True)
+    return [
+        MemoryFileUploadHandler(request),
+        _StagingFileUploadHandler(staging_dir, request),
+    ]
+
+
+def move_staged_file(src: str, dest: str):
+    """Move staged file to dest, a rename when on the same device"""
+    try:
+        os.rename(src, dest)
+    except OSError:  # i.e. staged on another mount
+        shutil.move(src, dest)
+
+
+class MetadataDataModel(BaseModel):
+    """Metadata job data model"""
+
+    files: List[str]
+
+
+def create_files(  # pylint: disable=too-many-locals,too-many-statements
+    parent: File, files: List
+) -> Optional[Job]:
+    """Create files, metadata of many files is extracted by a job.
+
+    Folders are resolved once per path & names are made unique against one
+    snapshot of each folder, rows are then inserted in bulk.
+    """
+    folders: Dict[Tuple[str, ...], File] = {(): parent}
+    used_names: Dict[uuid.UUID, Set[str]] = {}
+    staged_file_names: Set[Tuple[uuid.UUID, str]] = set()  # (parent pk, name)
+    new_entries: List[File] = []
+    new_files: List[File] = []
+    with_metadata = len(files) <= settings.METADATA_JOB_THRESHOLD
+
+    def get_used_names(folder: File) -> Set[str]:
+        if folder.pk not in used_names:
+            used_names[folder.pk] = set(
+                File.objects.filter(parent=folder).values_list("name", flat=True)
+            )
+        return used_names[folder.pk]
+
     for file in files:
         request_file = file["file"]
         request_paths: List[str] = file["path"].split(os.path.sep)[:-1]
 
-        curr_parent = parent
+        curr_key: Tuple[str, ...] = ()
         for path in request_paths:
-            curr_parent = create_folder(curr_parent, path, True)
-        sibling_names = set(curr_parent.children.values_list("name", flat=True))
+            name = path.strip() if path else ""
+            if not name:
+                raise InvalidFileNameException("Folder name can't be empty.")
+            curr_parent = folders[curr_key]
+            curr_key += (name,)
+            if curr_key in folders:
+                continue
+            if (curr_parent.pk, name) in staged_file_names:
+                raise InvalidFileNameException("Folder name is already in use.")
+            if name in get_used_names(curr_parent):
+                folder = File.objects.get(parent=curr_parent, name=name)
+                if folder.kind != FileKindEnum.FOLDER:
+                    raise InvalidFileNameException("Folder name is already in use.")
+                folders[curr_key] = folder
+                continue
+            folder = _build_folder(curr_parent, name)
+            new_entries.append(folder)
+            used_names[curr_parent.pk].add(name)
+            used_names[folder.pk] = set()
+            folders[curr_key] = folder
+
+        curr_parent = folders[curr_key]
+        sibling_names = get_used_names(curr_parent)
         filename = generate_new_file_name(request_file.name, sibling_names)
+        sibling_names.add(filename)
         dest_fp = os.path.join(get_full_path(curr_parent), filename)
         if isinstance(request_file, InMemoryUploadedFile):
-            with open(dest_fp, "wb+") as f_h:
-                for chunk in request_file.chunks():
-                    f_h.write(chunk)
+            with open(dest_fp, "wb") as f_h:
+                f_h.write(request_file.read())
         elif isinstance(request_file, TemporaryUploadedFile):
-            shutil.move(request_file.temporary_file_path(), dest_fp)
+            move_staged_file(request_file.temporary_file_path(), dest_fp)
         else:
             raise InvalidOperationRequestException("Unknown upload handler.")
 
         os.chmod(dest_fp, 0o744)
-        create_entry(parent.volume, curr_parent, dest_fp)
+        entry = _build_entry(
+            parent.volume, curr_parent, dest_fp, with_metadata=with_metadata
+        )
+        new_entries.append(entry)
+        new_files.append(entry)
+        staged_file_names.add((curr_parent.pk, filename))
+
+    # Folders are listed before their children.
+    File.objects.bulk_create(new_entries, batch_size=settings.BULK_BATCH_SIZE)
+    if with_metadata:
+        return None
+
+    job = Job.objects.create(
+        kind=JobKind.METADATA,
+        description=f"Read metadata of {len(new_files)} files",
+        data=MetadataDataModel(files=[str(x.pk) for x in new_files]).model_dump(),
+        volume_id=parent.volume_id,
+        status=JobStatus.IN_QUEUE,
+    )
+    notify_job()
+    return job
+
+
+def process_metadata_job(job: Job):
+    """Process metadata job"""
+    data = MetadataDataModel.model_validate(job.data)
+    job.status = JobStatus.RUNNING
+    job.save(update_fields=["status"])
+    try:
+        files = File.objects.filter(pk__in=data.files).select_related("volume")
+        total = max(len(data.files), 1)
+        with _IndexBatch(
+            settings.BULK_BATCH_SIZE, settings.ROOT_CONFIG.indexer.metadata_workers
+        ) as batch:
+            for idx, file in enumerate(
+                files.iterator(chunk_size=settings.BULK_BATCH_SIZE)
+            ):
+                file_path = get_full_path(file)
+                try:
+                    file_stat = os.stat(file_path)
+                except OSError:  # i.e. removed since upload
+                    continue
+                batch.update_metadata(file, file_path, file_stat)
+                progress = min(int((idx + 1) / total * 100), 99)
+                if progress != job.progress:
+                    job.progress = progress
+                    job.save(update_fields=["progress"])
+            batch.finish()
+    except (KeyboardInterrupt, SystemExit) as exc:
+        raise exc
+    except:  # pylint: disable=bare-except
+        logger.exception("Failed reading metadata")
+
+    job.progress = 100
+    job.status = JobStatus.COMPLETED
+    job.save(update_fields=["progress", "status"])
@@ -0,0 +1,98 @@
+import os
+import time
+
+from datetime import timedelta
+from typing import Any, Dict, Tuple
+
+from django.conf import settings
+from django.core.cache import cache
+from django_redis import get_redis_connection
+
+_KEY_PREFIX = "metadata"
+_HITS_KEY = f"{_KEY_PREFIX}-stats.hits"
+_MISSES_KEY = f"{_KEY_PREFIX}-stats.misses"
+_LRU_KEY = f"{_KEY_PREFIX}-lru"  # Sorted set of entry keys by last use
+
+
+def _get_key(file_stat: os.stat_result) -> str:
+    """Key changes when file is modified, but not when it is moved/renamed"""
+    return (
+        f"{_KEY_PREFIX}.{file_stat.st_dev}.{file_stat.st_ino}"
+        f".{file_stat.st_size}.{file_stat.st_mtime_ns}"
+    )
+
+
+def _get_expiry() -> int:
+    return int(
+        timedelta(
+            days=settings.ROOT_CONFIG.indexer.metadata_cache_expiry
+        ).total_seconds()
+    )
+
+
+def _mark_used(key: str, expiry: int):
+    """Extend entry expiry & move it to the recent end of LRU"""
+    client = get_redis_connection("default")
+    with client.pipeline(transaction=False) as pipe:
+        pipe.expire(cache.make_key(key), expiry)
+        pipe.zadd(cache.make_key(_LRU_KEY), {key: time.time()})
+        pipe.execute()
+
+
+def _trim(expiry: int):
+    """Evict least recently used entries beyond the size limit"""
+    client = get_redis_connection("default")
+    lru_key = cache.make_key(_LRU_KEY)
+    with client.pipeline(transaction=False) as pipe:
+        pipe.zremrangebyscore(lru_key, "-inf", time.time() - expiry)  # Expired
+        pipe.zcard(lru_key)
+        _, count = pipe.execute()
+    overflow = count - settings.ROOT_CONFIG.indexer.metadata_cache_size
+    if overflow > 0:
+        evicted = client.zpopmin(lru_key, overflow)
+        cache.delete_many([key.decode() for key, _ in evicted])
+
+
+def get_cached_metadata(file_stat: os.stat_result) -> Tuple[bool, Dict[str, Any]]:
+    """Get cached metadata, returns (found, metadata)"""
+    key = _get_key(file_stat)
+    value = cache.get(key)
+    if value is None:
+        return False, None
+    _mark_used(key, _get_expiry())
+    return True, value["metadata"]
+
+
+def set_cached_metadata(file_stat: os.stat_result, metadata: Dict[str, Any]):
+    """Cache metadata, least recently used entries are evicted once the cache
+    is full, unused entries also expire"""
+    key = _get_key(file_stat)
+    expiry = _get_expiry()
+    cache.set(key, {"metadata": metadata}, timeout=expiry)
+    _mark_used(key, expiry)
+    _trim(expiry)
+
+
+def record_metadata_cache_stats(hits: int, misses: int):
+    """Add to hit/miss counters"""
+    for key, value in ((_HITS_KEY, hits), (_MISSES_KEY, misses)):
+        if not value:
+            continue
+        try:
+            cache.incr(key, value)
+        except ValueError:
+            cache.set(key, value, timeout=None)
+
+
+def get_metadata_cache_stats() -> Dict[str, int]:
+    """Get hit/miss counters"""
+    values = cache.get_many([_HITS_KEY, _MISSES_KEY])
+    return {
+        "hits": values.get(_HITS_KEY, 0),
+        "misses": values.get(_MISSES_KEY, 0),
+    }
+
+
+def clear_metadata_cache():
+    """Remove all cached metadata & counters"""
+    cache.delete_pattern(f"{_KEY_PREFIX}*")
@@ -0,0 +1,67 @@
+from typing import Dict
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+
+from rpidrive.models import VolumeUser
+
+_KEY_PREFIX = "volume-permission"
+_EXPIRY = 60 * 60  # seconds
+
+
+def _get_key(user_pk: int) -> str:
+    return f"{_KEY_PREFIX}.{user_pk}"
+
+
+def get_volume_permissions(user_pk: int) -> Dict[str, int]:
+    """Get permission level of user per volume ID, volumes without access are left out"""
+    key = _get_key(user_pk)
+    permissions = cache.get(key)
+    if permissions is None:
+        permissions = {
+            str(volume_pk): permission
+            for volume_pk, permission in VolumeUser.objects.filter(
+                user_id=user_pk
+            ).values_list("volume_id", "permission")
+        }
+        cache.set(key, permissions, timeout=_EXPIRY)
+    return permissions
+
+
+def clear_volume_permissions(user_pk: int = None):
+    """Drop cached permissions of user, or of all users.
+
+    Dropped again on commit, so a concurrent request can't keep the old value.
+    """
+    pattern = _get_key(user_pk if user_pk is not None else "*")
+
+    def clear():
+        if user_pk is None:
+            cache.delete_pattern(pattern)
+        else:
+            cache.delete(pattern)
+
+    clear()
+    transaction.on_commit(clear)
+
+
+def _on_user_change(instance: User, **_kwargs):
+    clear_volume_permissions(instance.pk)
+
+
+def _on_volume_user_change(instance: VolumeUser, **_kwargs):
+    clear_volume_permissions(instance.user_id)
+
+
+def connect_signals():
+    """Drop cached permissions on any save or delete, including from Django admin.
+
+    Bulk operations send no signals, their callers clear the cache.
+    """
+    for signal in (post_save, post_delete):
+        signal.connect(_on_user_change, sender=User, dispatch_uid=_KEY_PREFIX)
+        signal.connect(
+            _on_volume_user_change, sender=VolumeUser, dispatch_uid=_KEY_PREFIX
+        )
@@ -0,0 +1,165 @@
+import base64
+import io
+import logging
+import os
+import shutil
+import tempfile
+
+from typing import IO, Optional, Union
+
+import epub_meta
+from django.conf import settings
+from django.core.cache import cache
+from PIL import Image, ImageOps
+from pypdf import PdfReader
+from tinytag import TinyTag
+
+from rpidrive.models import File
+
+logger = logging.getLogger(__name__)
+
+_SIZE_KEY = "thumbnail-stats.size"
+_MIN_ENTRY_SIZE = 4096  # bytes, so empty entries count toward the limit
+_EVICT_RATIO = 0.9  # of cache size to keep after eviction
+
+THUMBNAIL_MEDIA_TYPE_RE = r"^(image/|audio/|application/pdf$|application/epub\+zip$)"
+
+
+def _get_cache_dir() -> str:
+    config = settings.ROOT_CONFIG
+    return config.thumbnail.dir or os.path.join(config.web.temp_dir, "thumbnails")
+
+
+def _get_cache_path(file: File) -> str:
+    """Path changes when file is modified or thumbnail size is changed"""
+    mtime = int(file.last_modified.timestamp() * 1000000) if file.last_modified else 0
+    return os.path.join(
+        _get_cache_dir(),
+        f"{file.pk.hex}-{mtime:x}-{settings.ROOT_CONFIG.thumbnail.size}.jpg",
+    )
+
+
+def _get_cache_limit() -> int:
+    return settings.ROOT_CONFIG.thumbnail.cache_size * 1024 * 1024
+
+
+def _get_source_image(
+    media_type: str, file_path: str
+) -> Optional[Union[str, IO[bytes]]]:
+    """Get image to make thumbnail from"""
+    if media_type.startswith("image/"):
+        return file_path
+    if media_type.startswith("audio/"):
+        image = TinyTag.get(file_path, image=True).images.front_cover
+        return io.BytesIO(image.data) if image else None
+    if media_type == "application/pdf":
+        images = PdfReader(file_path).pages[0].images  # pylint: disable=no-member
+        if images:  # Largest image on first page, usually the cover
+            return io.BytesIO(max((x.data for x in images), key=len))
+    if media_type == "application/epub+zip":
+        content = epub_meta.get_epub_metadata(
+            file_path, read_cover_image=True, read_toc=False
+        ).cover_image_content
+        return io.BytesIO(base64.b64decode(content)) if content else None
+    return None
+
+
+def _create_thumbnail(media_type: str, file_path: str) -> bytes:
+    """Create JPEG thumbnail, empty if file has no preview"""
+    try:
+        source = _get_source_image(media_type, file_path)
+        if source is None:
+            return b""
+        with Image.open(source) as image:
+            size = settings.ROOT_CONFIG.thumbnail.size
+            # JPEG is decoded at reduced scale, only the small image is rotated.
+            image.draft("RGB", (size, size))
+            image.thumbnail((size, size))
+            image = ImageOps.exif_transpose(image)
+            if image.mode != "RGB":
+                image = image.convert("RGB")
+            output = io.BytesIO()
+            image.save(output, "JPEG", quality=80)
+            return output.getvalue()
+    except:  # pylint: disable=bare-except
+        logger.exception("Error creating thumbnail of %s", file_path)
+    return b""
+
+
+def _get_entry_size(size: int) -> int:
+    return max(size, _MIN_ENTRY_SIZE)
+
+
+def _evict():
+    """Remove least recently used thumbnails until below limit"""
+    entries = []
+    with os.scandir(_get_cache_dir()) as it:
+        for entry in it:
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, _get_entry_size(stat.st_size), entry.path))
+
+    total = sum(x[1] for x in entries)
+    limit = _get_cache_limit() * _EVICT_RATIO
+    entries.sort()
+    for _, size, path in entries:
+        if total <= limit:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+    cache.set(_SIZE_KEY, total, timeout=None)
+
+
+def _add_to_cache(path: str, data: bytes):
+    cache_dir = _get_cache_dir()
+    os.makedirs(cache_dir, exist_ok=True)
+    f_d, temp_path = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+    with os.fdopen(f_d, "wb") as f_h:
+        f_h.write(data)
+    os.replace(temp_path, path)
+
+    try:
+        total = cache.incr(_SIZE_KEY, _get_entry_size(len(data)))
+    except ValueError:  # Counter is lost, count again
+        total = None
+    if total is None or total > _get_cache_limit():
+        _evict()
+
+
+def get_thumbnail(file: File, file_path: str) -> Optional[bytes]:
+    """Get JPEG thumbnail from cache, created on cache miss"""
+    path = _get_cache_path(file)
+    try:
+        with open(path, "rb") as f_h:
+            data = f_h.read()
+        os.utime(path)  # Eviction goes by last use
+    except FileNotFoundError:
+        data = _create_thumbnail(file.media_type or "", file_path)
+        _add_to_cache(path, data)
+    return data or None
+
+
+def get_thumbnail_cache_size() -> int:
+    """Get size of thumbnail cache in bytes"""
+    return cache.get(_SIZE_KEY, 0)
+
+
+def pregenerate_thumbnail(file: File, file_path: str) -> bool:
+    """Create thumbnail if missing, returns False once cache is full"""
+    if get_thumbnail_cache_size() >= _get_cache_limit() * _EVICT_RATIO:
+        return False
+    path = _get_cache_path(file)
+    if not os.path.exists(path):
+        _add_to_cache(path, _create_thumbnail(file.media_type or "", file_path))
+    return True
+
+
+def clear_thumbnail_cache():
+    """Remove all cached thumbnails & size counter"""
+    shutil.rmtree(_get_cache_dir(), ignore_errors=True)
+    cache.delete(_SIZE_KEY)
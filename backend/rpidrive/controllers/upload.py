@@ -0,0 +1,254 @@
+import logging
+import os
+
+from datetime import timedelta
+from typing import BinaryIO, Optional, Tuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import DatabaseError, transaction
+from django.http import UnreadablePostError
+from django.utils import timezone
+
+from rpidrive.controllers.exceptions import (
+    InvalidFileNameException,
+    InvalidOperationRequestException,
+    ObjectNotFoundException,
+)
+from rpidrive.controllers.file import get_file
+from rpidrive.controllers.local_file import (
+    UPLOAD_STAGING_DIR,
+    create_entry,
+    create_folder,
+    generate_new_file_name,
+    get_full_path,
+    move_staged_file,
+)
+from rpidrive.controllers.volume import check_volume_permission
+from rpidrive.models import (
+    File,
+    FileKindEnum,
+    UploadSession,
+    Volume,
+    VolumeKindEnum,
+    VolumePermissionEnum,
+)
+
+logger = logging.getLogger(__name__)
+
+_CHUNK_SIZE = 1024 * 1024  # bytes
+# Write claim of a session is renewed while data is received, a claim not
+# renewed within this time is left by a stopped request & can be taken over.
+_WRITE_TIMEOUT = timedelta(seconds=60)
+
+
+class UploadSessionNotFoundException(ObjectNotFoundException):
+    """Upload session not found exception"""
+
+
+class InvalidUploadOffsetException(Exception):
+    """Invalid upload offset exception"""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(message)
+        self.offset = offset
+
+
+def _get_staging_path(volume: Volume, session_pk: str) -> str:
+    return os.path.join(volume.path, UPLOAD_STAGING_DIR, str(session_pk))
+
+
+def create_upload_session(
+    user: User, parent_pk: str, path: str, size: int
+) -> UploadSession:
+    """Create upload session, data is staged in the volume until complete"""
+    names = [x.strip() for x in path.split(os.path.sep)]
+    if any(x in ("", ".", "..") for x in names):
+        raise InvalidFileNameException("Invalid file path.")
+
+    with transaction.atomic():
+        parent = get_file(user, parent_pk, ["volume"], [], True)
+        if parent.kind == FileKindEnum.FILE:
+            raise InvalidOperationRequestException("Unable to upload files to file.")
+        if parent.volume.kind != VolumeKindEnum.HOST_PATH:
+            raise NotImplementedError()
+
+        session = UploadSession.objects.create(
+            parent=parent,
+            creator=user,
+            path=os.path.sep.join(names),
+            size=size,
+            expire_time=timezone.now()
+            + timedelta(hours=settings.ROOT_CONFIG.web.upload_expiry),
+        )
+        staging_path = _get_staging_path(parent.volume, session.pk)
+        os.makedirs(os.path.dirname(staging_path), exist_ok=True)
+        with open(staging_path, "wb"):
+            pass
+    return session
+
+
+def get_upload_session(user: User, session_pk: str, lock=False) -> UploadSession:
+    """Get upload session created by user"""
+    sessions = UploadSession.objects.filter(
+        pk=session_pk, creator=user, expire_time__gt=timezone.now()
+    ).select_related("parent", "parent__volume")
+    if lock:
+        try:
+            session = sessions.select_for_update(nowait=True, of=("self",)).first()
+        except DatabaseError as exc:
+            raise InvalidOperationRequestException("Upload is in progress.") from exc
+    else:
+        session = sessions.first()
+    if not session:
+        raise UploadSessionNotFoundException("Upload session not found.")
+    check_volume_permission(
+        user, session.parent.volume_id, VolumePermissionEnum.READ_WRITE
+    )
+    if (
+        lock
+        and session.write_time
+        and session.write_time > (timezone.now() - _WRITE_TIMEOUT)
+    ):
+        raise InvalidOperationRequestException("Upload is in progress.")
+    return session
+
+
+def _finalize_upload(session: UploadSession) -> File:
+    """Move staged data to its path & create the file entry"""
+    names = session.path.split(os.path.sep)
+    curr_parent = session.parent
+    for name in names[:-1]:
+        curr_parent = create_folder(curr_parent, name, True)
+    sibling_names = set(curr_parent.children.values_list("name", flat=True))
+    filename = generate_new_file_name(names[-1], sibling_names)
+
+    parent_path = get_full_path(curr_parent)
+    dest_fp = os.path.abspath(os.path.join(parent_path, filename))
+    if os.path.dirname(dest_fp) != os.path.abspath(parent_path):
+        raise InvalidFileNameException("Invalid character in file name.")
+    staging_path = _get_staging_path(session.parent.volume, session.pk)
+    move_staged_file(staging_path, dest_fp)
+    os.chmod(dest_fp, 0o744)
+
+    file = create_entry(session.parent.volume, curr_parent, dest_fp)
+    session.delete()
+    return file
+
+
+def _renew_write_claim(session: UploadSession):
+    """Renew write claim before it times out, raises if it was taken over"""
+    now = timezone.now()
+    if now - session.write_time < _WRITE_TIMEOUT / 2:
+        return
+    if not UploadSession.objects.filter(
+        pk=session.pk, write_time=session.write_time
+    ).update(write_time=now):
+        raise InvalidOperationRequestException("Upload was taken over.")
+    session.write_time = now
+
+
+def write_upload_session(
+    user: User, session_pk: str, offset: int, stream: BinaryIO
+) -> Tuple[int, Optional[File]]:
+    """Write data at offset, returns new offset & the file once all data is received.
+
+    Data is received outside of transaction, so slow clients don't hold the
+    row lock & a DB connection. The session is claimed for writing instead.
+    """
+    with transaction.atomic():
+        session = get_upload_session(user, session_pk, True)
+        if offset != session.offset:
+            raise InvalidUploadOffsetException(
+                "Offset doesn't match upload.", session.offset
+            )
+        session.write_time = timezone.now()
+        session.save(update_fields=["write_time"])
+
+    error = None
+    written = 0
+    try:
+        staging_path = _get_staging_path(session.parent.volume, session.pk)
+        with open(staging_path, "r+b") as f_h:
+            f_h.seek(offset, os.SEEK_SET)
+            remaining = session.size - offset
+            while remaining > 0:
+                chunk = stream.read(min(_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                _renew_write_claim(session)
+                f_h.write(chunk)
+                written += len(chunk)
+                remaining -= len(chunk)
+        if remaining <= 0 and stream.read(1):
+            error = InvalidOperationRequestException("Data exceeds upload size.")
+    except (OSError, UnreadablePostError) as exc:  # i.e. connection dropped
+        logger.warning("Upload %s interrupted: %s", session.pk, exc)
+        error = exc
+
+    with transaction.atomic():
+        claimed = (
+            UploadSession.objects.select_for_update(of=("self",))
+            .select_related("parent", "parent__volume")
+            .filter(pk=session.pk, write_time=session.write_time)
+            .first()
+        )
+        if not claimed:  # i.e. deleted after claim timed out
+            raise InvalidOperationRequestException("Upload was taken over.")
+        # Received data is kept, so upload can resume from here.
+        claimed.offset = offset + written
+        claimed.write_time = None
+        claimed.save(update_fields=["offset", "write_time"])
+        file = None
+        if not error and claimed.offset == claimed.size:
+            file = _finalize_upload(claimed)
+
+    if error:
+        raise error
+    return claimed.offset, file
+
+
+def delete_upload_session(user: User, session_pk: str):
+    """Cancel upload session"""
+    with transaction.atomic():
+        session = get_upload_session(user, session_pk, True)
+        staging_path = _get_staging_path(session.parent.volume, session.pk)
+        session.delete()
+    if os.path.exists(staging_path):
+        os.remove(staging_path)
+
+
+def clean_upload_sessions():
+    """Remove expired upload sessions & stale staged data without session"""
+    now = timezone.now()
+    expired = UploadSession.objects.filter(expire_time__lte=now).select_related(
+        "parent__volume"
+    )
+    for session in expired:
+        staging_path = _get_staging_path(session.parent.volume, session.pk)
+        if os.path.exists(staging_path):
+            os.remove(staging_path)
+    expired.delete()
+    # Form uploads are staged here too while received, so only stale ones go.
+    stale_before = (
+        now - timedelta(hours=settings.ROOT_CONFIG.web.upload_expiry)
+    ).timestamp()
+    for volume in Volume.objects.filter(kind=VolumeKindEnum.HOST_PATH):
+        staging_dir = os.path.join(volume.path, UPLOAD_STAGING_DIR)
+        if not os.path.isdir(staging_dir):
+            continue
+        session_pks = {
+            str(x)
+            for x in UploadSession.objects.filter(parent__volume=volume).values_list(
+                "pk", flat=True
+            )
+        }
+        with os.scandir(staging_dir) as entries:
+            for entry in entries:
+                if entry.name in session_pks:
+                    continue
+                try:
+                    if entry.stat().st_mtime < stale_before:
+                        os.remove(entry.path)
+                except FileNotFoundError:  # i.e. upload just completed
+                    pass
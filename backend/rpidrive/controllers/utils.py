@@ -1,19 +1,80 @@
 import os
 import re
 
-# https://stackoverflow.com/questions/33208849/python-django-streaming-video-mp4-file-using-httpresponse/33964547
+from typing import List, Optional, Tuple
+
+_range_spec_re = re.compile(r"^\s*(\d*)\s*-\s*(\d*)\s*$")
+_MAX_RANGES = 32
+
+
+def parse_range_header(header: str, size: int) -> Optional[List[Tuple[int, int]]]:
+    """Parse Range header into inclusive byte ranges.
+
+    Returns None if the header is missing or malformed, so the full file is
+    served, and an empty list if no range is satisfiable.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return None
+    specs = spec.split(",")
+    if len(specs) > _MAX_RANGES:
+        return None
+
+    ranges = []
+    for range_spec in specs:
+        match = _range_spec_re.match(range_spec)
+        if not match or match.groups() == ("", ""):
+            return None
+        first_byte, last_byte = match.groups()
+        if not first_byte:  # Last N bytes
+            if int(last_byte) > 0 and size > 0:
+                ranges.append((max(size - int(last_byte), 0), size - 1))
+            continue
+        if last_byte and int(last_byte) < int(first_byte):
+            return None
+        if int(first_byte) < size:
+            last_byte = int(last_byte) if last_byte else size - 1
+            ranges.append((int(first_byte), min(last_byte, size - 1)))
+    return ranges
 
-range_re = re.compile(r"bytes\s*=\s*(\d+)\s*-\s*(\d*)", re.I)
+
+# https://stackoverflow.com/questions/33208849/python-django-streaming-video-mp4-file-using-httpresponse/33964547
 
 
 class RangeFileWrapper:
-    """Wrapper for files returned in a byte range"""
+    """Wrapper for files returned in a byte range.
+
+    Chunk size doubles after every read up to max_chunk_size, so short reads
+    (i.e. seeking) stay small while long downloads need fewer iterations.
+    """
 
-    def __init__(self, filelike, chunk_size=8192, offset=0, length=None):
+    def __init__(
+        self, filelike, chunk_size=8192, offset=0, length=None, max_chunk_size=None
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
         self.filelike = filelike
         self.filelike.seek(offset, os.SEEK_SET)
         self.remaining = length
         self.chunk_size = chunk_size
+        self.max_chunk_size = max(max_chunk_size or chunk_size, chunk_size)
+        self._advise(offset, length or 0, "POSIX_FADV_SEQUENTIAL")
+
+    def _advise(self, offset: int, length: int, advice: str):
+        """Give access pattern hint to kernel, if supported"""
+        if not hasattr(os, "posix_fadvise") or not hasattr(self.filelike, "fileno"):
+            return
+        try:
+            os.posix_fadvise(
+                self.filelike.fileno(), offset, length, getattr(os, advice)
+            )
+        except (OSError, ValueError):
+            pass
+
+    def _read(self, size: int) -> bytes:
+        data = self.filelike.read(size)
+        self.chunk_size = min(self.chunk_size * 2, self.max_chunk_size)
+        if data:
+            self._advise(self.filelike.tell(), self.chunk_size, "POSIX_FADV_WILLNEED")
+        return data
 
     def close(self):
         """Close response"""
@@ -25,14 +86,14 @@ class RangeFileWrapper:
 
     def __next__(self):
         if self.remaining is None:
-            data = self.filelike.read(self.chunk_size)
+            data = self._read(self.chunk_size)
             if data:
                 return data
             raise StopIteration()
 
         if self.remaining <= 0:
             raise StopIteration()
-        data = self.filelike.read(min(self.remaining, self.chunk_size))
+        data = self._read(min(self.remaining, self.chunk_size))
         if not data:
             raise StopIteration()
         self.remaining -= len(data)
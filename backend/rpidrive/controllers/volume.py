@@ -20,6 +20,10 @@ from rpidrive.controllers.exceptions import (
     NoPermissionException,
     ObjectNotFoundException,
 )
+from rpidrive.controllers.permission_cache import (
+    clear_volume_permissions,
+    get_volume_permissions,
+)
 from rpidrive.models import (
     File,
     FileKindEnum,
@@ -53,31 +57,35 @@ logger = logging.getLogger(__name__)
 
 
 def _get_volume_permission(
-    volume: Volume,
+    volume_id: str,
     user: User,
 ) -> int:
     if user.is_superuser:
         return VolumePermissionEnum.ADMIN.value
-    role = volume.volumeuser_set.filter(user=user).first()
-    if not role:
-        return VolumePermissionEnum.NONE.value
-    return role.permission
+    return get_volume_permissions(user.pk).get(
+        str(volume_id), VolumePermissionEnum.NONE.value
+    )
+
+
+def check_volume_permission(user: User, volume_id: str, min_level: int):
+    """Check volume permissions without loading the volume"""
+    level = _get_volume_permission(volume_id, user)
+    if level == VolumePermissionEnum.NONE:
+        raise VolumeNotFoundException("Volume not found.")
+    if level < min_level:
+        raise NoPermissionException("No permission.")
 
 
 def request_volume(user: User, volume_id: str, min_level: int, write: bool) -> Volume:
     """Request volume with permissions"""
-    volume = Volume.objects.filter(pk=volume_id).prefetch_related("volumeuser_set")
+    check_volume_permission(user, volume_id, min_level)
+
+    volume = Volume.objects.filter(pk=volume_id)
     if write:
         volume = volume.select_for_update(of=("self",))
     volume = volume.first()
-
     if not volume:
         raise VolumeNotFoundException("Volume not found.")
-    level = _get_volume_permission(volume, user)
-    if level == VolumePermissionEnum.NONE:
-        raise VolumeNotFoundException("Volume not found.")
-    if level < min_level:
-        raise NoPermissionException("No permission.")
     return volume
 
 
@@ -114,13 +122,11 @@ def get_volumes(user: User) -> QuerySet:
     """Get viewable volumes by user"""
     if user.is_superuser:
         return Volume.objects
-    volume_pks = list(
-        VolumeUser.objects.filter(
-            Q(user=user) & Q(permission__gte=VolumePermissionEnum.READ)
-        )
-        .values_list("volume_id", flat=True)
-        .distinct()
-    )
+    volume_pks = [
+        volume_pk
+        for volume_pk, permission in get_volume_permissions(user.pk).items()
+        if permission >= VolumePermissionEnum.READ
+    ]
     return Volume.objects.filter(pk__in=volume_pks)
 
 
@@ -152,7 +158,7 @@ def update_volume_permission(
     """Update volume permission"""
     with transaction.atomic():
         volume = request_volume(user, p_k, VolumePermissionEnum.ADMIN, True)
-        role = _get_volume_permission(volume, user)
+        role = _get_volume_permission(volume.pk, user)
 
         volume.volumeuser_set.all().delete()
         new_entries = [
@@ -166,6 +172,8 @@ def update_volume_permission(
             for entry in permissions
         ]
         VolumeUser.objects.bulk_create(new_entries, batch_size=settings.BULK_BATCH_SIZE)
+        # bulk_create sends no signal, users being granted access are cleared here.
+        clear_volume_permissions()
 
 
 def delete_volume(user: User, p_k: str):
@@ -0,0 +1,225 @@
+import ctypes
+import ctypes.util
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import time
+
+from typing import Dict, Iterable, Set, Tuple
+
+from rpidrive.controllers.local_file import (
+    get_descendants,
+    perform_folder_index,
+    perform_shallow_index,
+)
+from rpidrive.models import File, FileKindEnum, Volume
+
+logger = logging.getLogger(__name__)
+
+# From <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_FROM = 0x00000040
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE = 0x00000200
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ONLYDIR = 0x01000000
+_IN_DONT_FOLLOW = 0x02000000
+_IN_EXCL_UNLINK = 0x04000000
+_IN_ISDIR = 0x40000000
+
+_WATCH_MASK = (
+    _IN_CLOSE_WRITE
+    | _IN_MOVED_FROM
+    | _IN_MOVED_TO
+    | _IN_CREATE
+    | _IN_DELETE
+    | _IN_ONLYDIR
+    | _IN_DONT_FOLLOW
+    | _IN_EXCL_UNLINK
+)
+_EVENT_HEADER = struct.Struct("iIII")
+_READ_SIZE = 64 * 1024
+
+
+class WatcherNotSupportedException(Exception):
+    """Watcher not supported exception"""
+
+
+class VolumeWatcher:  # pylint: disable=too-many-instance-attributes
+    """Watch folders of volumes with inotify & index the changed folders.
+
+    Events are coalesced until there is no new event for debounce seconds.
+    The periodic index stays as fallback, i.e. on event queue overflow or
+    when the watch limit is reached.
+    """
+
+    def __init__(self, debounce: float):
+        if not sys.platform.startswith("linux"):
+            raise WatcherNotSupportedException("inotify is only available on Linux.")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise WatcherNotSupportedException(os.strerror(ctypes.get_errno()))
+
+        self.debounce = debounce
+        self._watches: Dict[int, Tuple[str, str]] = {}  # wd -> (volume id, path)
+        self._volume_paths: Dict[str, str] = {}
+        self._changed: Set[Tuple[str, str]] = set()
+        self._created: Set[Tuple[str, str]] = set()
+        self._last_event = None
+
+    def close(self):
+        """Stop watching"""
+        os.close(self._fd)
+
+    def _add_watch(self, volume_id: str, path: str) -> bool:
+        wd = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(path), ctypes.c_uint32(_WATCH_MASK)
+        )
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                logger.warning(
+                    "inotify watch limit reached, changes in %s rely on "
+                    "periodic index. Raise fs.inotify.max_user_watches to fix.",
+                    path,
+                )
+                return False
+            if err not in {errno.ENOENT, errno.ENOTDIR}:
+                logger.warning("Unable to watch %s: %s", path, os.strerror(err))
+            return True
+        self._watches[wd] = (volume_id, path)
+        return True
+
+    def _remove_volume(self, volume_id: str):
+        for wd, (watch_volume_id, _path) in list(self._watches.items()):
+            if watch_volume_id == volume_id:
+                self._libc.inotify_rm_watch(self._fd, wd)
+                del self._watches[wd]
+        self._volume_paths.pop(volume_id, None)
+
+    def _get_path(self, volume_id: str, path_from_vol: str) -> str:
+        return self._volume_paths[volume_id] + path_from_vol.rstrip(os.path.sep)
+
+    def watch_folder(self, folder: File):
+        """Watch folder & its subfolders that are in database"""
+        volume_id = str(folder.volume_id)
+        paths = get_descendants(folder.volume_id, folder.path_from_vol).filter(
+            kind=FileKindEnum.FOLDER
+        )
+        if not self._add_watch(
+            volume_id, self._get_path(volume_id, folder.path_from_vol)
+        ):
+            return
+        for path in paths.values_list("path_from_vol", flat=True).iterator():
+            if not self._add_watch(volume_id, self._get_path(volume_id, path)):
+                return
+
+    def watch_volume(self, volume: Volume):
+        """Watch all folders of volume, call again after indexing"""
+        volume_id = str(volume.pk)
+        if self._volume_paths.get(volume_id, volume.path) != volume.path:
+            self._remove_volume(volume_id)
+        self._volume_paths[volume_id] = volume.path
+        root = File.objects.filter(volume=volume, parent=None).first()
+        if root:
+            self.watch_folder(root)
+
+    def sync(self, volumes: Iterable[Volume]):
+        """Watch new volumes & stop watching volumes that are not in the list"""
+        volume_ids = set()
+        for volume in volumes:
+            volume_ids.add(str(volume.pk))
+            if str(volume.pk) not in self._volume_paths:
+                self.watch_volume(volume)
+        for volume_id in list(self._volume_paths.keys()):
+            if volume_id not in volume_ids:
+                self._remove_volume(volume_id)
+
+    def _read_events(self):
+        try:
+            data = os.read(self._fd, _READ_SIZE)
+        except BlockingIOError:
+            return
+        offset = 0
+        while offset < len(data):
+            wd, mask, _cookie, name_len = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + name_len].rstrip(b"\0"))
+            offset += name_len
+            self._handle_event(wd, mask, name)
+        self._last_event = time.monotonic()
+
+    def _handle_event(self, wd: int, mask: int, name: str):
+        if mask & _IN_Q_OVERFLOW:
+            logger.warning("inotify queue overflowed, schedule full index.")
+            Volume.objects.filter(pk__in=self._volume_paths.keys()).update(
+                indexing=True
+            )
+            return
+        if wd not in self._watches:
+            return
+        if mask & _IN_IGNORED:  # Folder is gone
+            del self._watches[wd]
+            return
+
+        volume_id, path = self._watches[wd]
+        self._changed.add((volume_id, path))
+        if mask & _IN_ISDIR and mask & (_IN_CREATE | _IN_MOVED_TO):
+            self._created.add((volume_id, os.path.join(path, name)))
+
+    def _get_folder(self, volume_id: str, path: str) -> File:
+        path_from_vol = path[len(self._volume_paths[volume_id]) :] or os.path.sep
+        return (
+            File.objects.filter(
+                volume_id=volume_id,
+                kind=FileKindEnum.FOLDER,
+                path_from_vol=path_from_vol,
+            )
+            .select_related("volume")
+            .first()
+        )
+
+    def apply_changes(self):
+        """Index folders with changes"""
+        changed, self._changed = self._changed, set()
+        created, self._created = self._created, set()
+        # Parent goes first, so new folders are in database.
+        for volume_id, path in sorted(changed, key=lambda x: len(x[1])):
+            try:
+                folder = self._get_folder(volume_id, path)
+                if folder:
+                    perform_shallow_index(folder)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to index %s", path)
+        for volume_id, path in sorted(created, key=lambda x: len(x[1])):
+            try:
+                folder = self._get_folder(volume_id, path)
+                if folder:
+                    perform_folder_index(folder)
+                    self.watch_folder(folder)
+            except Exception:  # pylint: disable=broad-exception-caught
+                logger.exception("Failed to index %s", path)
+
+    def wait(self, timeout: float):
+        """Wait for events & apply them once they settle"""
+        deadline = time.monotonic() + timeout
+        while True:
+            now = time.monotonic()
+            has_pending = self._changed or self._created
+            if has_pending and now - self._last_event >= self.debounce:
+                self.apply_changes()
+                continue
+            if now >= deadline:
+                return
+            wait_time = deadline - now
+            if has_pending:
+                wait_time = min(wait_time, self._last_event + self.debounce - now)
+            readable, _, _ = select.select([self._fd], [], [], wait_time)
+            if readable:
+                self._read_events()
@@ -0,0 +1,320 @@
+import struct
+import time
+import zlib
+
+from typing import BinaryIO, Iterable, List, Optional, Tuple
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+_FLAG_DATA_DESCRIPTOR = 0x08
+_FLAG_UTF8 = 0x800
+_VERSION = 20
+_VERSION_ZIP64 = 45
+_MADE_BY_UNIX = 3 << 8
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_RECORD = struct.Struct("<IHHHHIIH")
+_ZIP64_END_RECORD = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_END_LOCATOR = struct.Struct("<IIQI")
+
+
+class _Entry:  # pylint: disable=too-few-public-methods,too-many-instance-attributes
+    """Entry written to the archive, kept for the central directory"""
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        name: bytes,
+        dos_time: Tuple[int, int],
+        compress_type: int,
+        offset: int,
+        mode: int,
+        zip64: bool,
+    ):
+        self.name = name
+        self.dos_time = dos_time
+        self.compress_type = compress_type
+        self.offset = offset
+        self.mode = mode
+        self.zip64 = zip64
+        self.crc = 0
+        self.file_size = 0
+        self.compress_size = 0
+
+
+def _get_dos_time(mtime: float) -> Tuple[int, int]:
+    date_time = time.localtime(mtime)
+    if date_time.tm_year < 1980:
+        return 0, (0 << 9) | (1 << 5) | 1
+    return (
+        (date_time.tm_hour << 11) | (date_time.tm_min << 5) | (date_time.tm_sec // 2),
+        ((date_time.tm_year - 1980) << 9) | (date_time.tm_mon << 5) | date_time.tm_mday,
+    )
+
+
+class ZipStreamWriter:
+    """Write ZIP archive sequentially, the output doesn't need to be seekable.
+
+    Sizes & CRC of entries follow their data in data descriptors, ZIP64
+    records are added when needed. Entries can be compressed by the caller,
+    i.e. in parallel, & written with write_compressed().
+    """
+
+    def __init__(self, fileobj: BinaryIO):
+        self._fp = fileobj
+        self._offset = 0
+        self._entries: List[_Entry] = []
+        self._closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_args):
+        self.close()
+
+    @property
+    def offset(self) -> int:
+        """Bytes written so far"""
+        return self._offset
+
+    def _write(self, data: bytes):
+        self._fp.write(data)
+        self._offset += len(data)
+
+    def _start_entry(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        arcname: str,
+        mtime: float,
+        compress_type: int,
+        max_size: int,
+        mode: int,
+    ) -> _Entry:
+        entry = _Entry(
+            arcname.encode("utf-8"),
+            _get_dos_time(mtime),
+            compress_type,
+            self._offset,
+            mode,
+            max_size >= _ZIP64_LIMIT,
+        )
+        extra = b""
+        size = 0
+        if entry.zip64:
+            extra = struct.pack("<HHQQ", 1, 16, 0, 0)
+            size = _ZIP64_LIMIT
+        self._write(
+            _LOCAL_HEADER.pack(
+                0x04034B50,
+                _VERSION_ZIP64 if entry.zip64 else _VERSION,
+                _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+                compress_type,
+                *entry.dos_time,
+                0,
+                size,
+                size,
+                len(entry.name),
+                len(extra),
+            )
+        )
+        self._write(entry.name)
+        self._write(extra)
+        return entry
+
+    def _end_entry(self, entry: _Entry):
+        if not entry.zip64 and max(entry.file_size, entry.compress_size) >= (
+            _ZIP64_LIMIT
+        ):
+            raise ValueError("Entry is larger than its declared size.")
+        size_format = "<IIQQ" if entry.zip64 else "<IIII"
+        self._write(
+            struct.pack(
+                size_format,
+                0x08074B50,
+                entry.crc,
+                entry.compress_size,
+                entry.file_size,
+            )
+        )
+        self._entries.append(entry)
+
+    def write_dir(self, arcname: str, mtime: float, mode: int = 0o40755):
+        """Write folder entry"""
+        entry = self._start_entry(arcname.rstrip("/") + "/", mtime, ZIP_STORED, 0, mode)
+        self._end_entry(entry)
+
+    def write_stream(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        arcname: str,
+        mtime: float,
+        chunks: Iterable[bytes],
+        max_size: int,
+        compress_type: int = ZIP_STORED,
+        compresslevel: int = 6,
+        mode: int = 0o100644,
+    ) -> Iterable[int]:
+        """Write file entry from data chunks, yields bytes read after each chunk.
+
+        max_size is the largest size data can have, it decides if ZIP64
+        records are needed.
+        """
+        if compress_type == ZIP_DEFLATED:
+            max_size += max_size // 1000 + 1024  # Worst case deflate overhead
+        entry = self._start_entry(arcname, mtime, compress_type, max_size, mode)
+        compressor = None
+        if compress_type == ZIP_DEFLATED:
+            compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+        for chunk in chunks:
+            entry.crc = zlib.crc32(chunk, entry.crc)
+            entry.file_size += len(chunk)
+            if compressor:
+                chunk = compressor.compress(chunk)
+            entry.compress_size += len(chunk)
+            self._write(chunk)
+            yield entry.file_size
+        if compressor:
+            chunk = compressor.flush()
+            entry.compress_size += len(chunk)
+            self._write(chunk)
+        self._end_entry(entry)
+
+    def write_compressed(  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self,
+        arcname: str,
+        mtime: float,
+        data: bytes,
+        crc: int,
+        file_size: int,
+        compress_type: int = ZIP_DEFLATED,
+        mode: int = 0o100644,
+    ):
+        """Write file entry with data compressed by compress_data()"""
+        entry = self._start_entry(
+            arcname, mtime, compress_type, max(file_size, len(data)), mode
+        )
+        self._write(data)
+        entry.crc = crc
+        entry.file_size = file_size
+        entry.compress_size = len(data)
+        self._end_entry(entry)
+
+    def _write_central_dir(self, entry: _Entry):
+        zip64_fields = []
+        file_size = entry.file_size
+        compress_size = entry.compress_size
+        offset = entry.offset
+        if file_size >= _ZIP64_LIMIT:
+            zip64_fields.append(file_size)
+            file_size = _ZIP64_LIMIT
+        if compress_size >= _ZIP64_LIMIT:
+            zip64_fields.append(compress_size)
+            compress_size = _ZIP64_LIMIT
+        if offset >= _ZIP64_LIMIT:
+            zip64_fields.append(offset)
+            offset = _ZIP64_LIMIT
+        extra = b""
+        if zip64_fields:
+            extra = struct.pack(
+                f"<HH{len(zip64_fields)}Q", 1, 8 * len(zip64_fields), *zip64_fields
+            )
+        version = _VERSION_ZIP64 if zip64_fields or entry.zip64 else _VERSION
+        is_dir = entry.name.endswith(b"/")
+        self._write(
+            _CENTRAL_HEADER.pack(
+                0x02014B50,
+                _MADE_BY_UNIX | version,
+                version,
+                _FLAG_DATA_DESCRIPTOR | _FLAG_UTF8,
+                entry.compress_type,
+                *entry.dos_time,
+                entry.crc,
+                compress_size,
+                file_size,
+                len(entry.name),
+                len(extra),
+                0,
+                0,
+                0,
+                (entry.mode << 16) | (0x10 if is_dir else 0),
+                offset,
+            )
+        )
+        self._write(entry.name)
+        self._write(extra)
+
+    def close(self):
+        """Write central directory, the output isn't closed"""
+        if self._closed:
+            return
+        self._closed = True
+        cd_offset = self._offset
+        for entry in self._entries:
+            self._write_central_dir(entry)
+        cd_size = self._offset - cd_offset
+        count = len(self._entries)
+
+        if (
+            count >= _ZIP64_COUNT_LIMIT
+            or cd_offset >= _ZIP64_LIMIT
+            or cd_size >= _ZIP64_LIMIT
+        ):
+            zip64_offset = self._offset
+            self._write(
+                _ZIP64_END_RECORD.pack(
+                    0x06064B50,
+                    _ZIP64_END_RECORD.size - 12,
+                    _MADE_BY_UNIX | _VERSION_ZIP64,
+                    _VERSION_ZIP64,
+                    0,
+                    0,
+                    count,
+                    count,
+                    cd_size,
+                    cd_offset,
+                )
+            )
+            self._write(_ZIP64_END_LOCATOR.pack(0x07064B50, 0, zip64_offset, 1))
+            count = min(count, _ZIP64_COUNT_LIMIT)
+            cd_size = min(cd_size, _ZIP64_LIMIT)
+            cd_offset = min(cd_offset, _ZIP64_LIMIT)
+        self._write(
+            _END_RECORD.pack(0x06054B50, 0, 0, count, count, cd_size, cd_offset, 0)
+        )
+
+
+def get_stored_size(entries: Iterable[Tuple[str, int]]) -> int:
+    """Get size of archive of (name, size) entries written without compression,
+    folder names end with /"""
+    offset = 0
+    cd_size = 0
+    count = 0
+    for arcname, size in entries:
+        name_size = len(arcname.encode("utf-8"))
+        zip64 = size >= _ZIP64_LIMIT
+        zip64_fields = 2 * zip64 + (offset >= _ZIP64_LIMIT)
+        offset += _LOCAL_HEADER.size + name_size + size
+        offset += 20 + 24 if zip64 else 16
+        cd_size += _CENTRAL_HEADER.size + name_size
+        if zip64_fields:
+            cd_size += 4 + 8 * zip64_fields
+        count += 1
+
+    size = offset + cd_size + _END_RECORD.size
+    if count >= _ZIP64_COUNT_LIMIT or offset >= _ZIP64_LIMIT or cd_size >= _ZIP64_LIMIT:
+        size += _ZIP64_END_RECORD.size + _ZIP64_END_LOCATOR.size
+    return size
+
+
+def compress_data(
+    file_path: str, compresslevel: int = 6, max_size: Optional[int] = None
+) -> Tuple[bytes, int, int]:
+    """Deflate file in memory for write_compressed(), returns data, crc & size.
+
+    zlib releases the GIL, so this runs in parallel in a thread pool.
+    """
+    compressor = zlib.compressobj(compresslevel, zlib.DEFLATED, -15)
+    with open(file_path, "rb") as f_h:
+        data = f_h.read() if max_size is None else f_h.read(max_size)
+    return compressor.compress(data) + compressor.flush(), zlib.crc32(data), len(data)
@@ -0,0 +1,81 @@
+import logging
+import os
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from rpidrive.controllers.utils import RangeFileWrapper
+
+
+class Command(BaseCommand):
+    """Benchmark download command"""
+
+    help = "Measure throughput & CPU time of file download chunking"
+    logger = logging.getLogger(__name__)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--path", help="File to read, a temp file if not given")
+        parser.add_argument(
+            "--size", type=int, default=1024, help="Temp file size in MiB"
+        )
+
+    @staticmethod
+    def _create_file(size: int) -> str:
+        block = os.urandom(1024 * 1024)
+        f_d, path = tempfile.mkstemp(dir=settings.ROOT_CONFIG.web.temp_dir)
+        with os.fdopen(f_d, "wb") as f_h:
+            for _ in range(size):
+                f_h.write(block)
+        return path
+
+    @staticmethod
+    def _drop_cache(path: str):
+        if not hasattr(os, "posix_fadvise"):
+            return
+        with open(path, "rb") as f_h:
+            os.posix_fadvise(f_h.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    def _measure(self, path: str, wrapper_kwargs: dict) -> str:
+        self._drop_cache(path)
+        start, start_cpu = time.perf_counter(), time.process_time()
+        total = 0
+        f_h = open(path, "rb")  # pylint: disable=consider-using-with
+        wrapper = RangeFileWrapper(f_h, **wrapper_kwargs)
+        try:
+            for data in wrapper:
+                total += len(data)
+        finally:
+            wrapper.close()
+        elapsed = time.perf_counter() - start
+        cpu = time.process_time() - start_cpu
+        gigabytes = total / 1024**3
+        return (
+            f"{total / 1024**2 / elapsed:10.1f} MiB/s "
+            f"{cpu / gigabytes if gigabytes else 0:8.3f} CPU s/GiB"
+        )
+
+    def handle(self, *args, **options):
+        """Handle command"""
+        path = options["path"] or self._create_file(options["size"])
+        try:
+            size = os.path.getsize(path)
+            web_config = settings.ROOT_CONFIG.web
+            configs = {
+                "8 KiB fixed": {"chunk_size": 8192},
+                "configured": {
+                    "chunk_size": web_config.download_chunk_size,
+                    "max_chunk_size": web_config.download_max_chunk_size,
+                },
+            }
+            ranges = {
+                "full": {},
+                "ranged": {"offset": size // 4, "length": size // 2},
+            }
+            for range_name, range_kwargs in ranges.items():
+                for config_name, config_kwargs in configs.items():
+                    result = self._measure(path, {**config_kwargs, **range_kwargs})
+                    self.logger.info("%-7s %-12s %s", range_name, config_name, result)
+        finally:
+            if not options["path"]:
+                os.remove(path)
@@ -0,0 +1,186 @@
+import ast
+import logging
+import os
+import shutil
+import subprocess
+import tempfile
+
+from collections import Counter
+from contextlib import contextmanager
+from types import ModuleType
+from typing import Callable, Dict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from rpidrive.controllers import local_file
+from rpidrive.models import File, FileKindEnum, Volume, VolumeKindEnum
+
+_COUNTED = ["stat", "lstat", "listdir", "scandir"]
+
+
+class _CountedDirEntry:  # pylint: disable=too-few-public-methods
+    """DirEntry proxy, stat() is a syscall only on first call per mode"""
+
+    def __init__(self, entry: os.DirEntry, counts: Counter):
+        self._entry = entry
+        self._counts = counts
+        self._stat_modes = set()
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def stat(self, *, follow_symlinks=True):
+        """Count & forward stat"""
+        if follow_symlinks not in self._stat_modes:
+            self._stat_modes.add(follow_symlinks)
+            self._counts["stat" if follow_symlinks else "lstat"] += 1
+        return self._entry.stat(follow_symlinks=follow_symlinks)
+
+
+class _CountedScandir:
+    """scandir iterator yielding counted entries"""
+
+    def __init__(self, iterator, counts: Counter):
+        self._iterator = iterator
+        self._counts = counts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self._iterator.close()
+
+    def __iter__(self):
+        for entry in self._iterator:
+            yield _CountedDirEntry(entry, self._counts)
+
+
+@contextmanager
+def _count_calls(counts: Counter):
+    """Count os stat & listing calls, os.path helpers call these too.
+
+    DirEntry type checks use d_type from the listing & are not counted.
+    """
+    originals = {x: getattr(os, x) for x in _COUNTED}
+
+    def counted(name):
+        def wrapper(*args, **kwargs):
+            counts[name] += 1
+            result = originals[name](*args, **kwargs)
+            if name == "scandir":
+                return _CountedScandir(result, counts)
+            return result
+
+        return wrapper
+
+    for name in _COUNTED:
+        setattr(os, name, counted(name))
+    try:
+        yield
+    finally:
+        for name, func in originals.items():
+            setattr(os, name, func)
+
+
+def _load_indexer(ref: str) -> ModuleType:
+    """Load local_file controller of git ref, i.e. the indexer before a change"""
+    try:
+        source = subprocess.run(
+            ["git", "show", f"{ref}:./{os.path.basename(local_file.__file__)}"],
+            cwd=os.path.dirname(local_file.__file__),
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError) as exc:
+        raise CommandError(f"Can't read indexer of {ref}.") from exc
+    module = ModuleType(f"rpidrive.controllers.local_file_{ref}")
+    for node in ast.parse(source).body:
+        code = compile(ast.Module([node], []), f"{ref}:local_file.py", "exec")
+        try:
+            exec(code, module.__dict__)  # pylint: disable=exec-used
+        except ImportError:
+            # Names removed since are used by other features, not indexing.
+            if not isinstance(node, (ast.Import, ast.ImportFrom)):
+                raise
+    return module
+
+
+class Command(BaseCommand):
+    """Benchmark index command"""
+
+    help = "Count stat & listing calls per file of volume indexing"
+    logger = logging.getLogger(__name__)
+
+    def add_arguments(self, parser):
+        parser.add_argument("--folders", type=int, default=50, help="Folder count")
+        parser.add_argument(
+            "--files", type=int, default=100, help="File count per folder"
+        )
+        parser.add_argument(
+            "--old-ref", help="Git ref of indexer to compare with, i.e. 82b8be3"
+        )
+
+    @staticmethod
+    def _create_tree(folders: int, files: int) -> str:
+        path = tempfile.mkdtemp(dir=settings.ROOT_CONFIG.web.temp_dir)
+        for i in range(folders):
+            folder_path = os.path.join(path, f"folder-{i}")
+            os.mkdir(folder_path)
+            for j in range(files):
+                # No extension, no metadata to extract.
+                with open(os.path.join(folder_path, f"file-{j}"), "wb") as f_h:
+                    f_h.write(b"a")
+        return path
+
+    def _report(self, name: str, counts: Counter, entries: int):
+        total = sum(counts.values())
+        details = " ".join(f"{x}={counts[x]}" for x in _COUNTED)
+        self.logger.info(
+            "%-10s %6d calls %6.2f per entry (%s)",
+            name,
+            total,
+            total / entries,
+            details,
+        )
+
+    @staticmethod
+    def _index(path: str, perform_index: Callable) -> Dict[str, Counter]:
+        """Count calls of first index & index of unchanged tree"""
+        counts = {x: Counter() for x in ("create", "update")}
+        with transaction.atomic():
+            volume = Volume.objects.create(
+                name="benchmark", kind=VolumeKindEnum.HOST_PATH, path=path
+            )
+            File.objects.create(
+                name="",
+                kind=FileKindEnum.FOLDER,
+                volume=volume,
+                path_from_vol=os.path.sep,
+            )
+            for name in counts:
+                with _count_calls(counts[name]):
+                    perform_index(volume)
+            transaction.set_rollback(True)
+        return counts
+
+    def handle(self, *args, **options):
+        """Handle command"""
+        indexers = {"new": local_file.perform_index}
+        if options["old_ref"]:
+            indexers = {
+                "old": getattr(_load_indexer(options["old_ref"]), "perform_index"),
+                **indexers,
+            }
+        old_workers = settings.ROOT_CONFIG.indexer.metadata_workers
+        settings.ROOT_CONFIG.indexer.metadata_workers = 0
+        path = self._create_tree(options["folders"], options["files"])
+        entries = options["folders"] * (options["files"] + 1)
+        try:
+            for indexer_name, indexer in indexers.items():
+                for name, counts in self._index(path, indexer).items():
+                    self._report(f"{indexer_name} {name}", counts, entries)
+        finally:
+            settings.ROOT_CONFIG.indexer.metadata_workers = old_workers
+            shutil.rmtree(path)
@@ -1,34 +1,98 @@
 import logging
+import multiprocessing
 import os
+import signal
+import sys
 import time
 import uuid
 from datetime import timedelta
+from typing import List
 
 from django.conf import settings
 from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
+from django.db import connections
 from django.db.models import Q
 from django.utils import timezone
 from names_generator import generate_name
+from rpidrive.controllers.job import claim_job, requeue_jobs, wait_job
 from rpidrive.controllers.local_file import (
     perform_index,
+    pregenerate_thumbnails,
     process_compress_job,
+    process_delete_job,
+    process_metadata_job,
 )
+from rpidrive.controllers.upload import clean_upload_sessions
+from rpidrive.controllers.watcher import VolumeWatcher, WatcherNotSupportedException
 from rpidrive.models import (
-    Job,
     JobKind,
     PublicFileLink,
     Volume,
     VolumeKindEnum,
 )
 
+_JOB_KINDS = [JobKind.ZIP, JobKind.DELETE, JobKind.METADATA]
+_POLL_INTERVAL = 15.0  # seconds, jobs queued without wakeup are picked up by then
+
 
 class Command(BaseCommand):
-    """Start job server command"""
+    """Start job server command.
+
+    Volumes are indexed by this process, queued jobs are run concurrently by
+    worker processes. Workers claim jobs with SKIP LOCKED & sleep until a
+    job is queued.
+    """
 
     help = "Start job server"
     logger = logging.getLogger(__name__)
 
+    def _run_jobs(self):
+        """Run queued jobs, runs in worker process"""
+        handlers = {
+            JobKind.ZIP: process_compress_job,
+            JobKind.DELETE: process_delete_job,
+            JobKind.METADATA: process_metadata_job,
+        }
+        while True:
+            job = claim_job(_JOB_KINDS)
+            if not job:
+                wait_job(_POLL_INTERVAL)
+                continue
+            self.logger.info("Performing job #%s", job.pk)
+            try:
+                handlers[JobKind(job.kind)](job)
+            except Exception:  # pylint: disable=broad-exception-caught
+                self.logger.exception("Failed job #%s", job.pk)
+            job.delete()
+
+    def _start_job_workers(
+        self, workers: List[multiprocessing.Process]
+    ) -> List[multiprocessing.Process]:
+        """Start job workers, dead ones are replaced"""
+        alive = [x for x in workers if x.is_alive()]
+        count = settings.ROOT_CONFIG.jobserver.workers - len(alive)
+        if count <= 0:
+            return alive
+
+        connections.close_all()  # Workers open their own
+        context = multiprocessing.get_context("fork")
+        for _ in range(count):
+            # Not daemon, so workers can have metadata worker processes.
+            process = context.Process(target=self._run_jobs, name="job-worker")
+            process.start()
+            alive.append(process)
+        return alive
+
+    def _create_watcher(self):
+        if not settings.ROOT_CONFIG.indexer.watch:
+            return None
+        try:
+            return VolumeWatcher(settings.ROOT_CONFIG.indexer.watch_debounce)
+        except WatcherNotSupportedException as exc:
+            self.logger.warning("Unable to watch volumes: %s", exc)
+            return None
+
     def handle(self, *args, **options):
         """Handle command"""
         # Create init key if needed
@@ -48,11 +112,26 @@ class Command(BaseCommand):
             with open(settings.INIT_KEY_PATH, "r") as f_h:
                 self.logger.info(f_h.read())
 
-        # Run jobs
-        last_indexed_lim = timezone.now() - timedelta(
-            minutes=settings.ROOT_CONFIG.indexer.period
-        )
+        # Stop by SIGTERM too, so workers are stopped with this process.
+        signal.signal(signal.SIGTERM, lambda *_args: sys.exit(0))
+        requeue_jobs(_JOB_KINDS)
+        workers = self._start_job_workers([])
+        try:
+            self._run_index(self._create_watcher(), workers)
+        finally:
+            for worker in workers:
+                worker.terminate()
+            for worker in workers:
+                worker.join()
+
+    def _run_index(
+        self, watcher: VolumeWatcher, workers: List[multiprocessing.Process]
+    ):
+        """Index volumes & clean up expired data periodically"""
         while True:
+            last_indexed_lim = timezone.now() - timedelta(
+                minutes=settings.ROOT_CONFIG.indexer.period
+            )
             volumes = Volume.objects.filter(
                 Q(kind=VolumeKindEnum.HOST_PATH)
                 & (
@@ -61,19 +140,39 @@ class Command(BaseCommand):
                     | Q(last_indexed__lte=last_indexed_lim)
                 )
             ).all()
+            last_deep_indexed_lim = timezone.now() - timedelta(
+                minutes=settings.ROOT_CONFIG.indexer.deep_period
+            )
             for volume in volumes:
-                self.logger.info("Performing indexing on volume %s", volume.name)
-                perform_index(volume)
+                deep = (
+                    volume.indexing
+                    or not volume.last_deep_indexed
+                    or volume.last_deep_indexed <= last_deep_indexed_lim
+                )
+                self.logger.info(
+                    "Performing %s indexing on volume %s",
+                    "deep" if deep else "incremental",
+                    volume.name,
+                )
+                perform_index(volume, deep)
                 self.logger.info("Done indexing volume %s", volume.name)
-
-            zip_jobs = Job.objects.filter(kind=JobKind.ZIP).all()
-            for job in zip_jobs:
-                self.logger.info("Performing job #%s", job.pk)
-                process_compress_job(job)
-                job.delete()
+                if watcher:
+                    watcher.watch_volume(volume)
+                if settings.ROOT_CONFIG.thumbnail.pregenerate:
+                    pregenerate_thumbnails(volume)
 
             PublicFileLink.objects.filter(
                 expire_time__lte=timezone.now()
             ).all().delete()
+            clean_upload_sessions()
+            workers[:] = self._start_job_workers(workers)
 
-            time.sleep(15.0)
+            if watcher:
+                watcher.sync(
+                    Volume.objects.filter(kind=VolumeKindEnum.HOST_PATH).only(
+                        "pk", "path"
+                    )
+                )
+                watcher.wait(_POLL_INTERVAL)
+            else:
+                time.sleep(_POLL_INTERVAL)
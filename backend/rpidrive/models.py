@@ -4,7 +4,9 @@ from enum import Enum
 from typing import List, Tuple
 
 from django.contrib.auth.models import User
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 
 
 class VolumeKindEnum(str, Enum):
@@ -65,6 +67,7 @@ class Volume(models.Model):
     path = models.TextField(unique=True)
     indexing = models.BooleanField(default=False)
     last_indexed = models.DateTimeField(default=None, null=True)
+    last_deep_indexed = models.DateTimeField(default=None, null=True)
 
     def __str__(self) -> str:
         return self.name
@@ -137,6 +140,28 @@ class File(models.Model):
     )
     size = models.PositiveBigIntegerField(default=0)
     metadata = models.JSONField(null=True, default=None)
+    fingerprint = models.TextField(null=True, default=None)
+    inode = models.PositiveBigIntegerField(null=True, default=None)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["volume", "inode"]),
+            # Serves exact & prefix (subtree) lookups on path_from_vol.
+            models.Index(
+                fields=["volume", "path_from_vol"],
+                name="file_volume_path_idx",
+                opclasses=["uuid_ops", "text_pattern_ops"],
+            ),
+            # Serves folder listing, folders first.
+            models.Index(
+                fields=["parent", "-kind", "name"], name="file_parent_kind_name_idx"
+            ),
+            # Serves name__icontains, which is UPPER(name) LIKE UPPER('%kw%').
+            GinIndex(
+                OpClass(Upper("name"), name="gin_trgm_ops"),
+                name="file_name_trgm_idx",
+            ),
+        ]
 
     def __str__(self):
         return self.path_from_vol
@@ -177,6 +202,19 @@ class PublicFileLink(models.Model):
     expire_time = models.DateTimeField()
 
 
+class UploadSession(models.Model):
+    """UploadSession class"""
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4)
+    parent = models.ForeignKey(File, on_delete=models.CASCADE)
+    creator = models.ForeignKey(User, on_delete=models.CASCADE)
+    path = models.TextField()  # Relative to parent, i.e. folder/file.txt
+    size = models.PositiveBigIntegerField()
+    offset = models.PositiveBigIntegerField(default=0)
+    expire_time = models.DateTimeField()
+    write_time = models.DateTimeField(null=True)  # Last progress of data write
+
+
 class ActivityKindEnum(str, Enum):
     """Activity kind enum"""
 
@@ -215,6 +253,8 @@ class JobKind(str, Enum):
 
     INDEX = "index"
     ZIP = "zip"
+    DELETE = "delete"
+    METADATA = "metadata"
 
     @classmethod
     def choices(cls):
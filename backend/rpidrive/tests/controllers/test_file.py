@@ -16,6 +16,7 @@ from rpidrive.controllers.file import (
     delete_files,
     get_file,
     get_file_full_path,
+    get_files,
     get_file_parents,
     move_files,
     rename_file,
@@ -129,6 +130,48 @@ class TestFile(TestCase):  # pylint: disable=too-many-public-methods
         with self.assertRaises(NotImplementedError):
             get_file_parents(self.context.root_file)
 
+    def test_get_files_1(self):
+        """Test get_files"""
+        pks = []
+        for idx in range(3):
+            f_p = os.path.join(self.context.root_path, f"{idx}.txt")
+            with open(f_p, "w+") as f_h:
+                f_h.write("a")
+            pks.append(
+                create_entry(self.context.volume, self.context.root_file, f_p).pk
+            )
+
+        # Keeps order, drops duplicates
+        file_pks = [pks[2], pks[0], pks[2], pks[1]]
+        self.assertEqual(
+            [pks[2], pks[0], pks[1]],
+            [x.pk for x in get_files(self.context.admin, file_pks)],
+        )
+
+        # Query count doesn't depend on number of files
+        with self.assertNumQueries(2):
+            get_files(self.context.admin, pks, ["volume"], True)
+        with self.assertNumQueries(1):
+            get_files(self.context.admin, pks[:1], ["volume"], False)
+
+    def test_get_files_2(self):
+        """Test get_files (Invalid files)"""
+        with self.assertRaises(FileNotFoundException):
+            get_files(self.context.admin, [])
+        with self.assertRaises(FileNotFoundException):
+            get_files(self.context.admin, [self.context.root_file.pk, uuid.uuid4()])
+
+        self.context_2 = SetupContext()
+        with self.assertRaises(InvalidOperationRequestException):
+            get_files(
+                self.context.admin,
+                [self.context.root_file.pk, self.context_2.root_file.pk],
+            )
+
+        normal_user = User.objects.create_user("anya")
+        with self.assertRaises(VolumeNotFoundException):
+            get_files(normal_user, [self.context.root_file.pk])
+
     def test_delete_files_1(self):
         """Test delete_files (Mixed volumes)"""
         self.context_2 = SetupContext()
@@ -1003,6 +1046,38 @@ class TestFile(TestCase):  # pylint: disable=too-many-public-methods
                 False,
             )
 
+    def test_move_files_11(self):
+        """Test move files (Queries don't grow with the number of files)"""
+        folder_fp = os.path.join(self.context.root_path, "example")
+        os.makedirs(folder_fp)
+        folder_obj = create_entry(
+            self.context.volume, self.context.root_file, folder_fp
+        )
+        file_pks = []
+        for i in range(10):
+            text_fp = os.path.join(self.context.root_path, f"{i}.txt")
+            with open(text_fp, "w+") as f_h:
+                f_h.write("a")
+            file_pks.append(
+                str(
+                    create_entry(
+                        self.context.volume, self.context.root_file, text_fp
+                    ).pk
+                )
+            )
+
+        with self.assertNumQueries(10):
+            move_files(self.context.admin, file_pks, str(folder_obj.id), False)
+        self.assertEqual(
+            {f"/example/{i}.txt" for i in range(10)},
+            set(
+                File.objects.filter(pk__in=file_pks).values_list(
+                    "path_from_vol", flat=True
+                )
+            ),
+        )
+        self.assertEqual(10, len(os.listdir(folder_fp)))
+
     def test_share_file_1(self):
         """Test share_file"""
         text_fp = os.path.join(self.context.root_path, "hehe.txt")
@@ -1190,6 +1265,28 @@ class TestFile(TestCase):  # pylint: disable=too-many-public-methods
         result = set(search_files(normal_user, "txt").all())
         self.assertEqual({txt_file_2}, result)
 
+    def test_search_files_rank(self):
+        """Test search_files (Ranking)"""
+        files = {}
+        for name in ["my songs.txt", "song.mp3", "songbook.pdf", "a song.mp3"]:
+            file_path = os.path.join(self.context.root_path, name)
+            with open(file_path, "w+") as f_h:
+                f_h.write("a")
+            files[name] = create_entry(
+                self.context.volume, self.context.root_file, file_path
+            )
+
+        # Whole word matches first, then by name.
+        self.assertEqual(
+            [
+                files["a song.mp3"],
+                files["song.mp3"],
+                files["my songs.txt"],
+                files["songbook.pdf"],
+            ],
+            list(search_files(self.context.admin, "song")),
+        )
+
     def test_get_file_full_path_1(self):
         """Test get_file_full_path"""
         self.assertEqual(
@@ -3,8 +3,12 @@ from django.test import TestCase
 
 from rpidrive.controllers.job import (
     JobNotFoundException,
+    claim_job,
     get_job,
     get_jobs,
+    notify_job,
+    requeue_jobs,
+    wait_job,
 )
 from rpidrive.controllers.volume import (
     VolumePermissionEnum,
@@ -90,3 +94,42 @@ class TestJob(TestCase):
         """Test get_job (Invalid id)"""
         with self.assertRaises(JobNotFoundException):
             get_job(9999999)
+
+    def _create_job(self, kind: JobKind, status: JobStatus = JobStatus.IN_QUEUE):
+        return Job.objects.create(
+            kind=kind, description="example", data={}, status=status
+        )
+
+    def test_claim_job(self):
+        """Test claim_job"""
+        self._create_job(JobKind.ZIP, JobStatus.RUNNING)
+        job_1 = self._create_job(JobKind.ZIP)
+        job_2 = self._create_job(JobKind.DELETE)
+        self._create_job(JobKind.INDEX)
+
+        kinds = [JobKind.ZIP, JobKind.DELETE]
+        self.assertEqual(job_1, claim_job(kinds))
+        self.assertEqual(JobStatus.RUNNING, Job.objects.get(pk=job_1.pk).status)
+        self.assertEqual(job_2, claim_job(kinds))
+        self.assertIsNone(claim_job(kinds))
+
+    def test_requeue_jobs(self):
+        """Test requeue_jobs"""
+        job = self._create_job(JobKind.ZIP, JobStatus.RUNNING)
+        Job.objects.filter(pk=job.pk).update(progress=50)
+        self._create_job(JobKind.INDEX, JobStatus.RUNNING)
+
+        self.assertEqual(1, requeue_jobs([JobKind.ZIP]))
+        job.refresh_from_db()
+        self.assertEqual((JobStatus.IN_QUEUE, 0), (job.status, job.progress))
+
+    def test_wait_job(self):
+        """Test notify_job & wait_job"""
+        while wait_job(0.01):
+            pass
+        with self.captureOnCommitCallbacks(execute=True):
+            notify_job()
+            notify_job()
+        self.assertTrue(wait_job(0.01))
+        self.assertTrue(wait_job(0.01))
+        self.assertFalse(wait_job(0.01))
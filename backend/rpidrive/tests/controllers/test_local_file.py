@@ -1,22 +1,34 @@
+# pylint: disable=too-many-lines
 import os
 import shutil
 
-from zipfile import ZipFile
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db import transaction
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
 
 from rpidrive.controllers.compress import NoFileException
 from rpidrive.controllers.local_file import (
+    UPLOAD_STAGING_DIR,
     InvalidFileNameException,
     InvalidOperationRequestException,
     InvalidVolumeKindException,
+    _IndexBatch,
+    _apply_update,
+    _build_entry,
     compress_files,
     create_entry,
+    create_files,
     create_folder,
     delete_file,
+    delete_files,
     generate_new_file_name,
+    get_ancestor_paths,
+    get_descendants,
     get_file_parents,
     get_full_path,
     get_metadata,
@@ -24,13 +36,24 @@ from rpidrive.controllers.local_file import (
     perform_index,
     perform_shallow_index,
     process_compress_job,
+    process_delete_job,
+    process_metadata_job,
     rename_file,
 )
+from rpidrive.controllers.metadata_cache import (
+    clear_metadata_cache,
+    get_metadata_cache_stats,
+    set_cached_metadata,
+)
 from rpidrive.models import (
     File,
     FileKindEnum,
     Job,
+    JobKind,
     JobStatus,
+    Playlist,
+    PlaylistFile,
+    PublicFileLink,
     VolumeKindEnum,
 )
 from rpidrive.tests.helpers.setup import SetupContext
@@ -317,12 +340,322 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
             [self.context.root_file, folder_obj], get_file_parents(file_obj)
         )
 
+    def test_get_ancestor_paths(self):
+        """Test get_ancestor_paths"""
+        self.assertEqual([], get_ancestor_paths("/"))
+        self.assertEqual(["/"], get_ancestor_paths("/a"))
+        self.assertEqual(["/", "/a", "/a/b"], get_ancestor_paths("/a/b/c"))
+
+    def test_get_descendants(self):
+        """Test get_descendants"""
+        os.makedirs(os.path.join(self.context.root_path, "a", "b"))
+        os.makedirs(os.path.join(self.context.root_path, "ab"))
+        with open(os.path.join(self.context.root_path, "a", "log.txt"), "w+") as f_h:
+            f_h.write("")
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+
+        volume_id = self.context.volume.pk
+        self.assertEqual(
+            {"/a/b", "/a/log.txt"},
+            set(
+                get_descendants(volume_id, "/a").values_list("path_from_vol", flat=True)
+            ),
+        )
+        self.assertEqual(
+            {"/a", "/a/b", "/a/log.txt", "/ab"},
+            set(
+                get_descendants(volume_id, "/").values_list("path_from_vol", flat=True)
+            ),
+        )
+        self.assertFalse(get_descendants(volume_id, "/ab").exists())
+
     def test_perform_index_3(self):
         """Test perform_index (Invalid volume)"""
         self.context.volume.kind = VolumeKindEnum.REMOTE_RPI_DRIVE
         with self.assertRaises(InvalidVolumeKindException):
             perform_index(self.context.volume)
 
+    def test_perform_index_4(self):
+        """Test perform_index (Incremental)"""
+        folder_name = "example"
+        folder_path = os.path.join(self.context.root_path, folder_name)
+        os.makedirs(folder_path)
+
+        file_name = "log.txt"
+        file_path = os.path.join(folder_path, file_name)
+        with open(file_path, "w+") as f_h:
+            f_h.write("")
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        self.context.volume.refresh_from_db()
+        self.assertIsNotNone(self.context.volume.last_deep_indexed)
+        folder_obj = File.objects.get(name=folder_name)
+        self.assertIsNotNone(folder_obj.fingerprint)
+        self.assertIsNotNone(File.objects.get(pk=self.context.root_file.pk).fingerprint)
+
+        # Test addition in subfolder
+        file_name_2 = "log2.txt"
+        with open(os.path.join(folder_path, file_name_2), "w+") as f_h:
+            f_h.write("")
+        with transaction.atomic():
+            perform_index(self.context.volume, False)
+        self.assertTrue(
+            File.objects.filter(parent=folder_obj, name=file_name_2).exists()
+        )
+
+        # In-place update is only picked up by deep index
+        with open(file_path, "w+") as f_h:
+            f_h.write("123")
+        with transaction.atomic():
+            perform_index(self.context.volume, False)
+        self.assertEqual(0, File.objects.get(name=file_name).size)
+        with transaction.atomic():
+            perform_index(self.context.volume, True)
+        self.assertEqual(3, File.objects.get(name=file_name).size)
+
+        # Test removal
+        os.remove(file_path)
+        with transaction.atomic():
+            perform_index(self.context.volume, False)
+        self.assertFalse(File.objects.filter(name=file_name).exists())
+        self.assertEqual(3, File.objects.count())
+
+    @override_settings(BULK_BATCH_SIZE=2)
+    def test_perform_index_5(self):
+        """Test perform_index (Multiple batches)"""
+        curr_path = self.context.root_path
+        for i in range(3):
+            curr_path = os.path.join(curr_path, f"folder{i}")
+            os.makedirs(curr_path)
+            for j in range(2):
+                with open(os.path.join(curr_path, f"log{j}.txt"), "w+") as f_h:
+                    f_h.write("")
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+
+        self.assertEqual(10, File.objects.count())
+        parent = self.context.root_file
+        for i in range(3):
+            folder_obj = File.objects.get(name=f"folder{i}")
+            self.assertEqual(parent.pk, folder_obj.parent_id)
+            self.assertIsNotNone(folder_obj.fingerprint)
+            self.assertEqual(
+                (
+                    {"log0.txt", "log1.txt", f"folder{i + 1}"}
+                    if i < 2
+                    else {"log0.txt", "log1.txt"}
+                ),
+                set(folder_obj.children.values_list("name", flat=True)),
+            )
+            parent = folder_obj
+
+    def test_perform_index_6(self):
+        """Test perform_index (Ignore links)"""
+        folder_name = "example"
+        folder_path = os.path.join(self.context.root_path, folder_name)
+        os.makedirs(folder_path)
+        file_path = os.path.join(folder_path, "log.txt")
+        with open(file_path, "w+") as f_h:
+            f_h.write("")
+        os.symlink(folder_path, os.path.join(self.context.root_path, "link"))
+        os.symlink(file_path, os.path.join(folder_path, "link.txt"))
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+
+        self.assertEqual(
+            {"", folder_name, "log.txt"},
+            set(File.objects.values_list("name", flat=True)),
+        )
+
+    def test_perform_index_7(self):
+        """Test perform_index (Extract metadata without pool)"""
+        file_name = "sample.m4a"
+        src_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), file_name)
+        shutil.copy2(src_file, os.path.join(self.context.root_path, file_name))
+
+        indexer_config = settings.ROOT_CONFIG.indexer
+        workers = indexer_config.metadata_workers
+        indexer_config.metadata_workers = 0
+        try:
+            with transaction.atomic():
+                perform_index(self.context.volume)
+        finally:
+            indexer_config.metadata_workers = workers
+
+        file_obj = File.objects.get(name=file_name)
+        self.assertEqual("audio/mp4", file_obj.media_type)
+        self.assertEqual("anya", file_obj.metadata["album"])
+
+    def test_perform_index_8(self):
+        """Test perform_index (Reuse metadata of file moved across volumes)"""
+        clear_metadata_cache()
+        file_name = "sample.m4a"
+        src_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), file_name)
+        file_path = os.path.join(self.context.root_path, file_name)
+        shutil.copy2(src_file, file_path)
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        self.assertEqual({"hits": 0, "misses": 1}, get_metadata_cache_stats())
+
+        context_2 = SetupContext()
+        try:
+            os.rename(file_path, os.path.join(context_2.root_path, file_name))
+            with transaction.atomic():
+                perform_index(self.context.volume)
+                perform_index(context_2.volume)
+            self.assertEqual({"hits": 1, "misses": 1}, get_metadata_cache_stats())
+            file_obj = File.objects.get(name=file_name)
+            self.assertEqual(context_2.volume.pk, file_obj.volume_id)
+            self.assertEqual("anya", file_obj.metadata["album"])
+        finally:
+            context_2.cleanup()
+            clear_metadata_cache()
+
+    def test_perform_index_9(self):  # pylint: disable=too-many-locals
+        """Test perform_index (External move)"""
+        folder_path = os.path.join(self.context.root_path, "folder1")
+        os.makedirs(os.path.join(folder_path, "sub"))
+        file_path = os.path.join(folder_path, "sub", "log.txt")
+        with open(file_path, "w+") as f_h:
+            f_h.write("1")
+        link_path = os.path.join(self.context.root_path, "link.txt")
+        os.link(file_path, link_path)
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        pks = dict(File.objects.values_list("path_from_vol", "pk"))
+
+        # Rename folder
+        new_folder_path = os.path.join(self.context.root_path, "folder2")
+        os.rename(folder_path, new_folder_path)
+        with transaction.atomic():
+            perform_index(self.context.volume, False)
+        self.assertEqual(
+            {
+                "/": pks["/"],
+                "/folder2": pks["/folder1"],
+                "/folder2/sub": pks["/folder1/sub"],
+                "/folder2/sub/log.txt": pks["/folder1/sub/log.txt"],
+                "/link.txt": pks["/link.txt"],
+            },
+            dict(File.objects.values_list("path_from_vol", "pk")),
+        )
+        self.assertEqual("folder2", File.objects.get(pk=pks["/folder1"]).name)
+
+        # Move file to parent folder
+        os.rename(
+            os.path.join(new_folder_path, "sub", "log.txt"),
+            os.path.join(new_folder_path, "log2.txt"),
+        )
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        file_obj = File.objects.get(pk=pks["/folder1/sub/log.txt"])
+        self.assertEqual("log2.txt", file_obj.name)
+        self.assertEqual("/folder2/log2.txt", file_obj.path_from_vol)
+        self.assertEqual(pks["/folder1"], file_obj.parent_id)
+        self.assertEqual(5, File.objects.count())
+
+        # Hard link is not a move
+        os.link(link_path, os.path.join(self.context.root_path, "link2.txt"))
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        self.assertEqual(pks["/link.txt"], File.objects.get(name="link.txt").pk)
+        self.assertEqual(6, File.objects.count())
+
+    def test_perform_index_10(self):
+        """Test perform_index (Metadata pool is started on first cache miss)"""
+        clear_metadata_cache()
+        src_path = os.path.dirname(os.path.realpath(__file__))
+        shutil.copy2(os.path.join(src_path, "sample.m4a"), self.context.root_path)
+        with open(os.path.join(self.context.root_path, "log"), "w+") as f_h:
+            f_h.write("")
+        entries = []
+        for name in ["log", "sample.m4a"]:
+            file_path = os.path.join(self.context.root_path, name)
+            file_obj = _build_entry(
+                self.context.volume, self.context.root_file, file_path, None, False
+            )
+            entries.append((file_obj, file_path, os.stat(file_path)))
+
+        try:
+            set_cached_metadata(entries[1][2], {"album": "cached"})
+            with _IndexBatch(100, 1) as batch:
+                for entry in entries:
+                    self.assertFalse(batch.extract_metadata(*entry))
+                self.assertIsNone(batch._pool)  # pylint: disable=protected-access
+            self.assertEqual({"album": "cached"}, entries[1][0].metadata)
+
+            clear_metadata_cache()
+            with _IndexBatch(100, 1) as batch:
+                self.assertTrue(batch.extract_metadata(*entries[1]))
+                self.assertIsNotNone(batch._pool)  # pylint: disable=protected-access
+                batch.finish()
+            self.assertEqual("anya", entries[1][0].metadata["album"])
+        finally:
+            clear_metadata_cache()
+
+    def test_perform_index_12(self):
+        """Test perform_index (Stat change is written with extracted metadata)"""
+        clear_metadata_cache()
+        src_path = os.path.dirname(os.path.realpath(__file__))
+        file_path = os.path.join(self.context.root_path, "sample.m4a")
+        shutil.copy2(os.path.join(src_path, "sample.m4a"), file_path)
+        file_obj = create_entry(self.context.volume, self.context.root_file, file_path)
+        last_modified = file_obj.last_modified
+
+        os.utime(file_path, (0, 0))
+        file_stat = os.stat(file_path)
+        self.assertTrue(_apply_update(file_obj, file_path, file_stat))
+        try:
+            with _IndexBatch(100, 1) as batch:
+                batch.update_changed(file_obj, file_path, file_stat)
+                batch.flush()
+                # Row stays stale until extraction succeeds.
+                self.assertEqual(
+                    last_modified, File.objects.get(pk=file_obj.pk).last_modified
+                )
+                batch.finish()
+        finally:
+            clear_metadata_cache()
+
+        file_obj.refresh_from_db()
+        self.assertEqual(0, file_obj.last_modified.timestamp())
+        self.assertEqual("anya", file_obj.metadata["album"])
+
+    def test_perform_index_13(self):
+        """Test perform_index (Fingerprints are written after deletes)"""
+        root_file = File.objects.get(pk=self.context.root_file.pk)
+        root_file.fingerprint = "a"
+        with _IndexBatch(1) as batch:
+            batch.update_fingerprint(root_file)
+            batch.flush()
+            self.assertIsNone(File.objects.get(pk=root_file.pk).fingerprint)
+            batch.finish()
+        self.assertEqual("a", File.objects.get(pk=root_file.pk).fingerprint)
+
+    def test_perform_index_11(self):
+        """Test perform_index (Removed subtree with related rows)"""
+        folder_obj, folder_path = self._create_tree()
+        sub_file = File.objects.get(path_from_vol="/example/sub/log.txt")
+        playlist = Playlist.objects.create(name="a", owner=self.context.admin)
+        PlaylistFile.objects.create(playlist=playlist, file=sub_file, sequence=0)
+
+        shutil.rmtree(folder_path)
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        self.assertEqual(
+            {"/", "/example2"},
+            set(File.objects.values_list("path_from_vol", flat=True)),
+        )
+        self.assertFalse(File.objects.filter(pk=folder_obj.pk).exists())
+        self.assertFalse(PlaylistFile.objects.exists())
+
     def test_delete_file_1(self):
         """Test delete_file (Folder)"""
         folder_name = "example"
@@ -359,6 +692,89 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
         self.assertEqual(1, File.objects.count())
         self.assertEqual(self.context.root_file, File.objects.first())
 
+    def _create_tree(self):
+        folder_path = os.path.join(self.context.root_path, "example")
+        os.makedirs(os.path.join(folder_path, "sub"))
+        for path in ["log.txt", "sub/log.txt", "sub/log2.txt"]:
+            with open(os.path.join(folder_path, path), "w+") as f_h:
+                f_h.write("")
+        os.makedirs(os.path.join(self.context.root_path, "example2"))
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        folder_obj = File.objects.select_related("volume").get(path_from_vol="/example")
+        return folder_obj, folder_path
+
+    def test_delete_file_3(self):
+        """Test delete_file (Subtree with related rows)"""
+        folder_obj, folder_path = self._create_tree()
+        sub_file = File.objects.get(path_from_vol="/example/sub/log.txt")
+        playlist = Playlist.objects.create(name="a", owner=self.context.admin)
+        PlaylistFile.objects.create(playlist=playlist, file=sub_file, sequence=0)
+        PublicFileLink.objects.create(file=sub_file, expire_time=timezone.now())
+
+        with self.assertNumQueries(6):
+            delete_file(folder_obj)
+
+        self.assertFalse(os.path.exists(folder_path))
+        self.assertEqual(
+            {"/", "/example2"},
+            set(File.objects.values_list("path_from_vol", flat=True)),
+        )
+        self.assertFalse(PlaylistFile.objects.exists())
+        self.assertFalse(PublicFileLink.objects.exists())
+
+        with self.assertRaises(InvalidOperationRequestException):
+            delete_file(self.context.root_file)
+
+    def test_delete_files(self):
+        """Test delete_files"""
+        folder_obj, folder_path = self._create_tree()
+        with override_settings(DELETE_JOB_THRESHOLD=10):
+            self.assertIsNone(delete_files([folder_obj]))
+        self.assertFalse(os.path.exists(folder_path))
+        self.assertEqual(2, File.objects.count())
+
+        for i in range(10):
+            with open(os.path.join(self.context.root_path, f"{i}.txt"), "w+") as f_h:
+                f_h.write("")
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        files = list(
+            File.objects.select_related("volume").exclude(
+                path_from_vol__in=["/", "/example2"]
+            )
+        )
+        self.assertEqual(10, len(files))
+        # Queries don't grow with the number of files.
+        with self.assertNumQueries(7):
+            self.assertIsNone(delete_files(files))
+        self.assertEqual(
+            {"/", "/example2"},
+            set(File.objects.values_list("path_from_vol", flat=True)),
+        )
+        self.assertEqual(["example2"], os.listdir(self.context.root_path))
+
+        with self.assertRaises(InvalidOperationRequestException):
+            delete_files([self.context.root_file])
+
+    def test_process_delete_job(self):
+        """Test process_delete_job"""
+        folder_obj, folder_path = self._create_tree()
+        example2 = File.objects.get(path_from_vol="/example2")
+        with override_settings(DELETE_JOB_THRESHOLD=2):
+            job = delete_files([folder_obj, example2])
+        self.assertEqual(JobKind.DELETE, job.kind)
+        self.assertEqual(JobStatus.IN_QUEUE, job.status)
+        self.assertTrue(os.path.exists(folder_path))
+        self.assertEqual(7, File.objects.count())
+
+        process_delete_job(job)
+        job.refresh_from_db()
+        self.assertEqual(JobStatus.COMPLETED, job.status)
+        self.assertEqual(100, job.progress)
+        self.assertFalse(os.path.exists(folder_path))
+        self.assertEqual(1, File.objects.count())
+
     def test_rename_file_1(self):
         """Test rename_file (No name)"""
         file_name = "log.txt"
@@ -493,7 +909,7 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
         )
 
         with self.assertRaises(InvalidOperationRequestException) as ctx:
-            move_files([str(file_obj_1.id)], file_obj_2, True)
+            move_files([file_obj_1], file_obj_2, True)
         self.assertEqual("Destination must be a folder.", str(ctx.exception))
 
     def test_move_files_2(self):
@@ -505,7 +921,7 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
         folder_obj_1 = File.objects.get(name="folder1")
 
         with self.assertRaises(InvalidOperationRequestException) as ctx:
-            move_files([str(folder_obj_1.id)], folder_obj_1, True)
+            move_files([folder_obj_1], folder_obj_1, True)
         self.assertEqual("Invalid parent path.", str(ctx.exception))
 
     def test_move_files_4(self):
@@ -525,7 +941,7 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
         folder_obj_2 = File.objects.get(name="folder2")
 
         with self.assertRaises(InvalidOperationRequestException) as ctx:
-            move_files([str(folder_obj_1.id)], folder_obj_2, True)
+            move_files([folder_obj_1], folder_obj_2, True)
         self.assertEqual("Invalid parent path.", str(ctx.exception))
 
     def test_move_files_5(self):  # pylint: disable=too-many-locals
@@ -587,7 +1003,7 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
             file_21,
         )
 
-        move_files([str(folder_1_obj.id)], folder_2_obj, True)
+        move_files([folder_1_obj], folder_2_obj, True)
         self.assertFalse(File.objects.filter(id=folder_1_obj.id).exists())
 
         # Check file is renamed
@@ -669,7 +1085,7 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
             file_21,
         )
 
-        move_files([str(folder_1_obj.id)], folder_2_obj, False)
+        move_files([folder_1_obj], folder_2_obj, False)
         self.assertFalse(File.objects.filter(id=folder_1_obj.id).exists())
         self.assertFalse(File.objects.filter(id=file_21_obj.id).exists())
 
@@ -683,6 +1099,36 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
         with open(get_full_path(file_1_obj), "r") as f_h:
             self.assertEqual("1", f_h.read())
 
+    def test_move_files_7(self):
+        """Test move_files (Folder with subfolders, name taken by file)"""
+        os.makedirs(os.path.join(self.context.root_path, "a", "b"))
+        os.makedirs(os.path.join(self.context.root_path, "ab"))
+        os.makedirs(os.path.join(self.context.root_path, "dest"))
+        for path in ["a/b/log.txt", "ab/log.txt", "dest/a"]:
+            with open(os.path.join(self.context.root_path, path), "w+") as f_h:
+                f_h.write("1")
+
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        pks = dict(File.objects.values_list("path_from_vol", "pk"))
+
+        move_files(
+            [File.objects.get(pk=pks["/a"])], File.objects.get(pk=pks["/dest"]), False
+        )
+        self.assertEqual(
+            {
+                "/": pks["/"],
+                "/ab": pks["/ab"],
+                "/ab/log.txt": pks["/ab/log.txt"],
+                "/dest": pks["/dest"],
+                "/dest/a": pks["/dest/a"],
+                "/dest/a (1)": pks["/a"],
+                "/dest/a (1)/b": pks["/a/b"],
+                "/dest/a (1)/b/log.txt": pks["/a/b/log.txt"],
+            },
+            dict(File.objects.values_list("path_from_vol", "pk")),
+        )
+
     def test_create_folder_1(self):
         """Test create_folder (Empty name)"""
         with self.assertRaises(InvalidFileNameException) as ctx:
@@ -735,6 +1181,81 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
         self.assertIsNotNone(folder.last_modified)
         self.assertEqual("/example", folder.path_from_vol)
 
+    def _get_upload(self, path: str, name: str = "sample.m4a"):
+        src_path = os.path.join(os.path.dirname(os.path.realpath(__file__)), name)
+        with open(src_path, "rb") as f_h:
+            return {"file": SimpleUploadedFile(name, f_h.read()), "path": path}
+
+    def test_create_files_1(self):
+        """Test create_files (Shared folders & duplicate names)"""
+        create_folder(self.context.root_file, "a")
+        files = [
+            self._get_upload("a/b/sample.m4a"),
+            self._get_upload("a/b/sample.m4a"),
+            self._get_upload("a/c/sample.m4a"),
+            self._get_upload("sample.m4a"),
+        ]
+        # Folder & name lookups don't grow with the number of files.
+        with self.assertNumQueries(5):
+            self.assertIsNone(create_files(self.context.root_file, files))
+
+        self.assertEqual(
+            [
+                "/",
+                "/a",
+                "/a/b",
+                "/a/b/sample (1).m4a",
+                "/a/b/sample.m4a",
+                "/a/c",
+                "/a/c/sample.m4a",
+                "/sample.m4a",
+            ],
+            list(
+                File.objects.order_by("path_from_vol").values_list(
+                    "path_from_vol", flat=True
+                )
+            ),
+        )
+        file_obj = File.objects.get(path_from_vol="/a/b/sample (1).m4a")
+        self.assertEqual("anya", file_obj.metadata["album"])
+        self.assertEqual(File.objects.get(path_from_vol="/a/b"), file_obj.parent)
+        self.assertTrue(os.path.isfile(get_full_path(file_obj)))
+
+        with self.assertRaises(InvalidFileNameException):
+            create_files(self.context.root_file, [self._get_upload("sample.m4a/x")])
+
+        # File & folder of the same name in one upload
+        with self.assertRaises(InvalidFileNameException) as ctx:
+            create_files(
+                self.context.root_file,
+                [
+                    {"file": SimpleUploadedFile("d", b"d"), "path": "d"},
+                    self._get_upload("d/sample.m4a"),
+                ],
+            )
+        self.assertEqual("Folder name is already in use.", str(ctx.exception))
+
+    def test_create_files_2(self):
+        """Test create_files (Metadata by job)"""
+        files = [
+            self._get_upload("sample.m4a"),
+            self._get_upload("a/sample.jpg", "sample.jpg"),
+        ]
+        with override_settings(METADATA_JOB_THRESHOLD=1):
+            job = create_files(self.context.root_file, files)
+        self.assertEqual(JobKind.METADATA, job.kind)
+        self.assertEqual(JobStatus.IN_QUEUE, job.status)
+        self.assertEqual(2, len(job.data["files"]))
+        file_obj = File.objects.get(name="sample.m4a")
+        self.assertIsNone(file_obj.metadata)
+
+        process_metadata_job(job)
+        self.assertEqual(JobStatus.COMPLETED, job.status)
+        self.assertEqual(100, job.progress)
+        file_obj.refresh_from_db()
+        self.assertEqual("anya", file_obj.metadata["album"])
+        self.assertIsNotNone(File.objects.get(name="sample.jpg").metadata)
+
     def test_process_compress_job(self):
         """Test process_compress_job"""
         folder_name = "folder"
@@ -774,6 +1295,37 @@ class TestLocalFileController(TestCase):  # pylint: disable=too-many-public-meth
             zf_list = {x.filename for x in zf.filelist}
         self.assertEqual({file_name, folder_name + os.path.sep}, zf_list)
 
+    def test_process_compress_job_2(self):
+        """Test process_compress_job (Compressed media is stored)"""
+        folder_path = os.path.join(self.context.root_path, "folder")
+        os.makedirs(os.path.join(folder_path, "sub"))
+        src_path = os.path.dirname(os.path.realpath(__file__))
+        shutil.copy2(os.path.join(src_path, "sample.jpg"), folder_path)
+        with open(os.path.join(folder_path, "sub", "log.txt"), "w") as f_h:
+            f_h.write("log" * 1000)
+        perform_index(self.context.volume)
+
+        folder_obj = File.objects.get(name="folder")
+        job = compress_files([str(folder_obj.pk)], self.context.root_file, "a.zip")
+        output = process_compress_job(job)
+        self.assertEqual(100, job.progress)
+        self.assertEqual(os.path.getsize(get_full_path(output)), output.size)
+
+        with ZipFile(get_full_path(output), "r") as zf:
+            self.assertIsNone(zf.testzip())
+            self.assertEqual(
+                {
+                    "folder/": ZIP_STORED,
+                    "folder/sample.jpg": ZIP_STORED,
+                    "folder/sub/": ZIP_STORED,
+                    "folder/sub/log.txt": ZIP_DEFLATED,
+                },
+                {x.filename: x.compress_type for x in zf.infolist()},
+            )
+            self.assertEqual(b"log" * 1000, zf.read("folder/sub/log.txt"))
+        staging_dir = os.path.join(self.context.root_path, UPLOAD_STAGING_DIR)
+        self.assertEqual([], os.listdir(staging_dir))
+
     def test_perform_shallow_index_1(self):
         """Test perform_shallow_index"""
         folder_1 = os.path.join(self.context.root_path, "folder1")
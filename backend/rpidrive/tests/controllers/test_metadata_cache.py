@@ -0,0 +1,81 @@
+import os
+
+from django.conf import settings
+from django.test import TestCase
+
+from rpidrive.controllers.metadata_cache import (
+    clear_metadata_cache,
+    get_cached_metadata,
+    get_metadata_cache_stats,
+    record_metadata_cache_stats,
+    set_cached_metadata,
+)
+from rpidrive.tests.helpers.setup import SetupContext
+
+
+class TestMetadataCache(TestCase):
+    """Test metadata cache"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        clear_metadata_cache()
+
+    def tearDown(self):
+        clear_metadata_cache()
+        self.context.cleanup()
+
+    def test_get_cached_metadata(self):
+        """Test get_cached_metadata & set_cached_metadata"""
+        file_path = os.path.join(self.context.root_path, "a.mp3")
+        with open(file_path, "w+") as f_h:
+            f_h.write("a")
+        file_stat = os.stat(file_path)
+        self.assertEqual((False, None), get_cached_metadata(file_stat))
+
+        set_cached_metadata(file_stat, None)
+        self.assertEqual((True, None), get_cached_metadata(file_stat))
+        set_cached_metadata(file_stat, {"title": "a"})
+        self.assertEqual((True, {"title": "a"}), get_cached_metadata(file_stat))
+
+        # Move keeps the entry
+        new_path = os.path.join(self.context.root_path, "b.mp3")
+        os.rename(file_path, new_path)
+        self.assertEqual((True, {"title": "a"}), get_cached_metadata(os.stat(new_path)))
+
+        # Modification invalidates the entry
+        with open(new_path, "a") as f_h:
+            f_h.write("b")
+        self.assertEqual((False, None), get_cached_metadata(os.stat(new_path)))
+
+    def test_get_metadata_cache_stats(self):
+        """Test record_metadata_cache_stats & get_metadata_cache_stats"""
+        self.assertEqual({"hits": 0, "misses": 0}, get_metadata_cache_stats())
+        record_metadata_cache_stats(2, 0)
+        record_metadata_cache_stats(1, 3)
+        self.assertEqual({"hits": 3, "misses": 3}, get_metadata_cache_stats())
+
+    def test_metadata_cache_size(self):
+        """Test least recently used entries are evicted beyond cache size"""
+        file_stats = []
+        for name in ["a.mp3", "b.mp3", "c.mp3"]:
+            file_path = os.path.join(self.context.root_path, name)
+            with open(file_path, "w+") as f_h:
+                f_h.write(name)
+            file_stats.append(os.stat(file_path))
+
+        old_size = settings.ROOT_CONFIG.indexer.metadata_cache_size
+        settings.ROOT_CONFIG.indexer.metadata_cache_size = 2
+        try:
+            set_cached_metadata(file_stats[0], {"title": "a"})
+            set_cached_metadata(file_stats[1], {"title": "b"})
+            self.assertEqual((True, {"title": "a"}), get_cached_metadata(file_stats[0]))
+            set_cached_metadata(file_stats[2], {"title": "c"})
+        finally:
+            settings.ROOT_CONFIG.indexer.metadata_cache_size = old_size
+
+        self.assertEqual((True, {"title": "a"}), get_cached_metadata(file_stats[0]))
+        self.assertEqual((False, None), get_cached_metadata(file_stats[1]))
+        self.assertEqual((True, {"title": "c"}), get_cached_metadata(file_stats[2]))
+
+        clear_metadata_cache()
+        self.assertEqual((False, None), get_cached_metadata(file_stats[0]))
@@ -0,0 +1,123 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from rpidrive.controllers.file import get_file
+from rpidrive.controllers.permission_cache import (
+    clear_volume_permissions,
+    get_volume_permissions,
+)
+from rpidrive.controllers.user import delete_user
+from rpidrive.controllers.volume import (
+    VolumePermissionEnum,
+    VolumePermissionModel,
+    VolumeUser,
+    delete_volume,
+    get_volumes,
+    request_volume,
+    update_volume_permission,
+)
+from rpidrive.tests.helpers.setup import SetupContext
+
+
+class TestPermissionCache(TestCase):
+    """Test permission cache"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        self.user = User.objects.create_user("z")
+        clear_volume_permissions()
+
+    def tearDown(self):
+        clear_volume_permissions()
+        self.context.cleanup()
+        User.objects.all().delete()
+
+    def _grant(self, permission: VolumePermissionEnum):
+        update_volume_permission(
+            self.context.admin,
+            self.context.volume.pk,
+            [VolumePermissionModel(user=self.user.pk, permission=permission)],
+        )
+
+    def test_get_volume_permissions(self):
+        """Test get_volume_permissions"""
+        self.assertEqual({}, get_volume_permissions(self.user.pk))
+
+        self._grant(VolumePermissionEnum.READ)
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                {str(self.context.volume.pk): VolumePermissionEnum.READ},
+                get_volume_permissions(self.user.pk),
+            )
+        with self.assertNumQueries(0):
+            get_volume_permissions(self.user.pk)
+
+        # Bulk update sends no signal, still cached
+        VolumeUser.objects.update(permission=VolumePermissionEnum.READ_WRITE)
+        self.assertEqual(
+            VolumePermissionEnum.READ,
+            get_volume_permissions(self.user.pk)[str(self.context.volume.pk)],
+        )
+        clear_volume_permissions(self.user.pk)
+        self.assertEqual(
+            VolumePermissionEnum.READ_WRITE,
+            get_volume_permissions(self.user.pk)[str(self.context.volume.pk)],
+        )
+
+    def test_invalidation_by_signal(self):
+        """Test invalidation on changes outside of controllers, i.e. Django admin"""
+        entry = VolumeUser.objects.create(
+            volume=self.context.volume,
+            user=self.user,
+            permission=VolumePermissionEnum.READ,
+        )
+        self.assertEqual(1, len(get_volume_permissions(self.user.pk)))
+
+        entry.permission = VolumePermissionEnum.NONE
+        entry.save()
+        self.assertEqual(
+            VolumePermissionEnum.NONE,
+            get_volume_permissions(self.user.pk)[str(self.context.volume.pk)],
+        )
+
+        entry.delete()
+        self.assertEqual({}, get_volume_permissions(self.user.pk))
+
+        VolumeUser.objects.create(
+            volume=self.context.volume,
+            user=self.user,
+            permission=VolumePermissionEnum.READ,
+        )
+        self.assertEqual(1, len(get_volume_permissions(self.user.pk)))
+        self.user.delete()
+        self.assertEqual({}, get_volume_permissions(self.user.pk))
+
+    def test_invalidation(self):
+        """Test invalidation on permission, volume & user changes"""
+        self._grant(VolumePermissionEnum.READ)
+        self.assertEqual(1, get_volumes(self.user).count())
+        self._grant(VolumePermissionEnum.NONE)
+        self.assertEqual(0, get_volumes(self.user).count())
+
+        self._grant(VolumePermissionEnum.READ)
+        self.assertEqual(1, get_volumes(self.user).count())
+        delete_user(self.context.admin, self.user.pk)
+        self.assertEqual({}, get_volume_permissions(self.user.pk))
+
+        self.user = User.objects.create_user("y")
+        self._grant(VolumePermissionEnum.READ)
+        self.assertEqual(1, len(get_volume_permissions(self.user.pk)))
+        delete_volume(self.context.admin, self.context.volume.pk)
+        self.assertEqual({}, get_volume_permissions(self.user.pk))
+
+    def test_queries(self):
+        """Test queries used by permission checks"""
+        self._grant(VolumePermissionEnum.READ_WRITE)
+        get_volume_permissions(self.user.pk)
+
+        with self.assertNumQueries(1):
+            request_volume(
+                self.user, self.context.volume.pk, VolumePermissionEnum.READ, False
+            )
+        with self.assertNumQueries(1):
+            get_file(self.user, self.context.root_file.pk)
@@ -0,0 +1,130 @@
+import io
+import os
+import shutil
+import tempfile
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.test import TestCase
+from PIL import Image
+
+from rpidrive.controllers.local_file import (
+    create_entry,
+    get_full_path,
+    pregenerate_thumbnails,
+)
+from rpidrive.controllers.thumbnail import (
+    clear_thumbnail_cache,
+    get_thumbnail,
+    get_thumbnail_cache_size,
+)
+from rpidrive.tests.helpers.setup import SetupContext
+
+
+class TestThumbnailController(TestCase):
+    """Test thumbnail controller"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        self.config = settings.ROOT_CONFIG.thumbnail
+        self.old_dir = self.config.dir
+        self.config.dir = tempfile.mkdtemp()
+        clear_thumbnail_cache()
+
+    def tearDown(self):
+        clear_thumbnail_cache()
+        self.config.dir = self.old_dir
+        self.context.cleanup()
+        User.objects.all().delete()
+
+    def _create_file(self, name: str):
+        src_file = os.path.join(os.path.dirname(os.path.realpath(__file__)), name)
+        file_path = os.path.join(self.context.root_path, name)
+        shutil.copy2(src_file, file_path)
+        return create_entry(self.context.volume, self.context.root_file, file_path)
+
+    def test_get_thumbnail_1(self):
+        """Test get_thumbnail (Image)"""
+        file_obj = self._create_file("sample.jpg")
+        self.config.size = 50
+        try:
+            data = get_thumbnail(file_obj, get_full_path(file_obj))
+        finally:
+            self.config.size = 256
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual("JPEG", image.format)
+            self.assertEqual((50, 34), image.size)
+
+        # Served from cache until file is modified
+        os.remove(get_full_path(file_obj))
+        self.config.size = 50
+        try:
+            self.assertEqual(data, get_thumbnail(file_obj, get_full_path(file_obj)))
+            file_obj.last_modified += timedelta(seconds=1)
+            self.assertIsNone(get_thumbnail(file_obj, get_full_path(file_obj)))
+        finally:
+            self.config.size = 256
+
+    def test_get_thumbnail_2(self):
+        """Test get_thumbnail (Audio cover & no preview)"""
+        file_obj = self._create_file("sample.m4a")
+        data = get_thumbnail(file_obj, get_full_path(file_obj))
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual("JPEG", image.format)
+            self.assertEqual(256, max(image.size))
+
+        file_path = os.path.join(self.context.root_path, "log.txt")
+        with open(file_path, "w+") as f_h:
+            f_h.write("1")
+        file_obj = create_entry(self.context.volume, self.context.root_file, file_path)
+        self.assertIsNone(get_thumbnail(file_obj, file_path))
+        self.assertEqual(2, len(os.listdir(self.config.dir)))
+
+    def test_get_thumbnail_3(self):
+        """Test get_thumbnail (Rotated by EXIF orientation)"""
+        file_path = os.path.join(self.context.root_path, "rotated.jpg")
+        exif = Image.Exif()
+        exif[0x0112] = 6  # Rotate 90 degrees clockwise
+        Image.new("RGB", (1200, 800)).save(file_path, "JPEG", exif=exif)
+        file_obj = create_entry(self.context.volume, self.context.root_file, file_path)
+
+        data = get_thumbnail(file_obj, file_path)
+        with Image.open(io.BytesIO(data)) as image:
+            self.assertEqual((171, 256), image.size)
+
+    def test_eviction(self):
+        """Test least recently used entries are evicted"""
+        os.makedirs(self.config.dir, exist_ok=True)
+        paths = [os.path.join(self.config.dir, f"{idx}.jpg") for idx in range(3)]
+        for idx, path in enumerate(paths):
+            with open(path, "wb") as f_h:
+                f_h.write(b"0" * 400 * 1024)
+            os.utime(path, (idx, idx))
+
+        self.config.cache_size = 1
+        try:
+            file_obj = self._create_file("sample.jpg")
+            self.assertIsNotNone(get_thumbnail(file_obj, get_full_path(file_obj)))
+        finally:
+            self.config.cache_size = 512
+
+        self.assertEqual([False, True, True], [os.path.exists(path) for path in paths])
+        self.assertEqual(
+            sum(
+                max(os.path.getsize(os.path.join(self.config.dir, x)), 4096)
+                for x in os.listdir(self.config.dir)
+            ),
+            get_thumbnail_cache_size(),
+        )
+
+    def test_pregenerate_thumbnails(self):
+        """Test pregenerate_thumbnails"""
+        file_objs = [self._create_file(x) for x in ("sample.jpg", "sample.m4a")]
+        pregenerate_thumbnails(self.context.volume)
+        self.assertEqual(2, len(os.listdir(self.config.dir)))
+
+        for file_obj in file_objs:
+            os.remove(get_full_path(file_obj))
+            self.assertIsNotNone(get_thumbnail(file_obj, get_full_path(file_obj)))
@@ -0,0 +1,187 @@
+import io
+import os
+
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from rpidrive.controllers.exceptions import (
+    InvalidFileNameException,
+    InvalidOperationRequestException,
+    NoPermissionException,
+)
+from rpidrive.controllers.local_file import (
+    UPLOAD_STAGING_DIR,
+    delete_file,
+    perform_index,
+)
+from rpidrive.controllers.upload import (
+    InvalidUploadOffsetException,
+    UploadSessionNotFoundException,
+    clean_upload_sessions,
+    create_upload_session,
+    delete_upload_session,
+    get_upload_session,
+    write_upload_session,
+)
+from rpidrive.controllers.volume import VolumePermissionModel, update_volume_permission
+from rpidrive.models import File, UploadSession, VolumePermissionEnum
+from rpidrive.tests.helpers.setup import SetupContext
+
+
+class TestUploadController(TestCase):
+    """Test upload controller"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        self.staging_dir = os.path.join(self.context.root_path, UPLOAD_STAGING_DIR)
+
+    def tearDown(self):
+        self.context.cleanup()
+        User.objects.all().delete()
+
+    def _create_session(self, path: str = "folder/log.txt", size: int = 10):
+        return create_upload_session(
+            self.context.admin, self.context.root_file.pk, path, size
+        )
+
+    def test_upload_1(self):
+        """Test upload (Resume & finalize)"""
+        session = self._create_session()
+        self.assertEqual([str(session.pk)], os.listdir(self.staging_dir))
+
+        offset, file = write_upload_session(
+            self.context.admin, session.pk, 0, io.BytesIO(b"01234")
+        )
+        self.assertEqual((5, None), (offset, file))
+        self.assertEqual(1, File.objects.count())
+
+        with self.assertRaises(InvalidUploadOffsetException) as ctx:
+            write_upload_session(
+                self.context.admin, session.pk, 3, io.BytesIO(b"3456789")
+            )
+        self.assertEqual(5, ctx.exception.offset)
+
+        offset, file = write_upload_session(
+            self.context.admin, session.pk, 5, io.BytesIO(b"56789")
+        )
+        self.assertEqual(10, offset)
+        self.assertEqual("/folder/log.txt", file.path_from_vol)
+        self.assertEqual(10, file.size)
+        with open(os.path.join(self.context.root_path, "folder", "log.txt")) as f_h:
+            self.assertEqual("0123456789", f_h.read())
+        self.assertEqual([], os.listdir(self.staging_dir))
+        self.assertFalse(UploadSession.objects.exists())
+
+        # Name in use
+        session = self._create_session(size=0)
+        _, file = write_upload_session(
+            self.context.admin, session.pk, 0, io.BytesIO(b"")
+        )
+        self.assertEqual("/folder/log (1).txt", file.path_from_vol)
+
+    def test_upload_2(self):
+        """Test upload (Invalid requests)"""
+        for path in ["../log.txt", "a//log.txt", "a/./log.txt", " "]:
+            with self.assertRaises(InvalidFileNameException):
+                self._create_session(path)
+
+        session = self._create_session(size=2)
+        with self.assertRaises(InvalidOperationRequestException):
+            write_upload_session(self.context.admin, session.pk, 0, io.BytesIO(b"012"))
+        self.assertEqual(2, UploadSession.objects.get(pk=session.pk).offset)
+
+        user = User.objects.create_user("z")
+        with self.assertRaises(UploadSessionNotFoundException):
+            get_upload_session(user, session.pk)
+
+        update_volume_permission(
+            self.context.admin,
+            self.context.volume.pk,
+            [VolumePermissionModel(user=user.pk, permission=VolumePermissionEnum.READ)],
+        )
+        with self.assertRaises(NoPermissionException):
+            create_upload_session(user, self.context.root_file.pk, "log.txt", 1)
+
+    def test_upload_3(self):
+        """Test upload (Data received outside of transaction with write claim)"""
+        session = self._create_session(size=4)
+        atomic_depth = len(connection.atomic_blocks)
+        test = self
+
+        class _Stream:  # pylint: disable=too-few-public-methods
+            """Request body stream"""
+
+            def __init__(self, data: bytes):
+                self.data = io.BytesIO(data)
+
+            def read(self, size: int) -> bytes:
+                """Check session is claimed without lock & return data"""
+                test.assertEqual(atomic_depth, len(connection.atomic_blocks))
+                test.assertIsNotNone(UploadSession.objects.get().write_time)
+                with test.assertRaises(InvalidOperationRequestException):
+                    write_upload_session(
+                        test.context.admin, session.pk, 0, io.BytesIO(b"")
+                    )
+                with test.assertRaises(InvalidOperationRequestException):
+                    delete_upload_session(test.context.admin, session.pk)
+                return self.data.read(size)
+
+        offset, _ = write_upload_session(
+            self.context.admin, session.pk, 0, _Stream(b"01")
+        )
+        self.assertEqual(2, offset)
+        self.assertIsNone(UploadSession.objects.get().write_time)
+
+        # Claim left by a stopped request
+        UploadSession.objects.update(write_time=timezone.now() - timedelta(seconds=61))
+        offset, file = write_upload_session(
+            self.context.admin, session.pk, 2, io.BytesIO(b"23")
+        )
+        self.assertEqual(4, offset)
+        self.assertEqual(4, file.size)
+
+    def test_delete_upload_session(self):
+        """Test delete_upload_session"""
+        session = self._create_session()
+        delete_upload_session(self.context.admin, session.pk)
+        self.assertEqual([], os.listdir(self.staging_dir))
+        with self.assertRaises(UploadSessionNotFoundException):
+            get_upload_session(self.context.admin, session.pk)
+
+    def test_clean_upload_sessions(self):
+        """Test clean_upload_sessions"""
+        session_1 = self._create_session()
+        session_2 = self._create_session()
+        UploadSession.objects.filter(pk=session_1.pk).update(
+            expire_time=timezone.now() - timedelta(seconds=1)
+        )
+        for name in ("orphan", "tmp.upload"):
+            with open(os.path.join(self.staging_dir, name), "wb"):
+                pass
+        os.utime(os.path.join(self.staging_dir, "orphan"), (0, 0))
+
+        clean_upload_sessions()
+        self.assertEqual(
+            sorted([str(session_2.pk), "tmp.upload"]),
+            sorted(os.listdir(self.staging_dir)),
+        )
+        self.assertEqual(
+            [session_2.pk], list(UploadSession.objects.values_list("pk", flat=True))
+        )
+
+    def test_staging_not_indexed(self):
+        """Test staged data isn't indexed & sessions go with deleted folders"""
+        self._create_session()
+        perform_index(self.context.volume)
+        self.assertEqual(1, File.objects.count())
+
+        os.makedirs(os.path.join(self.context.root_path, "folder"))
+        perform_index(self.context.volume)
+        folder = File.objects.select_related("volume").get(name="folder")
+        create_upload_session(self.context.admin, folder.pk, "log.txt", 1)
+        delete_file(folder)
+        self.assertEqual(1, UploadSession.objects.count())
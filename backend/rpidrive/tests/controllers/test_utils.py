@@ -0,0 +1,66 @@
+import io
+import os
+import tempfile
+
+from django.test import SimpleTestCase
+
+from rpidrive.controllers.utils import RangeFileWrapper, parse_range_header
+
+
+class TestUtils(SimpleTestCase):
+    """Test utils"""
+
+    def test_range_file_wrapper_1(self):
+        """Test RangeFileWrapper (Growing chunks)"""
+        data = bytes(range(256)) * 10
+        wrapper = RangeFileWrapper(io.BytesIO(data), chunk_size=16, max_chunk_size=64)
+        chunks = list(wrapper)
+        self.assertEqual(data, b"".join(chunks))
+        self.assertEqual([16, 32, 64, 64], [len(x) for x in chunks[:4]])
+
+        wrapper = RangeFileWrapper(
+            io.BytesIO(data), chunk_size=16, offset=10, length=100, max_chunk_size=64
+        )
+        chunks = list(wrapper)
+        self.assertEqual(data[10:110], b"".join(chunks))
+        self.assertEqual([16, 32, 52], [len(x) for x in chunks])
+
+    def test_range_file_wrapper_2(self):
+        """Test RangeFileWrapper (Real file)"""
+        data = os.urandom(100000)
+        with tempfile.NamedTemporaryFile() as f_h:
+            f_h.write(data)
+            f_h.flush()
+            wrapper = RangeFileWrapper(
+                open(f_h.name, "rb"),  # pylint: disable=consider-using-with
+                chunk_size=1000,
+                offset=5,
+                length=90000,
+                max_chunk_size=50000,
+            )
+            self.assertEqual(data[5:90005], b"".join(wrapper))
+            wrapper.close()
+            self.assertTrue(wrapper.filelike.closed)
+
+    def test_parse_range_header(self):
+        """Test parse_range_header"""
+        test_data = [
+            ("", None),
+            ("bytes=", None),
+            ("items=0-1", None),
+            ("bytes=a-b", None),
+            ("bytes=5-2", None),
+            ("bytes=-", None),
+            ("bytes=2-5", [(2, 5)]),
+            ("Bytes = 2 - 5", [(2, 5)]),
+            ("bytes=2-", [(2, 9)]),
+            ("bytes=2-100", [(2, 9)]),
+            ("bytes=-3", [(7, 9)]),
+            ("bytes=-100", [(0, 9)]),
+            ("bytes=0-1, 4-5,-2", [(0, 1), (4, 5), (8, 9)]),
+            ("bytes=10-", []),
+            ("bytes=-0", []),
+            ("bytes=" + ",".join(["0-1"] * 33), None),
+        ]
+        for header, expected in test_data:
+            self.assertEqual(expected, parse_range_header(header, 10), header)
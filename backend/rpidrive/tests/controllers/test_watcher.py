@@ -0,0 +1,83 @@
+import os
+import shutil
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.test import TestCase
+
+from rpidrive.controllers.local_file import perform_index
+from rpidrive.controllers.watcher import VolumeWatcher
+from rpidrive.models import File
+from rpidrive.tests.helpers.setup import SetupContext
+
+
+class TestWatcherController(TestCase):
+    """Test watcher controller"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        with transaction.atomic():
+            perform_index(self.context.volume)
+        self.watcher = VolumeWatcher(0.1)
+        self.watcher.sync([self.context.volume])
+
+    def tearDown(self):
+        self.watcher.close()
+        self.context.cleanup()
+        User.objects.all().delete()
+
+    def _get_paths(self):
+        return set(
+            File.objects.filter(volume=self.context.volume).values_list(
+                "path_from_vol", flat=True
+            )
+        )
+
+    def test_watch_1(self):
+        """Test watcher (New file & folder)"""
+        with open(os.path.join(self.context.root_path, "log.txt"), "w+") as f_h:
+            f_h.write("1")
+        folder_path = os.path.join(self.context.root_path, "folder1")
+        os.makedirs(os.path.join(folder_path, "sub"))
+        with open(os.path.join(folder_path, "sub", "log.txt"), "w+") as f_h:
+            f_h.write("1")
+
+        self.watcher.wait(1.0)
+        self.assertEqual(
+            {"/", "/log.txt", "/folder1", "/folder1/sub", "/folder1/sub/log.txt"},
+            self._get_paths(),
+        )
+
+        # New folder is watched
+        with open(os.path.join(folder_path, "sub", "log2.txt"), "w+") as f_h:
+            f_h.write("1")
+        self.watcher.wait(1.0)
+        self.assertIn("/folder1/sub/log2.txt", self._get_paths())
+
+    def test_watch_2(self):
+        """Test watcher (Delete & rename)"""
+        folder_path = os.path.join(self.context.root_path, "folder1")
+        os.makedirs(folder_path)
+        with open(os.path.join(folder_path, "log.txt"), "w+") as f_h:
+            f_h.write("1")
+        self.watcher.wait(1.0)
+        pk = File.objects.get(path_from_vol="/folder1/log.txt").pk
+
+        os.rename(
+            os.path.join(folder_path, "log.txt"),
+            os.path.join(folder_path, "log2.txt"),
+        )
+        self.watcher.wait(1.0)
+        self.assertEqual(pk, File.objects.get(path_from_vol="/folder1/log2.txt").pk)
+
+        shutil.rmtree(folder_path)
+        self.watcher.wait(1.0)
+        self.assertEqual({"/"}, self._get_paths())
+
+    def test_sync(self):
+        """Test watcher sync"""
+        self.watcher.sync([])
+        with open(os.path.join(self.context.root_path, "log.txt"), "w+") as f_h:
+            f_h.write("1")
+        self.watcher.wait(0.5)
+        self.assertEqual({"/"}, self._get_paths())
@@ -0,0 +1,97 @@
+import io
+import zlib
+
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from django.test import SimpleTestCase
+
+from rpidrive.controllers.zipstream import ZipStreamWriter, get_stored_size
+
+
+class TestZipStream(SimpleTestCase):
+    """Test zipstream controller"""
+
+    def test_writer_1(self):
+        """Test ZipStreamWriter"""
+        buffer = io.BytesIO()
+        with ZipStreamWriter(buffer) as writer:
+            writer.write_dir("a", 0)
+            progress = list(
+                writer.write_stream("a/b.txt", 0, [b"hello ", b"world"], 11)
+            )
+            self.assertEqual([6, 11], progress)
+            list(
+                writer.write_stream(
+                    "c.txt", 0, [b"c" * 1000], 1000, ZIP_DEFLATED, compresslevel=1
+                )
+            )
+            data = b"abc" * 1000
+            compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            writer.write_compressed(
+                "d.txt",
+                0,
+                compressor.compress(data) + compressor.flush(),
+                zlib.crc32(data),
+                len(data),
+            )
+            self.assertEqual(len(buffer.getvalue()), writer.offset)
+
+        with ZipFile(io.BytesIO(buffer.getvalue())) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(
+                [
+                    ("a/", ZIP_STORED),
+                    ("a/b.txt", ZIP_STORED),
+                    ("c.txt", ZIP_DEFLATED),
+                    ("d.txt", ZIP_DEFLATED),
+                ],
+                [(x.filename, x.compress_type) for x in archive.infolist()],
+            )
+            self.assertEqual(b"hello world", archive.read("a/b.txt"))
+            self.assertEqual(b"c" * 1000, archive.read("c.txt"))
+            self.assertEqual(data, archive.read("d.txt"))
+            self.assertEqual((1980, 1, 1, 0, 0, 0), archive.getinfo("a/").date_time)
+
+    def test_writer_2(self):
+        """Test ZipStreamWriter (ZIP64)"""
+        buffer = io.BytesIO()
+        with ZipStreamWriter(buffer) as writer:
+            # Declared size decides if ZIP64 records are written.
+            list(writer.write_stream("big.txt", 0, [b"x"], 1 << 33))
+            for idx in range(0xFFFF):
+                writer.write_dir(str(idx), 0)
+
+        with ZipFile(io.BytesIO(buffer.getvalue())) as archive:
+            self.assertEqual(0x10000, len(archive.infolist()))
+            self.assertEqual(b"x", archive.read("big.txt"))
+
+    def test_get_stored_size(self):
+        """Test get_stored_size"""
+        chunk = bytes(64 * 1024 * 1024)
+        cases = (
+            [("a/", 0), ("a/é.txt", 3)],
+            [("a.txt", 1)] + [(f"{idx}/", 0) for idx in range(0xFFFF)],
+            # ZIP64 sizes, then ZIP64 offset
+            [("big.txt", 1 << 32), ("a.txt", 1)],
+        )
+        for entries in cases:
+            sink = _CountingSink()
+            with ZipStreamWriter(sink) as writer:
+                for name, size in entries:
+                    if name.endswith("/"):
+                        writer.write_dir(name, 0)
+                        continue
+                    chunks = [chunk[:size]] * (size // len(chunk)) or [bytes(size)]
+                    list(writer.write_stream(name, 0, chunks, size))
+            self.assertEqual(sink.size, get_stored_size(entries))
+
+
+class _CountingSink:  # pylint: disable=too-few-public-methods
+    """Output counting bytes only"""
+
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data: bytes):
+        """Count data"""
+        self.size += len(data)
@@ -140,6 +140,54 @@ class TestFileDetailView(TestCase):
         self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
         self.assertEqual(b"", response.content)
 
+    def test_get_4(self):
+        """Test GET method (Children pagination, sort & kind)"""
+        os.makedirs(os.path.join(self.context.root_path, "folder"))
+        create_entry(
+            self.context.volume,
+            self.context.root_file,
+            os.path.join(self.context.root_path, "folder"),
+        )
+        for name, size in [("b.txt", 3), ("a.txt", 1), ("c.txt", 2)]:
+            f_p = os.path.join(self.context.root_path, name)
+            with open(f_p, "w+") as f_h:
+                f_h.write("a" * size)
+            create_entry(self.context.volume, self.context.root_file, f_p)
+
+        url = f"{self.base_url}{self.context.root_file.id}"
+        self.client.force_login(self.context.admin)
+        test_data = [
+            ({}, ["folder", "a.txt", "b.txt", "c.txt"], None),
+            ({"children_sort": "-size"}, ["folder", "b.txt", "c.txt", "a.txt"], None),
+            ({"children_kind": "file"}, ["a.txt", "b.txt", "c.txt"], None),
+            ({"children_limit": 2}, ["folder", "a.txt"], 4),
+            ({"children_limit": 2, "children_offset": 2}, ["b.txt", "c.txt"], 4),
+            (
+                {
+                    "children_kind": "file",
+                    "children_sort": "-name",
+                    "children_limit": 1,
+                },
+                ["c.txt"],
+                3,
+            ),
+        ]
+        for params, names, count in test_data:
+            response = self.client.get(url, {"fields": "children", **params})
+            self.assertEqual(http.HTTPStatus.OK, response.status_code)
+            data = response.json()
+            self.assertEqual(names, [x["name"] for x in data["children"]])
+            self.assertEqual(count, data.get("children_count"))
+
+        for params in [
+            {"children_sort": "kind"},
+            {"children_kind": "link"},
+            {"children_limit": 0},
+            {"children_offset": -1},
+        ]:
+            response = self.client.get(url, {"fields": "children", **params})
+            self.assertEqual(http.HTTPStatus.BAD_REQUEST, response.status_code)
+
     def test_delete_1(self):
         """Test DELETE method"""
         fp_1 = os.path.join(self.context.root_path, "song1.m4a")
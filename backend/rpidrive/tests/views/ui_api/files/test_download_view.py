@@ -1,8 +1,11 @@
 import http
 import os
 import uuid
+from urllib.parse import quote, unquote
 
+from django.conf import settings
 from django.contrib.auth.models import User
+from django.http import FileResponse
 from django.test import TestCase
 from django.urls import resolve
 
@@ -105,6 +108,192 @@ class TestFileDownloadView(TestCase):
         self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
         self.assertEqual(b"", response.content)
 
+    def _get_with_backend(self, backend: str, file_url: str, headers=None):
+        web_config = settings.ROOT_CONFIG.web
+        old_backend = web_config.download_backend
+        web_config.download_backend = backend
+        try:
+            return self.client.get(file_url, headers=headers)
+        finally:
+            web_config.download_backend = old_backend
+
+    def test_get_6(self):
+        """Test GET method (sendfile backend)"""
+        fp_1 = os.path.join(self.context.root_path, "song1.m4a")
+        with open(fp_1, "w+") as f_h:
+            f_h.write("abcdefghijk")
+        file_1_obj = create_entry(self.context.volume, self.context.root_file, fp_1)
+        file_url = f"{self.base_url}{file_1_obj.id}"
+
+        self.client.force_login(self.context.admin)
+        response = self._get_with_backend("sendfile", file_url)
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual(b"abcdefghijk", b"".join(response.streaming_content))
+        self.assertEqual("11", response.headers["Content-Length"])
+        self.assertEqual(
+            'attachment;filename="song1.m4a"', response.headers["Content-Disposition"]
+        )
+
+        response = self._get_with_backend(
+            "sendfile", file_url, headers={"Range": "bytes=2-"}
+        )
+        self.assertIsInstance(response, FileResponse)
+        self.assertEqual(http.HTTPStatus.PARTIAL_CONTENT, response.status_code)
+        self.assertEqual(b"cdefghijk", b"".join(response.streaming_content))
+        self.assertEqual("9", response.headers["Content-Length"])
+        self.assertEqual("bytes 2-10/11", response.headers["Content-Range"])
+
+        # Bounded range falls back to streaming
+        response = self._get_with_backend(
+            "sendfile", file_url, headers={"Range": "bytes=2-5"}
+        )
+        self.assertNotIsInstance(response, FileResponse)
+        self.assertEqual(http.HTTPStatus.PARTIAL_CONTENT, response.status_code)
+        self.assertEqual(b"cdef", b"".join(response.streaming_content))
+        self.assertEqual("4", response.headers["Content-Length"])
+
+    def test_get_7(self):
+        """Test GET method (Proxy backends)"""
+        fp_1 = os.path.join(self.context.root_path, "song 1.m4a")
+        with open(fp_1, "w+") as f_h:
+            f_h.write("abcdefghijk")
+        file_1_obj = create_entry(self.context.volume, self.context.root_file, fp_1)
+        file_url = f"{self.base_url}{file_1_obj.id}"
+
+        self.client.force_login(self.context.admin)
+        response = self._get_with_backend("x-accel-redirect", file_url)
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual(b"", response.content)
+        self.assertEqual(
+            quote(f"/internal{fp_1}"), response.headers["X-Accel-Redirect"]
+        )
+        self.assertEqual(
+            'attachment;filename="song 1.m4a"', response.headers["Content-Disposition"]
+        )
+
+        response = self._get_with_backend("x-sendfile", file_url)
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual(b"", response.content)
+        self.assertEqual(quote(fp_1), response.headers["X-Sendfile"])
+
+        # Permission is still checked
+        self.client.force_login(self.user)
+        response = self._get_with_backend("x-accel-redirect", file_url)
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+        self.assertNotIn("X-Accel-Redirect", response.headers)
+
+    def _create_file(self):
+        fp_1 = os.path.join(self.context.root_path, "song1.m4a")
+        with open(fp_1, "w+") as f_h:
+            f_h.write("abcdefghijk")
+        file_1_obj = create_entry(self.context.volume, self.context.root_file, fp_1)
+        self.client.force_login(self.context.admin)
+        return f"{self.base_url}{file_1_obj.id}"
+
+    def test_get_8(self):
+        """Test GET method (Conditional requests)"""
+        file_url = self._create_file()
+        response = self.client.get(file_url)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+        self.assertTrue(etag.startswith('"'))
+        self.assertIn("no-cache", response.headers["Cache-Control"])
+
+        for headers in [
+            {"If-None-Match": etag},
+            {"If-None-Match": f'"x", {etag}'},
+            {"If-Modified-Since": last_modified},
+        ]:
+            response = self.client.get(file_url, headers=headers)
+            self.assertEqual(http.HTTPStatus.NOT_MODIFIED, response.status_code)
+            self.assertEqual(etag, response.headers["ETag"])
+            self.assertEqual(b"", response.content)
+
+        response = self.client.get(file_url, headers={"If-None-Match": '"x"'})
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual(b"abcdefghijk", b"".join(response.streaming_content))
+
+        response = self.client.get(file_url, headers={"If-Match": '"x"'})
+        self.assertEqual(http.HTTPStatus.PRECONDITION_FAILED, response.status_code)
+
+    def test_get_9(self):
+        """Test GET method (If-Range)"""
+        file_url = self._create_file()
+        response = self.client.get(file_url)
+        etag = response.headers["ETag"]
+        last_modified = response.headers["Last-Modified"]
+
+        for if_range in [etag, last_modified]:
+            response = self.client.get(
+                file_url, headers={"Range": "bytes=2-5", "If-Range": if_range}
+            )
+            self.assertEqual(http.HTTPStatus.PARTIAL_CONTENT, response.status_code)
+            self.assertEqual(b"cdef", b"".join(response.streaming_content))
+
+        for if_range in ['"x"', f"W/{etag}", "Thu, 01 Jan 1970 00:00:00 GMT"]:
+            response = self.client.get(
+                file_url, headers={"Range": "bytes=2-5", "If-Range": if_range}
+            )
+            self.assertEqual(http.HTTPStatus.OK, response.status_code)
+            self.assertEqual(b"abcdefghijk", b"".join(response.streaming_content))
+
+    def test_get_10(self):
+        """Test GET method (Multiple & invalid ranges)"""
+        file_url = self._create_file()
+        response = self.client.get(file_url, headers={"Range": "bytes=0-1,-2"})
+        self.assertEqual(http.HTTPStatus.PARTIAL_CONTENT, response.status_code)
+        content_type = response.headers["Content-Type"]
+        self.assertTrue(content_type.startswith("multipart/byteranges; boundary="))
+        boundary = content_type.split("boundary=")[1]
+        content = b"".join(response.streaming_content)
+        self.assertEqual(
+            (
+                f"--{boundary}\r\nContent-Type: application/octet-stream\r\n"
+                "Content-Range: bytes 0-1/11\r\n\r\nab\r\n"
+                f"--{boundary}\r\nContent-Type: application/octet-stream\r\n"
+                "Content-Range: bytes 9-10/11\r\n\r\njk\r\n"
+                f"--{boundary}--\r\n"
+            ).encode(),
+            content,
+        )
+        self.assertEqual(str(len(content)), response.headers["Content-Length"])
+
+        response = self.client.get(file_url, headers={"Range": "bytes=-3"})
+        self.assertEqual(http.HTTPStatus.PARTIAL_CONTENT, response.status_code)
+        self.assertEqual(b"ijk", b"".join(response.streaming_content))
+        self.assertEqual("bytes 8-10/11", response.headers["Content-Range"])
+
+        response = self.client.get(file_url, headers={"Range": "bytes=20-"})
+        self.assertEqual(
+            http.HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE, response.status_code
+        )
+        self.assertEqual("bytes */11", response.headers["Content-Range"])
+
+        response = self.client.get(file_url, headers={"Range": "bytes=5-2"})
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual(b"abcdefghijk", b"".join(response.streaming_content))
+
+    def test_get_11(self):
+        """Test GET method (Proxy backends, non-ASCII path)"""
+        fp_1 = os.path.join(self.context.root_path, "歌 1.m4a")
+        with open(fp_1, "w+") as f_h:
+            f_h.write("abcdefghijk")
+        file_1_obj = create_entry(self.context.volume, self.context.root_file, fp_1)
+        file_url = f"{self.base_url}{file_1_obj.id}"
+
+        self.client.force_login(self.context.admin)
+        for backend, header, prefix in [
+            ("x-accel-redirect", "X-Accel-Redirect", "/internal"),
+            ("x-sendfile", "X-Sendfile", ""),
+        ]:
+            response = self._get_with_backend(backend, file_url)
+            self.assertEqual(http.HTTPStatus.OK, response.status_code)
+            value = response.headers[header]
+            self.assertTrue(value.isascii())
+            self.assertEqual(quote(f"{prefix}{fp_1}"), value)
+            self.assertEqual(f"{prefix}{fp_1}", unquote(value))
+
     def test_post_1(self):
         """Test POST method"""
         self.client.force_login(self.context.admin)
@@ -0,0 +1,124 @@
+import http
+import io
+import os
+import shutil
+import uuid
+
+from zipfile import ZIP_DEFLATED, ZIP_STORED, ZipFile
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import resolve
+
+from rpidrive.controllers.local_file import perform_index
+from rpidrive.models import File
+from rpidrive.tests.helpers.setup import SetupContext
+from rpidrive.views.ui_api.files import FileDownloadZipView
+
+
+class TestFileDownloadZipView(TestCase):
+    """Test FileDownloadZipView"""
+
+    @staticmethod
+    def _get_url(file_id: str) -> str:
+        return f"/drive/ui-api/files/{file_id}/download-zip"
+
+    def setUp(self):
+        self.context = SetupContext()
+        self.user = User.objects.create_user("z")
+
+        folder_path = os.path.join(self.context.root_path, "folder")
+        os.makedirs(os.path.join(folder_path, "sub"))
+        src_path = os.path.join(
+            os.path.dirname(os.path.realpath(__file__)), "sample.m4a"
+        )
+        shutil.copy2(src_path, folder_path)
+        with open(os.path.join(folder_path, "sub", "log.txt"), "w") as f_h:
+            f_h.write("log" * 1000)
+        perform_index(self.context.volume)
+        self.folder = File.objects.get(name="folder")
+
+    def tearDown(self):
+        self.context.cleanup()
+        User.objects.all().delete()
+
+    def test_url(self):
+        """Test url"""
+        self.assertEqual(
+            FileDownloadZipView, resolve(self._get_url(uuid.uuid4())).func.view_class
+        )
+
+    def test_get_1(self):
+        """Test GET method (Stored)"""
+        self.client.force_login(self.context.admin)
+        response = self.client.get(self._get_url(self.folder.pk))
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual("application/zip", response["Content-Type"])
+        self.assertEqual(
+            'attachment;filename="folder.zip"', response["Content-Disposition"]
+        )
+        data = b"".join(response.streaming_content)
+        self.assertEqual(len(data), int(response["Content-Length"]))
+
+        with ZipFile(io.BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(
+                {
+                    "folder/": ZIP_STORED,
+                    "folder/sample.m4a": ZIP_STORED,
+                    "folder/sub/": ZIP_STORED,
+                    "folder/sub/log.txt": ZIP_STORED,
+                },
+                {x.filename: x.compress_type for x in archive.infolist()},
+            )
+            self.assertEqual(b"log" * 1000, archive.read("folder/sub/log.txt"))
+
+    def test_get_2(self):
+        """Test GET method (Compressed)"""
+        self.client.force_login(self.context.admin)
+        response = self.client.get(
+            self._get_url(self.folder.pk), data={"compress": "true"}
+        )
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertFalse(response.has_header("Content-Length"))
+
+        data = b"".join(response.streaming_content)
+        with ZipFile(io.BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            # Audio is compressed already
+            self.assertEqual(
+                ZIP_STORED, archive.getinfo("folder/sample.m4a").compress_type
+            )
+            self.assertEqual(
+                ZIP_DEFLATED, archive.getinfo("folder/sub/log.txt").compress_type
+            )
+
+    def test_get_3(self):
+        """Test GET method (File shrunk while streaming)"""
+        self.client.force_login(self.context.admin)
+        response = self.client.get(self._get_url(File.objects.get(name="log.txt").pk))
+        with open(
+            os.path.join(self.context.root_path, "folder", "sub", "log.txt"), "w"
+        ):
+            pass
+
+        data = b"".join(response.streaming_content)
+        self.assertEqual(len(data), int(response["Content-Length"]))
+        with ZipFile(io.BytesIO(data)) as archive:
+            self.assertIsNone(archive.testzip())
+            self.assertEqual(bytes(3000), archive.read("log.txt"))
+
+    def test_get_4(self):
+        """Test GET method (Invalid requests)"""
+        self.client.force_login(self.user)
+        response = self.client.get(self._get_url(self.folder.pk))
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+        self.assertEqual({"error": "File not found."}, response.json())
+
+        response = self.client.get(self._get_url(uuid.uuid4()))
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+
+    def test_get_5(self):
+        """Test GET method (No login)"""
+        response = self.client.get(self._get_url(self.folder.pk))
+        self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
@@ -1,4 +1,5 @@
 import http
+import json
 import os
 
 from django.contrib.auth.models import User
@@ -57,7 +58,8 @@ class TestSearchView(TestCase):
                     "kind": x.kind.value,
                 }
                 for idx, x in enumerate(result)
-            ]
+            ],
+            "next_cursor": None,
         }
         actual = response.json()
         for row in actual["values"]:
@@ -88,7 +90,7 @@ class TestSearchView(TestCase):
         self.client.force_login(self.user)
         response = self.client.get(self.url, {"keyword": "mmy"})
         self.assertEqual(http.HTTPStatus.OK, response.status_code)
-        self.assertEqual({"values": []}, response.json())
+        self.assertEqual({"values": [], "next_cursor": None}, response.json())
 
         update_volume_permission(
             self.context.admin,
@@ -109,6 +111,52 @@ class TestSearchView(TestCase):
         self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
         self.assertEqual(b"", response.content)
 
+    def _create_files(self, count: int):
+        for idx in range(count):
+            f_p = os.path.join(self.context.root_path, f"dummy{idx}.txt")
+            with open(f_p, "w+") as f_h:
+                f_h.write("a")
+            create_entry(self.context.volume, self.context.root_file, f_p)
+
+    def test_get_5(self):
+        """Test GET method (Pagination)"""
+        self._create_files(5)
+        self.client.force_login(self.context.admin)
+
+        names = []
+        params = {"keyword": "mmy", "limit": 2}
+        for _ in range(3):
+            response = self.client.get(self.url, params)
+            self.assertEqual(http.HTTPStatus.OK, response.status_code)
+            names.extend(x["name"] for x in response.json()["values"])
+            params["cursor"] = response.json()["next_cursor"]
+        self.assertIsNone(params["cursor"])
+        self.assertEqual([f"dummy{idx}.txt" for idx in range(5)], names)
+
+    def test_get_6(self):
+        """Test GET method (NDJSON)"""
+        self._create_files(3)
+        self.client.force_login(self.context.admin)
+        response = self.client.get(self.url, {"keyword": "mmy", "format": "ndjson"})
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual("application/x-ndjson", response["Content-Type"])
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(
+            [f"dummy{idx}.txt" for idx in range(3)],
+            [json.loads(x)["name"] for x in lines],
+        )
+
+    def test_get_7(self):
+        """Test GET method (Invalid parameters)"""
+        self.client.force_login(self.context.admin)
+        response = self.client.get(self.url, {"keyword": "mmy", "cursor": "abc"})
+        self.assertEqual(http.HTTPStatus.BAD_REQUEST, response.status_code)
+        self.assertEqual({"error": "Invalid cursor."}, response.json())
+
+        for limit in ["0", "1001", "a"]:
+            response = self.client.get(self.url, {"keyword": "mmy", "limit": limit})
+            self.assertEqual(http.HTTPStatus.BAD_REQUEST, response.status_code)
+
     def test_post_1(self):
         """Test POST method"""
         self.client.force_login(self.context.admin)
@@ -1,5 +1,6 @@
 import http
 import os
+import shutil
 import uuid
 
 from django.contrib.auth.models import User
@@ -7,6 +8,7 @@ from django.test import TestCase
 from django.urls import resolve
 
 from rpidrive.controllers.local_file import create_entry
+from rpidrive.controllers.thumbnail import clear_thumbnail_cache
 from rpidrive.controllers.volume import VolumePermissionModel, update_volume_permission
 from rpidrive.models import VolumePermissionEnum
 from rpidrive.tests.helpers.setup import SetupContext
@@ -22,6 +24,7 @@ class TestFileThumbnailView(TestCase):
         self.user = User.objects.create_user("z")
 
     def tearDown(self):
+        clear_thumbnail_cache()
         self.context.cleanup()
         User.objects.all().delete()
 
@@ -81,6 +84,47 @@ class TestFileThumbnailView(TestCase):
         self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
         self.assertEqual(b"", response.content)
 
+    def test_get_5(self):
+        """Test GET method (Conditional request)"""
+        f_p = os.path.join(self.context.root_path, "dummy2.m4a")
+        with open(f_p, "w+") as f_h:
+            f_h.write("a")
+        file_obj = create_entry(self.context.volume, self.context.root_file, f_p)
+        file_url = f"/drive/ui-api/files/{file_obj.id}/thumbnail"
+
+        self.client.force_login(self.context.admin)
+        response = self.client.get(file_url)
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        etag = response.headers["ETag"]
+
+        os.remove(f_p)  # No disk access needed
+        response = self.client.get(file_url, headers={"If-None-Match": etag})
+        self.assertEqual(http.HTTPStatus.NOT_MODIFIED, response.status_code)
+        self.assertEqual(etag, response.headers["ETag"])
+
+    def test_get_6(self):
+        """Test GET method (Image)"""
+        f_p = os.path.join(self.context.root_path, "sample.jpg")
+        shutil.copy2(
+            os.path.join(
+                os.path.dirname(
+                    os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+                ),
+                "controllers",
+                "sample.jpg",
+            ),
+            f_p,
+        )
+        file_obj = create_entry(self.context.volume, self.context.root_file, f_p)
+        file_url = f"/drive/ui-api/files/{file_obj.id}/thumbnail"
+
+        self.client.force_login(self.context.admin)
+        response = self.client.get(file_url)
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual("image/jpeg", response.headers["Content-Type"])
+        self.assertTrue(response.content.startswith(b"\xff\xd8"))
+        self.assertEqual("private, max-age=604800", response.headers["Cache-Control"])
+
     def test_post_1(self):
         """Test POST method"""
         self.client.force_login(self.context.admin)
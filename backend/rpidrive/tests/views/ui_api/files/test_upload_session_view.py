@@ -0,0 +1,165 @@
+import http
+import os
+import uuid
+
+from django.contrib.auth.models import User
+from django.test import TestCase, TransactionTestCase
+from django.urls import resolve
+
+from rpidrive.models import File, UploadSession
+from rpidrive.tests.helpers.setup import SetupContext
+from rpidrive.views.ui_api.files import FileUploadSessionView, UploadSessionDetailView
+
+
+class TestFileUploadSessionView(TestCase):
+    """Test FileUploadSessionView & UploadSessionDetailView"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        self.url = f"/drive/ui-api/files/{self.context.root_file.id}/uploads"
+        self.user = User.objects.create_user("z")
+
+    def tearDown(self):
+        self.context.cleanup()
+        User.objects.all().delete()
+
+    @staticmethod
+    def _get_session_url(session_id: str) -> str:
+        return f"/drive/ui-api/files/uploads/{session_id}"
+
+    def _put(self, session_id: str, offset, data: bytes):
+        return self.client.put(
+            self._get_session_url(session_id),
+            data,
+            content_type="application/octet-stream",
+            headers={"Upload-Offset": str(offset)},
+        )
+
+    def test_url(self):
+        """Test url"""
+        self.assertEqual(FileUploadSessionView, resolve(self.url).func.view_class)
+        self.assertEqual(
+            UploadSessionDetailView,
+            resolve(self._get_session_url(uuid.uuid4())).func.view_class,
+        )
+
+    def test_upload(self):
+        """Test upload"""
+        self.client.force_login(self.context.admin)
+        response = self.client.post(
+            self.url,
+            data={"path": "lel/log.txt", "size": 6},
+            content_type="application/json",
+        )
+        self.assertEqual(http.HTTPStatus.CREATED, response.status_code)
+        session_id = response.json()["id"]
+        self.assertEqual({"id": session_id, "offset": 0, "size": 6}, response.json())
+
+        response = self._put(session_id, 0, b"abc")
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual({"offset": 3, "file": None}, response.json())
+
+        response = self._put(session_id, 0, b"abc")
+        self.assertEqual(http.HTTPStatus.CONFLICT, response.status_code)
+        self.assertEqual(3, response.json()["offset"])
+
+        response = self._put(session_id, "x", b"def")
+        self.assertEqual(http.HTTPStatus.BAD_REQUEST, response.status_code)
+        self.assertEqual({"error": "Invalid Upload-Offset header."}, response.json())
+
+        response = self.client.get(self._get_session_url(session_id))
+        self.assertEqual({"id": session_id, "offset": 3, "size": 6}, response.json())
+
+        response = self._put(session_id, 3, b"def")
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        file = File.objects.get(name="log.txt")
+        self.assertEqual({"offset": 6, "file": str(file.pk)}, response.json())
+        self.assertEqual("/lel/log.txt", file.path_from_vol)
+        with open(os.path.join(self.context.root_path, "lel", "log.txt"), "rb") as f_h:
+            self.assertEqual(b"abcdef", f_h.read())
+
+        response = self.client.get(self._get_session_url(session_id))
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+        self.assertEqual({"error": "Upload session not found."}, response.json())
+
+    def test_delete(self):
+        """Test DELETE method"""
+        self.client.force_login(self.context.admin)
+        response = self.client.post(
+            self.url,
+            data={"path": "log.txt", "size": 6},
+            content_type="application/json",
+        )
+        session_id = response.json()["id"]
+
+        self.client.force_login(self.user)
+        response = self.client.delete(self._get_session_url(session_id))
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+
+        self.client.force_login(self.context.admin)
+        response = self.client.delete(self._get_session_url(session_id))
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_post(self):
+        """Test POST method (Invalid requests)"""
+        self.client.force_login(self.context.admin)
+        response = self.client.post(
+            self.url,
+            data={"path": "../log.txt", "size": 1},
+            content_type="application/json",
+        )
+        self.assertEqual(http.HTTPStatus.BAD_REQUEST, response.status_code)
+        self.assertEqual({"error": "Invalid file path."}, response.json())
+
+        response = self.client.post(
+            self.url,
+            data={"path": "log.txt", "size": -1},
+            content_type="application/json",
+        )
+        self.assertEqual(http.HTTPStatus.BAD_REQUEST, response.status_code)
+
+        self.client.force_login(self.user)
+        response = self.client.post(
+            self.url,
+            data={"path": "log.txt", "size": 1},
+            content_type="application/json",
+        )
+        self.assertEqual(http.HTTPStatus.NOT_FOUND, response.status_code)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_no_login(self):
+        """Test without login"""
+        response = self.client.post(self.url)
+        self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
+        response = self._put(uuid.uuid4(), 0, b"a")
+        self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
+
+
+class TestFileUploadSessionViewAutocommit(TransactionTestCase):
+    """Test upload session views outside of test transaction"""
+
+    def setUp(self):
+        self.context = SetupContext()
+
+    def tearDown(self):
+        self.context.cleanup()
+
+    def test_upload(self):
+        """Test upload"""
+        self.client.force_login(self.context.admin)
+        response = self.client.post(
+            f"/drive/ui-api/files/{self.context.root_file.id}/uploads",
+            data={"path": "log.txt", "size": 3},
+            content_type="application/json",
+        )
+        self.assertEqual(http.HTTPStatus.CREATED, response.status_code)
+
+        response = self.client.put(
+            f"/drive/ui-api/files/uploads/{response.json()['id']}",
+            b"abc",
+            content_type="application/octet-stream",
+            headers={"Upload-Offset": "0"},
+        )
+        self.assertEqual(http.HTTPStatus.OK, response.status_code)
+        self.assertEqual("/log.txt", File.objects.get(name="log.txt").path_from_vol)
@@ -4,10 +4,10 @@ import uuid
 
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.contrib.auth.models import User
-from django.test import TestCase
+from django.test import Client, TestCase, TransactionTestCase, override_settings
 from django.urls import resolve
 
-from rpidrive.controllers.local_file import create_entry
+from rpidrive.controllers.local_file import UPLOAD_STAGING_DIR, create_entry
 from rpidrive.controllers.volume import VolumePermissionModel, update_volume_permission
 from rpidrive.models import File, VolumePermissionEnum
 from rpidrive.tests.helpers.setup import SetupContext
@@ -205,6 +205,32 @@ class TestFileUploadView(TestCase):
         self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
         self.assertEqual(b"", response.content)
 
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=1024)
+    def test_post_8(self):
+        """Test POST method (Large file staged in volume)"""
+        self.client.force_login(self.context.admin)
+        with open(os.path.join(self.curr_path, "sample.m4a"), "rb") as f_h:
+            data = f_h.read()
+        ul_file = SimpleUploadedFile("sample.m4a", data)
+        response = self.client.post(
+            self.url, {"files": ul_file, "paths": ["sample.m4a"]}
+        )
+
+        self.assertEqual(http.HTTPStatus.CREATED, response.status_code)
+        with open(os.path.join(self.context.root_path, "sample.m4a"), "rb") as f_h:
+            self.assertEqual(data, f_h.read())
+        staging_dir = os.path.join(self.context.root_path, UPLOAD_STAGING_DIR)
+        self.assertEqual([], os.listdir(staging_dir))
+
+    def test_post_9(self):
+        """Test POST method (CSRF)"""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.context.admin)
+        ul_file = SimpleUploadedFile("log.txt", b"a")
+        response = client.post(self.url, {"files": ul_file, "paths": ["log.txt"]})
+        self.assertEqual(http.HTTPStatus.FORBIDDEN, response.status_code)
+        self.assertEqual(1, File.objects.count())
+
     def test_get_1(self):
         """Test GET method"""
         self.client.force_login(self.context.admin)
@@ -243,3 +269,23 @@ class TestFileUploadView(TestCase):
         response = self.client.delete(self.url)
         self.assertEqual(http.HTTPStatus.FOUND, response.status_code)
         self.assertEqual(b"", response.content)
+
+
+class TestFileUploadViewAutocommit(TransactionTestCase):
+    """Test FileUploadView outside of test transaction, as it runs in production"""
+
+    def setUp(self):
+        self.context = SetupContext()
+        self.url = f"/drive/ui-api/files/{self.context.root_file.id}/upload"
+
+    def tearDown(self):
+        self.context.cleanup()
+
+    @override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=1)
+    def test_post(self):
+        """Test POST method"""
+        self.client.force_login(self.context.admin)
+        ul_file = SimpleUploadedFile("log.txt", b"abc")
+        response = self.client.post(self.url, {"files": ul_file, "paths": ["log.txt"]})
+        self.assertEqual(http.HTTPStatus.CREATED, response.status_code)
+        self.assertEqual("/log.txt", File.objects.get(name="log.txt").path_from_vol)
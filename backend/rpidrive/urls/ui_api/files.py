@@ -4,13 +4,16 @@ from rpidrive.views.ui_api.files import (
     FileCompressView,
     FileDeleteView,
     FileDetailView,
+    FileDownloadZipView,
     FileMoveView,
     FileRenameView,
     FileSearchView,
     FileShareView,
     FileThumbnailView,
+    FileUploadSessionView,
     FileUploadView,
     NewFolderView,
+    UploadSessionDetailView,
 )
 
 urlpatterns = [
@@ -18,10 +21,13 @@ urlpatterns = [
     path("delete", FileDeleteView.as_view()),
     path("move", FileMoveView.as_view()),
     path("search", FileSearchView.as_view()),
+    path("uploads/<uuid:session_id>", UploadSessionDetailView.as_view()),
     path("<uuid:file_id>", FileDetailView.as_view()),
+    path("<uuid:file_id>/download-zip", FileDownloadZipView.as_view()),
     path("<uuid:file_id>/new-folder", NewFolderView.as_view()),
     path("<uuid:file_id>/rename", FileRenameView.as_view()),
     path("<uuid:file_id>/share", FileShareView.as_view()),
     path("<uuid:file_id>/thumbnail", FileThumbnailView.as_view()),
     path("<uuid:file_id>/upload", FileUploadView.as_view()),
+    path("<uuid:file_id>/uploads", FileUploadSessionView.as_view()),
 ]
@@ -1,6 +1,7 @@
 from .compress_view import *
 from .delete_view import *
 from .detail_view import *
+from .download_zip_view import *
 from .move_view import *
 from .new_folder_view import *
 from .qa_view import *
@@ -8,4 +9,5 @@ from .rename_view import *
 from .search_view import *
 from .share_view import *
 from .thumbnail_view import *
+from .upload_session_view import *
 from .upload_view import *
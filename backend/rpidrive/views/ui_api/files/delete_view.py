@@ -34,5 +34,5 @@ class FileDeleteView(LoginRequiredMixin, View):
     def post(self, request, *_args, **_kwargs) -> JsonResponse:
         """Handle POST request"""
         data = _RequestModel.model_validate_json(request.body)
-        delete_files(request.user, data.files)
-        return JsonResponse({})
+        job = delete_files(request.user, data.files)
+        return JsonResponse({"job": job.pk} if job else {})
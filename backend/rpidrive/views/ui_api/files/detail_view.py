@@ -1,8 +1,9 @@
-from typing import Any, Dict
+from typing import Any, Dict, Literal, Optional
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http.response import JsonResponse
 from django.views import View
+from pydantic import BaseModel, Field
 
 from rpidrive.controllers.file import (
     InvalidOperationRequestException,
@@ -17,6 +18,17 @@ from rpidrive.models import File, FileKindEnum
 from rpidrive.views.decorators.generics import handle_exceptions
 
 
+class _ChildrenRequestModel(BaseModel):
+    """Request model for children field"""
+
+    children_sort: Optional[
+        Literal["name", "-name", "size", "-size", "last_modified", "-last_modified"]
+    ] = "name"
+    children_kind: Optional[FileKindEnum] = None
+    children_offset: Optional[int] = Field(ge=0, default=0)
+    children_limit: Optional[int] = Field(gt=0, default=None)
+
+
 class FileDetailView(LoginRequiredMixin, View):
     """File detail view"""
 
@@ -30,7 +42,6 @@ class FileDetailView(LoginRequiredMixin, View):
         _VOLUME_FIELD,
         _PARENT_FIELD,
     )
-    _PREFETCH_FIELDS = (_CHILDREN_FIELD,)
 
     @staticmethod
     def _get_file_as_raw(file: File) -> Dict[str, Any]:
@@ -56,6 +67,27 @@ class FileDetailView(LoginRequiredMixin, View):
             "name": file.name,
         }
 
+    @staticmethod
+    def _get_children(file: File, data: _ChildrenRequestModel) -> Dict[str, Any]:
+        """Get a page of children, folders first"""
+        children = File.objects.filter(parent=file)
+        if data.children_kind:
+            children = children.filter(kind=data.children_kind)
+        children = children.order_by("-kind", data.children_sort, "pk")
+
+        result = {}
+        if data.children_limit:
+            result["children_count"] = children.count()
+            children = children[
+                data.children_offset : data.children_offset + data.children_limit
+            ]
+        elif data.children_offset:
+            children = children[data.children_offset :]
+        result[FileDetailView._CHILDREN_FIELD] = [
+            FileDetailView._get_file_as_raw(child) for child in children
+        ]
+        return result
+
     @handle_exceptions(
         known_exc={
             FileNotFoundException,
@@ -65,13 +97,15 @@ class FileDetailView(LoginRequiredMixin, View):
         """Handle GET request"""
         fields = set(request.GET.get("fields", "").split(","))
         select_related = {x for x in self._SELECT_FIELDS if x in fields}
-        prefetch_related = {x for x in self._PREFETCH_FIELDS if x in fields}
         reindex = request.GET.get(self._REINDEX_PARAM, "") == "true"
+        children_data = None
+        if self._CHILDREN_FIELD in fields:
+            children_data = _ChildrenRequestModel.model_validate(request.GET.dict())
 
-        file = get_file(request.user, file_id, select_related, prefetch_related)
+        file = get_file(request.user, file_id, select_related)
         if file.kind == FileKindEnum.FOLDER and reindex:
             perform_shallow_index(file)
-            file = get_file(request.user, file_id, select_related, prefetch_related)
+            file = get_file(request.user, file_id, select_related)
         raw_data = FileDetailView._get_file_as_raw(file)
 
         # Add extra fields
@@ -84,11 +118,8 @@ class FileDetailView(LoginRequiredMixin, View):
             raw_data[self._PARENT_FIELD] = FileDetailView._get_file_as_raw_simple(
                 file.parent
             )
-        if self._CHILDREN_FIELD in prefetch_related:
-            raw_data[self._CHILDREN_FIELD] = [
-                FileDetailView._get_file_as_raw(child)
-                for child in file.children.order_by("-kind", "name").all()
-            ]
+        if children_data:
+            raw_data.update(FileDetailView._get_children(file, children_data))
         if self._PATH_FIELD in fields:
             raw_data[self._PATH_FIELD] = [
                 FileDetailView._get_file_as_raw_simple(comp)
@@ -106,5 +137,5 @@ class FileDetailView(LoginRequiredMixin, View):
     )
     def delete(self, request, file_id: str, *args, **kwargs) -> JsonResponse:
         """Handle DELETE request"""
-        delete_files(request.user, [file_id])
-        return JsonResponse({})
+        job = delete_files(request.user, [file_id])
+        return JsonResponse({"job": job.pk} if job else {})
@@ -1,6 +1,6 @@
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.views import View
 
 from rpidrive.controllers.exceptions import (
@@ -26,6 +26,6 @@ class FileDownloadView(LoginRequiredMixin, View):
     )
     def get(
         self, request: WSGIRequest, file_id: str, *_args, **_kwargs
-    ) -> StreamingHttpResponse:
+    ) -> HttpResponseBase:
         """Handle GET request"""
         return serve_file(request.user, file_id, request)
@@ -0,0 +1,30 @@
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.handlers.wsgi import WSGIRequest
+from django.http.response import HttpResponseBase
+from django.views import View
+
+from rpidrive.controllers.exceptions import NoPermissionException
+from rpidrive.controllers.file import (
+    FileNotFoundException,
+    serve_zip,
+)
+from rpidrive.views.decorators.generics import handle_exceptions
+
+
+class FileDownloadZipView(LoginRequiredMixin, View):
+    """File download as ZIP view, the archive is streamed while written"""
+
+    _COMPRESS_PARAM = "compress"
+
+    @handle_exceptions(
+        known_exc={
+            FileNotFoundException,
+            NoPermissionException,
+        }
+    )
+    def get(
+        self, request: WSGIRequest, file_id: str, *_args, **_kwargs
+    ) -> HttpResponseBase:
+        """Handle GET request"""
+        deflate = request.GET.get(self._COMPRESS_PARAM, "") == "true"
+        return serve_zip(request.user, file_id, deflate)
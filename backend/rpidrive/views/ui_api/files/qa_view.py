@@ -1,5 +1,5 @@
 from django.core.handlers.wsgi import WSGIRequest
-from django.http import StreamingHttpResponse
+from django.http.response import HttpResponseBase
 from django.views import View
 
 from rpidrive.controllers.exceptions import InvalidOperationRequestException
@@ -19,7 +19,7 @@ class FileQAView(View):
             InvalidOperationRequestException,
         }
     )
-    def get(self, request: WSGIRequest, *_args, **_kwargs) -> StreamingHttpResponse:
+    def get(self, request: WSGIRequest, *_args, **_kwargs) -> HttpResponseBase:
         """Handle GET request"""
         qa_id = request.GET.get("key", None)
         return serve_qa_file(qa_id, request)
@@ -1,8 +1,18 @@
+import base64
+import binascii
+import json
+import uuid
+
+from typing import Any, Dict, Iterator, Literal, Optional, Tuple
+
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http.response import JsonResponse
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http.response import HttpResponse, JsonResponse, StreamingHttpResponse
 from django.views import View
+from pydantic import BaseModel, Field
 
 from rpidrive.controllers.file import get_file_full_path, search_files
+from rpidrive.models import File
 from rpidrive.views.decorators.generics import handle_exceptions
 
 
@@ -10,31 +20,88 @@ class _InvalidKeywordException(Exception):
     """Invalid keyword exception"""
 
 
+class _InvalidCursorException(Exception):
+    """Invalid cursor exception"""
+
+
+class _RequestModel(BaseModel):
+    """Request model for search"""
+
+    keyword: str
+    limit: Optional[int] = Field(gt=0, le=1000, default=1000)
+    cursor: Optional[str] = None
+    format: Optional[Literal["json", "ndjson"]] = "json"
+
+
 class FileSearchView(LoginRequiredMixin, View):
-    """File search view"""
+    """File search view.
+
+    Results are paginated with an opaque cursor. The ndjson format streams
+    every match after the cursor, one file per line.
+    """
+
+    _ITERATOR_CHUNK_SIZE = 500
+
+    @staticmethod
+    def _get_file_as_raw(file: File) -> Dict[str, Any]:
+        return {
+            "id": file.pk,
+            "name": file.name,
+            "path": get_file_full_path(file),
+            "last_modified": file.last_modified,
+            "size": file.size,
+            "media_type": file.media_type,
+            "kind": file.kind,
+        }
+
+    @staticmethod
+    def _encode_cursor(file: File) -> str:
+        data = json.dumps([file.rank, file.name, str(file.pk)])
+        return base64.urlsafe_b64encode(data.encode()).decode()
+
+    @staticmethod
+    def _decode_cursor(cursor: str) -> Tuple[float, str, str]:
+        try:  # Cursor is (rank, name, pk) of the last file of previous page
+            rank, name, file_pk = json.loads(base64.urlsafe_b64decode(cursor))
+            return float(rank), str(name), str(uuid.UUID(file_pk))
+        except (binascii.Error, TypeError, ValueError) as exc:
+            raise _InvalidCursorException("Invalid cursor.") from exc
+
+    @staticmethod
+    def _stream_files(files) -> Iterator[str]:
+        for file in files.iterator(chunk_size=FileSearchView._ITERATOR_CHUNK_SIZE):
+            data = FileSearchView._get_file_as_raw(file)
+            yield json.dumps(data, cls=DjangoJSONEncoder) + "\n"
 
     @handle_exceptions(
         known_exc={
+            _InvalidCursorException,
             _InvalidKeywordException,
             NotImplementedError,
         }
     )
-    def get(self, request, *_args, **_kwargs) -> JsonResponse:
+    def get(self, request, *_args, **_kwargs) -> HttpResponse:
         """Handle GET request"""
-        keyword = request.GET.get("keyword", None)
-        if not keyword:
+        if not request.GET.get("keyword", None):
             raise _InvalidKeywordException("Missing keyword.")
-        files = search_files(request.user, keyword).select_related("volume")
-        data = [
+        data = _RequestModel.model_validate(request.GET.dict())
+        after = self._decode_cursor(data.cursor) if data.cursor else None
+        files = search_files(request.user, data.keyword, after).select_related("volume")
+
+        if data.format == "ndjson":
+            return StreamingHttpResponse(
+                self._stream_files(files), content_type="application/x-ndjson"
+            )
+
+        # Fetch one more to know if there is a next page.
+        files = list(files[: data.limit + 1])
+        next_cursor = None
+        if len(files) > data.limit:
+            files = files[: data.limit]
+            next_cursor = self._encode_cursor(files[-1])
+        return JsonResponse(
             {
-                "id": file.pk,
-                "name": file.name,
-                "path": get_file_full_path(file),
-                "last_modified": file.last_modified,
-                "size": file.size,
-                "media_type": file.media_type,
-                "kind": file.kind,
+                "values": [self._get_file_as_raw(file) for file in files],
+                "next_cursor": next_cursor,
             }
-            for file in files
-        ]
-        return JsonResponse({"values": data})
+        )
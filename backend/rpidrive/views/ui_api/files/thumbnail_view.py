@@ -25,4 +25,4 @@ class FileThumbnailView(LoginRequiredMixin, View):
     )
     def get(self, request, file_id: str, *_args, **_kwargs) -> StreamingHttpResponse:
         """Handle GET request"""
-        return serve_file_thumbnail(request.user, file_id)
+        return serve_file_thumbnail(request.user, file_id, request)
@@ -0,0 +1,107 @@
+import http
+
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http.response import JsonResponse
+from django.views import View
+from pydantic import BaseModel, Field, ValidationError
+
+from rpidrive.controllers.exceptions import (
+    InvalidFileNameException,
+    InvalidOperationRequestException,
+    NoPermissionException,
+)
+from rpidrive.controllers.upload import (
+    InvalidUploadOffsetException,
+    UploadSessionNotFoundException,
+    create_upload_session,
+    delete_upload_session,
+    get_upload_session,
+    write_upload_session,
+)
+from rpidrive.views.decorators.generics import handle_exceptions
+
+
+class _CreateRequestModel(BaseModel):
+    """Model for view"""
+
+    path: str = Field(min_length=1)
+    size: int = Field(ge=0)
+
+
+class _InvalidOffsetException(Exception):
+    """Invalid offset exception"""
+
+
+class FileUploadSessionView(LoginRequiredMixin, View):
+    """File upload session view.
+
+    Upload is resumable: create a session, PUT the data from the session
+    offset with Upload-Offset header, repeat after interruption. The file
+    is created once all data is received.
+    """
+
+    @handle_exceptions(
+        known_exc={
+            InvalidFileNameException,
+            InvalidOperationRequestException,
+            NoPermissionException,
+            ValidationError,
+        }
+    )
+    def post(self, request, file_id: str, *_args, **_kwargs) -> JsonResponse:
+        """Handle POST request"""
+        data = _CreateRequestModel.model_validate_json(request.body)
+        session = create_upload_session(request.user, file_id, data.path, data.size)
+        return JsonResponse(
+            {"id": session.pk, "offset": session.offset, "size": session.size},
+            status=http.HTTPStatus.CREATED,
+        )
+
+
+class UploadSessionDetailView(LoginRequiredMixin, View):
+    """Upload session detail view"""
+
+    _OFFSET_HEADER = "Upload-Offset"
+
+    @handle_exceptions(known_exc={UploadSessionNotFoundException})
+    def get(self, request, session_id: str, *_args, **_kwargs) -> JsonResponse:
+        """Handle GET request"""
+        session = get_upload_session(request.user, session_id)
+        return JsonResponse(
+            {"id": session.pk, "offset": session.offset, "size": session.size}
+        )
+
+    @handle_exceptions(
+        known_exc={
+            InvalidFileNameException,
+            InvalidOperationRequestException,
+            _InvalidOffsetException,
+            UploadSessionNotFoundException,
+        }
+    )
+    def put(self, request, session_id: str, *_args, **_kwargs) -> JsonResponse:
+        """Handle PUT request"""
+        offset = request.headers.get(self._OFFSET_HEADER, "")
+        if not offset.isdigit():
+            raise _InvalidOffsetException(f"Invalid {self._OFFSET_HEADER} header.")
+        try:
+            offset, file = write_upload_session(
+                request.user, session_id, int(offset), request
+            )
+        except InvalidUploadOffsetException as exc:
+            return JsonResponse(
+                {"error": str(exc), "offset": exc.offset},
+                status=http.HTTPStatus.CONFLICT,
+            )
+        return JsonResponse({"offset": offset, "file": file.pk if file else None})
+
+    @handle_exceptions(
+        known_exc={
+            InvalidOperationRequestException,
+            UploadSessionNotFoundException,
+        }
+    )
+    def delete(self, request, session_id: str, *_args, **_kwargs) -> JsonResponse:
+        """Handle DELETE request"""
+        delete_upload_session(request.user, session_id)
+        return JsonResponse({})
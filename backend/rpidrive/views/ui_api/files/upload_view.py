@@ -2,13 +2,16 @@ import http
 
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.http.response import JsonResponse
+from django.utils.decorators import method_decorator
 from django.views import View
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
 
 from rpidrive.controllers.exceptions import NoPermissionException
 from rpidrive.controllers.file import (
     InvalidOperationRequestException,
     FileNotFoundException,
     create_files,
+    get_upload_handlers,
 )
 from rpidrive.views.decorators.generics import handle_exceptions
 
@@ -17,6 +20,8 @@ class _NoFileException(Exception):
     """No file exception"""
 
 
+# CSRF check reads the form, it is done once upload handlers are set.
+@method_decorator(csrf_exempt, name="dispatch")
 class FileUploadView(LoginRequiredMixin, View):
     """File upload view"""
 
@@ -33,6 +38,11 @@ class FileUploadView(LoginRequiredMixin, View):
     )
     def post(self, request, file_id: str, *_args, **_kwargs) -> JsonResponse:
         """Handle POST request"""
+        request.upload_handlers = get_upload_handlers(request.user, file_id, request)
+        return self._create_files(request, file_id)
+
+    @method_decorator(csrf_protect)
+    def _create_files(self, request, file_id: str) -> JsonResponse:
         if not request.FILES.get(self._FILE_FORM, None):
             raise _NoFileException("No file was uploaded.")
 
@@ -42,6 +52,8 @@ class FileUploadView(LoginRequiredMixin, View):
             {"file": file_list[idx], "path": path_list[idx]}
             for idx in range(len(file_list))
         ]
-        create_files(request.user, file_id, data)
+        job = create_files(request.user, file_id, data)
 
-        return JsonResponse({}, status=http.HTTPStatus.CREATED)
+        return JsonResponse(
+            {"job": job.pk} if job else {}, status=http.HTTPStatus.CREATED
+        )